@@ -254,7 +254,7 @@ class WatchController(object):
             return exception.HeatMissingParameterError("MetricData list")
 
         watch_name = None
-        dimensions = []
+        stats_data_list = []
         for p in metric_data:
             dimension = api_utils.extract_param_pairs(p,
                                                       prefix='Dimensions',
@@ -262,20 +262,22 @@ class WatchController(object):
                                                       valuename='Value')
             if 'AlarmName' in dimension:
                 watch_name = dimension['AlarmName']
+                dimensions = []
             else:
-                dimensions.append(dimension)
+                dimensions = [dimension]
 
-        # Extract the required data from the metric_data
-        # and format dict to pass to engine
-        data = {'Namespace': namespace,
-                api_utils.get_param_value(metric_data[0], 'MetricName'): {
-                    'Unit': api_utils.get_param_value(metric_data[0], 'Unit'),
-                    'Value': api_utils.get_param_value(metric_data[0],
-                                                       'Value'),
-                    'Dimensions': dimensions}}
+            # Extract the required data from the metric_data
+            # and format dict to pass to engine
+            stats_data_list.append({
+                'Namespace': namespace,
+                api_utils.get_param_value(p, 'MetricName'): {
+                    'Unit': api_utils.get_param_value(p, 'Unit'),
+                    'Value': api_utils.get_param_value(p, 'Value'),
+                    'Dimensions': dimensions}})
 
         try:
-            self.rpc_client.create_watch_data(con, watch_name, data)
+            self.rpc_client.create_watch_data_batch(con, watch_name,
+                                                    stats_data_list)
         except messaging.RemoteError as ex:
             return exception.map_remote_error(ex)
 
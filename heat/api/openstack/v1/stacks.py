@@ -396,9 +396,15 @@ class StackController(object):
         """
         Gets detailed information for a stack
         """
+        refresh_outputs = False
+        if 'refresh' in req.params:
+            refresh_outputs = self._extract_bool_param(
+                'refresh',
+                req.params.get('refresh'))
 
         stack_list = self.rpc_client.show_stack(req.context,
-                                                identity)
+                                                identity,
+                                                refresh_outputs)
 
         if not stack_list:
             raise exc.HTTPInternalServerError()
@@ -84,7 +84,25 @@ def purge_deleted():
     """
     Remove database records that have been previously soft deleted
     """
-    utils.purge_deleted(CONF.command.age, CONF.command.granularity)
+    purged = utils.purge_deleted(CONF.command.age, CONF.command.granularity,
+                                 batch_size=CONF.command.batch_size,
+                                 rate_limit=CONF.command.rate_limit)
+
+    print_format = "%-24s %12s"
+    print(print_format % (_('Table'), _('Rows Purged')))
+    for table, count in purged.items():
+        print(print_format % (table, count))
+
+
+def dedupe_template_files():
+    """
+    Store the files of each set of templates sharing the same files once
+    """
+    updated, stored = utils.raw_template_files_dedupe(
+        batch_size=CONF.command.batch_size)
+
+    print(_('Moved the files of %(updated)d templates to %(stored)d new '
+            'sets of files') % {'updated': updated, 'stored': stored})
 
 
 def add_command_parsers(subparsers):
@@ -104,6 +122,21 @@ def add_command_parsers(subparsers):
         '-g', '--granularity', default='days',
         choices=['days', 'hours', 'minutes', 'seconds'],
         help=_('Granularity to use for age argument, defaults to days.'))
+    parser.add_argument(
+        '-b', '--batch_size', type=int, default=None,
+        help=_('Number of stacks or events to delete in each transaction, '
+               'defaults to 1000.'))
+    parser.add_argument(
+        '-r', '--rate_limit', type=float, default=None,
+        help=_('Maximum number of rows to delete per second, defaults to '
+               'no limit.'))
+
+    parser = subparsers.add_parser('dedupe_template_files')
+    parser.set_defaults(func=dedupe_template_files)
+    parser.add_argument(
+        '-b', '--batch_size', type=int, default=None,
+        help=_('Number of templates to update in each transaction, '
+               'defaults to 1000.'))
 
     ServiceManageCommand.add_service_parsers(subparsers)
 
@@ -131,6 +131,22 @@ engine_opts = [
                       "stack's events exceed max_events_per_stack. Set this "
                       "lower to keep more events at the expense of more "
                       "frequent purges.")),
+    cfg.BoolOpt('strict_event_store',
+                default=True,
+                help=_('Write each event to the database as soon as it '
+                       'occurs. When disabled, events are buffered in the '
+                       'engine and written in batches, at least every '
+                       'event_flush_interval seconds and always when a '
+                       'stack action finishes.')),
+    cfg.FloatOpt('event_flush_interval',
+                 default=1.0,
+                 help=_('Maximum number of seconds for which events are '
+                        'buffered when strict_event_store is disabled.')),
+    cfg.IntOpt('event_flush_batch_size',
+               default=100,
+               help=_('Number of buffered events that causes them to be '
+                      'written immediately when strict_event_store is '
+                      'disabled.')),
     cfg.IntOpt('max_events_per_stack',
                default=1000,
                help=_('Maximum events that will be available per stack. Older'
@@ -221,7 +237,64 @@ engine_opts = [
                 default=False,
                 help=_('Encrypt template parameters that were marked as'
                        ' hidden and also all the resource properties before'
-                       ' storing them in database.'))]
+                       ' storing them in database.')),
+    cfg.IntOpt('client_connection_pools',
+               default=10,
+               help=_('Number of hosts for which connections are pooled by '
+                      'the HTTP sessions shared by the OpenStack clients.')),
+    cfg.IntOpt('client_connection_pool_size',
+               default=10,
+               help=_('Maximum number of connections to each host that are '
+                      'kept alive for reuse by the HTTP sessions shared by '
+                      'the OpenStack clients.')),
+    cfg.IntOpt('client_lookup_cache_size',
+               default=1000,
+               help=_('Maximum number of results of name to ID lookups by '
+                      'the OpenStack clients (flavors, images, key pairs, '
+                      'networks...) to cache, both per stack operation and '
+                      'in the engine-wide cache.')),
+    cfg.IntOpt('client_lookup_cache_ttl',
+               default=300,
+               help=_('Number of seconds for which the result of a name to '
+                      'ID lookup is reused within a stack operation.')),
+    cfg.IntOpt('client_lookup_engine_cache_ttl',
+               default=0,
+               help=_('Number of seconds for which the result of a name to '
+                      'ID lookup is shared by all the stack operations of '
+                      'the same user in an engine. 0 disables the '
+                      'engine-wide cache.')),
+    cfg.IntOpt('bulk_status_poll_threshold',
+               default=10,
+               help=_('Minimum number of resources of the same type '
+                      '(servers, volumes, ports) being waited for in a '
+                      'stack operation before their status is fetched with '
+                      'a single list call per poll rather than one call per '
+                      'resource.')),
+    cfg.IntOpt('bulk_status_poll_max_interval',
+               default=10,
+               help=_('Maximum number of seconds between two list calls '
+                      'polling the status of resources in bulk. The '
+                      'interval grows while their status does not change.')),
+    cfg.IntOpt('template_cache_size',
+               default=100,
+               help=_('Maximum number of parsed provider templates, and of '
+                      'the property and attribute schemas derived from '
+                      'them, that are cached by each engine.')),
+    cfg.IntOpt('template_url_cache_ttl',
+               default=0,
+               help=_('Number of seconds for which a provider template '
+                      'fetched from a URL is reused without being fetched '
+                      'again. Once expired, templates served with an ETag '
+                      'are only downloaded again if they have changed. 0 '
+                      'disables the cache of remote templates.')),
+    cfg.IntOpt('watch_rule_index_reload_interval',
+               default=60,
+               help=_('Maximum number of seconds for which the index of '
+                      'watch rules used to match incoming metric data is '
+                      'kept before being reloaded from the database. Rules '
+                      'added or removed by another engine are picked up at '
+                      'once, but metric data matching dimensions changed by '
+                      'another engine can be missed for up to this long.'))]
 
 rpc_opts = [
     cfg.StrOpt('host',
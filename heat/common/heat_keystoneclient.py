@@ -18,7 +18,6 @@ import uuid
 
 from keystoneclient.auth.identity import v3 as kc_auth_v3
 import keystoneclient.exceptions as kc_exception
-from keystoneclient import session
 from keystoneclient.v3 import client as kc_v3
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -30,6 +29,7 @@ from heat.common import exception
 from heat.common.i18n import _
 from heat.common.i18n import _LE
 from heat.common.i18n import _LW
+from heat.common import session_pool
 
 LOG = logging.getLogger('heat.common.keystoneclient')
 
@@ -75,7 +75,7 @@ class KeystoneClientV3(object):
         self._domain_admin_auth = None
         self._domain_admin_client = None
 
-        self.session = session.Session.construct(self._ssl_options())
+        self.session = session_pool.get_session(self._ssl_options())
 
         if self.context.auth_url:
             self.v3_endpoint = self.context.auth_url.replace('v2.0', 'v3')
@@ -0,0 +1,59 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Pooled HTTP sessions shared by the OpenStack clients of a process."""
+
+from keystoneclient import session
+from oslo_config import cfg
+import requests
+from requests import adapters
+
+cfg.CONF.import_opt('client_connection_pools', 'heat.common.config')
+cfg.CONF.import_opt('client_connection_pool_size', 'heat.common.config')
+
+# The shared requests sessions, keyed by their TLS options
+_sessions = {}
+
+
+def _pooled_session(key):
+    pooled = _sessions.get(key)
+    if pooled is None:
+        pooled = requests.Session()
+        adapter = adapters.HTTPAdapter(
+            pool_connections=cfg.CONF.client_connection_pools,
+            pool_maxsize=cfg.CONF.client_connection_pool_size)
+        pooled.mount('http://', adapter)
+        pooled.mount('https://', adapter)
+        _sessions[key] = pooled
+    return pooled
+
+
+def get_session(ssl_options):
+    """Return a keystoneclient Session using a shared connection pool.
+
+    ssl_options is a dict of the cacert, insecure, cert and key options, as
+    passed to keystoneclient.session.Session.construct(). Every Session
+    returned for the same options shares one requests session, and so the
+    same kept-alive connections, but each has its own authentication plugin
+    so that it can safely be used for a single request context.
+    """
+    key = tuple(ssl_options.get(o)
+                for o in ('cacert', 'insecure', 'cert', 'key'))
+    options = dict(ssl_options, session=_pooled_session(key))
+    return session.Session.construct(options)
+
+
+def clear():
+    """Close and forget the shared sessions."""
+    while _sessions:
+        _sessions.popitem()[1].close()
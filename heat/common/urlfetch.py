@@ -13,6 +13,9 @@
 
 """Utility for fetching a resource (e.g. a template) from a URL."""
 
+import collections
+import time
+
 from oslo_config import cfg
 from oslo_log import log as logging
 import requests
@@ -24,6 +27,8 @@ from heat.common.i18n import _
 from heat.common.i18n import _LI
 
 cfg.CONF.import_opt('max_template_size', 'heat.common.config')
+cfg.CONF.import_opt('template_cache_size', 'heat.common.config')
+cfg.CONF.import_opt('template_url_cache_ttl', 'heat.common.config')
 
 LOG = logging.getLogger(__name__)
 
@@ -53,8 +58,23 @@ def get(url, allowed_schemes=('http', 'https')):
         except urllib.error.URLError as uex:
             raise URLFetchError(_('Failed to retrieve template: %s') % uex)
 
+    return _get_http(url)
+
+
+def _get_http(url, revalidate=False, etag=None):
+    """Get the data at an http: or https: URL.
+
+    When revalidating, return the data along with its ETag, or None instead
+    of the data if it still matches the ETag passed.
+    """
     try:
-        resp = requests.get(url, stream=True)
+        if etag is None:
+            resp = requests.get(url, stream=True)
+        else:
+            resp = requests.get(url, stream=True,
+                                headers={'If-None-Match': etag})
+            if resp.status_code == requests.codes.not_modified:
+                return None, etag
         resp.raise_for_status()
 
         # We cannot use resp.text here because it would download the
@@ -72,7 +92,54 @@ def get(url, allowed_schemes=('http', 'https')):
             if len(result) > cfg.CONF.max_template_size:
                 raise URLFetchError("Template exceeds maximum allowed size (%s"
                                     " bytes)" % cfg.CONF.max_template_size)
-        return result
+        if not revalidate:
+            return result
+        return result, resp.headers.get('ETag')
 
     except exceptions.RequestException as ex:
         raise URLFetchError(_('Failed to retrieve template: %s') % ex)
+
+
+# Recently fetched data, by URL, as (expiry time, ETag, data) tuples
+_cache = collections.OrderedDict()
+
+
+def get_cached(url, allowed_schemes=('http', 'https')):
+    """Get the data at the specified URL, reusing a recent copy.
+
+    The data is fetched again only once the copy is older than the
+    template_url_cache_ttl option, and then downloaded only if its ETag
+    (when the server provides one) has changed. Behaves like get() when the
+    option is 0.
+    """
+    ttl = cfg.CONF.template_url_cache_ttl
+    if ttl <= 0:
+        _cache.clear()
+        return get(url, allowed_schemes=allowed_schemes)
+
+    # Check the scheme before the cache, which may hold data fetched by a
+    # caller allowing more schemes than this one.
+    scheme = urllib.parse.urlparse(url).scheme
+    if scheme not in allowed_schemes:
+        raise URLFetchError(_('Invalid URL scheme %s') % scheme)
+
+    now = time.time()
+    entry = _cache.pop(url, None)
+    if entry is not None and entry[0] > now:
+        _cache[url] = entry
+        return entry[2]
+
+    etag = None
+    if scheme in ('http', 'https'):
+        LOG.info(_LI('Fetching data from %s'), url)
+        data, etag = _get_http(url, revalidate=True,
+                               etag=entry[1] if entry else None)
+        if data is None:
+            data = entry[2]
+    else:
+        data = get(url, allowed_schemes=allowed_schemes)
+
+    _cache[url] = (now + ttl, etag, data)
+    while len(_cache) > max(cfg.CONF.template_cache_size, 0):
+        _cache.popitem(last=False)
+    return data
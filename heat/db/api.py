@@ -47,6 +47,10 @@ def raw_template_get(context, template_id):
     return IMPL.raw_template_get(context, template_id)
 
 
+def raw_template_get_templates(context, template_ids):
+    return IMPL.raw_template_get_templates(context, template_ids)
+
+
 def raw_template_create(context, values):
     return IMPL.raw_template_create(context, values)
 
@@ -59,6 +63,14 @@ def raw_template_delete(context, template_id):
     return IMPL.raw_template_delete(context, template_id)
 
 
+def raw_template_files_get(context, files_id):
+    return IMPL.raw_template_files_get(context, files_id)
+
+
+def raw_template_files_create(context, files):
+    return IMPL.raw_template_files_create(context, files)
+
+
 def resource_data_get_all(resource, data=None):
     return IMPL.resource_data_get_all(resource, data)
 
@@ -159,6 +171,10 @@ def stack_get_all_by_owner_id(context, owner_id):
     return IMPL.stack_get_all_by_owner_id(context, owner_id)
 
 
+def stack_get_identities(context, stack_ids):
+    return IMPL.stack_get_identities(context, stack_ids)
+
+
 def stack_count_all(context, filters=None, tenant_safe=True,
                     show_deleted=False, show_nested=False, show_hidden=False,
                     tags=None, tags_any=None, not_tags=None,
@@ -182,6 +198,14 @@ def stack_update(context, stack_id, values):
     return IMPL.stack_update(context, stack_id, values)
 
 
+def stack_cache_outputs(context, stack_id, outputs, generation):
+    return IMPL.stack_cache_outputs(context, stack_id, outputs, generation)
+
+
+def stack_clear_cached_outputs(context, stack_id):
+    return IMPL.stack_clear_cached_outputs(context, stack_id)
+
+
 def stack_delete(context, stack_id):
     return IMPL.stack_delete(context, stack_id)
 
@@ -258,6 +282,10 @@ def event_create(context, values):
     return IMPL.event_create(context, values)
 
 
+def event_create_all(context, values_list):
+    return IMPL.event_create_all(context, values_list)
+
+
 def watch_rule_get(context, watch_rule_id):
     return IMPL.watch_rule_get(context, watch_rule_id)
 
@@ -270,6 +298,14 @@ def watch_rule_get_all(context):
     return IMPL.watch_rule_get_all(context)
 
 
+def watch_rule_get_all_newer(context, watch_rule_id):
+    return IMPL.watch_rule_get_all_newer(context, watch_rule_id)
+
+
+def watch_rule_count_and_max_id(context):
+    return IMPL.watch_rule_count_and_max_id(context)
+
+
 def watch_rule_get_all_by_stack(context, stack_id):
     return IMPL.watch_rule_get_all_by_stack(context, stack_id)
 
@@ -290,6 +326,10 @@ def watch_data_create(context, values):
     return IMPL.watch_data_create(context, values)
 
 
+def watch_data_create_all(context, values_list):
+    return IMPL.watch_data_create_all(context, values_list)
+
+
 def watch_data_get_all(context):
     return IMPL.watch_data_get_all(context)
 
@@ -298,6 +338,10 @@ def watch_data_get_all_by_watch_rule_id(context, watch_rule_id):
     return IMPL.watch_data_get_all_by_watch_rule_id(context, watch_rule_id)
 
 
+def watch_data_delete_expired(context, watch_rule_id, expiry):
+    return IMPL.watch_data_delete_expired(context, watch_rule_id, expiry)
+
+
 def software_config_create(context, values):
     return IMPL.software_config_create(context, values)
 
@@ -401,6 +445,20 @@ def sync_point_update_input_data(context, entity_id,
                                              atomic_key, input_data)
 
 
+def sync_point_input_create(context, values):
+    return IMPL.sync_point_input_create(context, values)
+
+
+def sync_point_input_get_all(context, entity_id, traversal_id, is_update):
+    return IMPL.sync_point_input_get_all(context, entity_id, traversal_id,
+                                         is_update)
+
+
+def sync_point_input_count(context, entity_id, traversal_id, is_update):
+    return IMPL.sync_point_input_count(context, entity_id, traversal_id,
+                                       is_update)
+
+
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
     return IMPL.db_sync(engine, version=version)
@@ -12,12 +12,18 @@
 #    under the License.
 
 '''Implementation of SQLAlchemy backend.'''
+import collections
 import datetime
+import hashlib
+import itertools
 import sys
+import time
 
 from oslo_config import cfg
+from oslo_db import exception as db_exception
 from oslo_db.sqlalchemy import session as db_session
 from oslo_db.sqlalchemy import utils
+from oslo_serialization import jsonutils
 from oslo_utils import timeutils
 import osprofiler.sqlalchemy
 import six
@@ -97,6 +103,20 @@ def raw_template_get(context, template_id):
     return result
 
 
+def raw_template_get_templates(context, template_ids):
+    """Return the content of several templates, keyed by template ID.
+
+    Only the template column is read, so this does not load (or decrypt)
+    the environments and files of the templates.
+    """
+    if not template_ids:
+        return {}
+    query = model_query(context, models.RawTemplate.id,
+                        models.RawTemplate.template).filter(
+        models.RawTemplate.id.in_(set(template_ids)))
+    return dict(query.all())
+
+
 def raw_template_create(context, values):
     raw_template_ref = models.RawTemplate()
     raw_template_ref.update(values)
@@ -121,6 +141,100 @@ def raw_template_delete(context, template_id):
     raw_template.delete()
 
 
+def _raw_template_files_hash(files):
+    return hashlib.sha256(
+        jsonutils.dumps(files, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def raw_template_files_get(context, files_id):
+    result = model_query(context, models.RawTemplateFiles).get(files_id)
+    if not result:
+        raise exception.NotFound(_('raw template files with id %s not '
+                                   'found') % files_id)
+    return result
+
+
+def raw_template_files_create(context, files):
+    """Store a set of template files, unless it is already stored.
+
+    Sets of files are identified by the hash of their content, so that
+    templates referencing the same files (e.g. nested stacks and their
+    parent) share a single row.
+    """
+    files_id = _raw_template_files_hash(files)
+    result = model_query(context, models.RawTemplateFiles).get(files_id)
+    if result is not None:
+        return result
+
+    raw_template_files_ref = models.RawTemplateFiles(id=files_id,
+                                                     files=files)
+    try:
+        raw_template_files_ref.save(_session(context))
+    except db_exception.DBDuplicateEntry:
+        # Stored concurrently for another template
+        return models.RawTemplateFiles(id=files_id, files=files)
+    return raw_template_files_ref
+
+
+def raw_template_files_dedupe(batch_size=None):
+    """Move the files stored in each raw_template row to raw_template_files.
+
+    Templates stored before raw_template_files was introduced each hold
+    their own copy of their files. Every distinct set of files is stored
+    once, and the templates are updated batch_size at a time, each batch
+    in its own transaction, so that the command can be interrupted and run
+    again.
+
+    :returns: a tuple of the number of templates updated and of the number
+              of sets of files stored
+    """
+    if batch_size is None:
+        batch_size = PURGE_BATCH_SIZE
+    try:
+        batch_size = int(batch_size)
+    except ValueError:
+        raise exception.Error(_("batch_size should be an integer"))
+    if batch_size < 1:
+        raise exception.Error(_("batch_size should be a positive integer"))
+
+    engine = get_engine()
+    raw_template = models.RawTemplate.__table__
+    raw_template_files = models.RawTemplateFiles.__table__
+    legacy = sqlalchemy.select(
+        [raw_template.c.id, raw_template.c.files]
+    ).where(raw_template.c.files_id.is_(None)).limit(batch_size)
+
+    updated = stored = 0
+    while True:
+        with engine.begin() as conn:
+            batch = conn.execute(legacy).fetchall()
+            by_hash = collections.defaultdict(list)
+            for template_id, files in batch:
+                files = files or {}
+                by_hash[_raw_template_files_hash(files)].append(
+                    (template_id, files))
+
+            existing = set()
+            if by_hash:
+                existing.update(r[0] for r in conn.execute(sqlalchemy.select(
+                    [raw_template_files.c.id]
+                ).where(raw_template_files.c.id.in_(list(by_hash)))))
+            now = timeutils.utcnow()
+            for files_id, templates in six.iteritems(by_hash):
+                if files_id not in existing:
+                    conn.execute(raw_template_files.insert().values(
+                        id=files_id, files=templates[0][1], created_at=now))
+                    stored += 1
+                conn.execute(raw_template.update().where(
+                    raw_template.c.id.in_([t[0] for t in templates])
+                ).values(files=sqlalchemy.null(), files_id=files_id))
+            updated += len(batch)
+        if len(batch) < batch_size:
+            break
+
+    return updated, stored
+
+
 def resource_get(context, resource_id):
     result = model_query(context, models.Resource).get(resource_id)
 
@@ -369,6 +483,21 @@ def stack_get_all_by_owner_id(context, owner_id):
     return results
 
 
+def stack_get_identities(context, stack_ids):
+    """Return the (id, name, tenant) of each of the given stacks.
+
+    Only the identifying columns are selected, so this is cheap enough to
+    call for every stack referenced by a page of events. Deleted stacks are
+    included, since their events may still be listed.
+    """
+    if not stack_ids:
+        return []
+    session = _session(context)
+    return session.query(
+        models.Stack.id, models.Stack.name, models.Stack.tenant
+    ).filter(models.Stack.id.in_(set(stack_ids))).all()
+
+
 def _get_sort_keys(sort_keys, mapping):
     '''Returns an array containing only whitelisted keys
 
@@ -465,6 +594,7 @@ def stack_get_all(context, limit=None, sort_keys=None, marker=None,
                                  show_hidden=show_hidden, tags=tags,
                                  tags_any=tags_any, not_tags=not_tags,
                                  not_tags_any=not_tags_any)
+    query = query.options(orm.subqueryload('tags'))
     return _filter_and_page_query(context, query, limit, sort_keys,
                                   marker, sort_dir, filters).all()
 
@@ -526,6 +656,45 @@ def stack_update(context, stack_id, values):
     return (rows_updated is not None and rows_updated > 0)
 
 
+def stack_cache_outputs(context, stack_id, outputs, generation):
+    """
+    Store the formatted outputs of a stack, unless they have been discarded
+    since the given generation of the outputs was read.
+    """
+    session = _session(context)
+    rows_updated = (session.query(models.Stack)
+                    .filter(models.Stack.id == stack_id)
+                    .filter(models.Stack.outputs_generation == generation)
+                    .update({'cached_outputs': outputs},
+                            synchronize_session=False))
+
+    return (rows_updated is not None and rows_updated > 0)
+
+
+def stack_clear_cached_outputs(context, stack_id):
+    """
+    Discard the cached outputs of a stack and of all of its owners.
+
+    Returns the new generation of the outputs of the stack.
+    """
+    session = _session(context)
+    stack_ids = []
+    owner_id = stack_id
+    while owner_id is not None and owner_id not in stack_ids:
+        stack_ids.append(owner_id)
+        owner_id = session.query(models.Stack.owner_id).filter_by(
+            id=owner_id).scalar()
+
+    generation = sqlalchemy.func.coalesce(models.Stack.outputs_generation, 0)
+    session.query(models.Stack).filter(
+        models.Stack.id.in_(stack_ids)).update(
+            {'cached_outputs': None, 'outputs_generation': generation + 1},
+            synchronize_session=False)
+
+    return session.query(models.Stack.outputs_generation).filter_by(
+        id=stack_id).scalar()
+
+
 def stack_delete(context, stack_id):
     s = stack_get(context, stack_id)
     if not s:
@@ -581,11 +750,87 @@ def stack_lock_release(stack_id, engine_id):
         return True
 
 
+def _supports_recursive_cte(session):
+    """Return whether the database can evaluate recursive queries (CTEs)."""
+    dialect = session.get_bind().dialect
+    version = tuple(dialect.server_version_info or ())
+    if dialect.name == 'postgresql':
+        return True
+    elif dialect.name == 'sqlite':
+        return version >= (3, 8, 3)
+    elif dialect.name == 'mysql':
+        if 'MariaDB' in version or getattr(dialect, '_is_mariadb', False):
+            # MariaDB may report its version behind a '5.5.5-' prefix
+            if version[:3] == (5, 5, 5) and len(version) > 3:
+                version = version[3:]
+            return version >= (10, 2, 2)
+        return version >= (8, 0)
+    return False
+
+
 def stack_get_root_id(context, stack_id):
-    s = stack_get(context, stack_id)
-    while s.owner_id:
-        s = stack_get(context, s.owner_id)
-    return s.id
+    session = _session(context)
+    if _supports_recursive_cte(session):
+        chain = session.query(
+            models.Stack.id, models.Stack.owner_id
+        ).filter(
+            models.Stack.id == stack_id
+        ).cte(name='stack_chain', recursive=True)
+        owner = orm_aliased(models.Stack, name='owner')
+        chain = chain.union_all(session.query(
+            owner.id, owner.owner_id
+        ).filter(owner.id == chain.c.owner_id))
+        try:
+            root_id = session.query(chain.c.id).filter(
+                chain.c.owner_id.is_(None)).scalar()
+        except db_exception.DBError:
+            # The database could not evaluate the recursive query after all
+            root_id = None
+        if root_id is not None:
+            return root_id
+
+    # Fall back to walking up the chain of owners, fetching only their IDs
+    root_id, owner_id = None, stack_id
+    while owner_id:
+        root_id = owner_id
+        owner_id = model_query(context, models.Stack.owner_id).filter(
+            models.Stack.id == root_id).scalar()
+    return root_id
+
+
+def _nested_stack_ids(context, stack_id, recursive=True):
+    """Return the IDs of a stack and all of its nested stacks.
+
+    The result is either a list or a SELECT statement, so is suitable for use
+    only as the argument of an IN clause.
+
+    Nested stacks are found using a single recursive query where the database
+    supports it (and recursive is True), and otherwise with one query per
+    level of nesting.
+    """
+    show_deleted = context.show_deleted
+    session = _session(context)
+
+    if recursive and _supports_recursive_cte(session):
+        tree = session.query(models.Stack.id).filter(
+            models.Stack.id == stack_id
+        ).cte(name='stack_tree', recursive=True)
+        nested = orm_aliased(models.Stack, name='nested')
+        children = session.query(nested.id).filter(
+            nested.owner_id == tree.c.id)
+        if not show_deleted:
+            children = children.filter(nested.deleted_at.is_(None))
+        tree = tree.union_all(children)
+        return sqlalchemy.select([tree.c.id])
+
+    stack_ids = [stack_id]
+    level = stack_ids
+    while level:
+        level = [s.id for s in soft_delete_aware_query(
+            context, models.Stack.id
+        ).filter(models.Stack.owner_id.in_(level))]
+        stack_ids.extend(level)
+    return stack_ids
 
 
 def stack_count_total_resources(context, stack_id):
@@ -594,21 +839,20 @@ def stack_count_total_resources(context, stack_id):
     if stack_id is None or stack_get(context, stack_id) is None:
         return 0
 
-    def nested_stack_ids(sid):
-        yield sid
-        for child in stack_get_all_by_owner_id(context, sid):
-            for stack in nested_stack_ids(child.id):
-                yield stack
-
-    stack_ids = list(nested_stack_ids(stack_id))
+    def count_resources(stack_ids):
+        # count all resources which belong to the stacks
+        return model_query(
+            context, models.Resource
+        ).filter(
+            models.Resource.stack_id.in_(stack_ids)
+        ).count()
 
-    # count all resources which belong to the stacks
-    results = model_query(
-        context, models.Resource
-    ).filter(
-        models.Resource.stack_id.in_(stack_ids)
-    ).count()
-    return results
+    try:
+        return count_resources(_nested_stack_ids(context, stack_id))
+    except db_exception.DBError:
+        # The database could not evaluate the recursive query after all
+        return count_resources(_nested_stack_ids(context, stack_id,
+                                                 recursive=False))
 
 
 def user_creds_create(context):
@@ -701,9 +945,12 @@ def event_get_all_by_stack(context, stack_id, limit=None, marker=None,
 
 def _events_paginate_query(context, query, model, limit=None, sort_keys=None,
                            marker=None, sort_dir=None):
-    default_sort_keys = ['created_at']
     if not sort_keys:
-        sort_keys = default_sort_keys
+        # Events are only ever appended, so the primary key already follows
+        # creation order. Paging on it alone lets the marker be resolved to
+        # a range scan of the primary key index rather than a sort of every
+        # event belonging to the stack.
+        sort_keys = []
         if not sort_dir:
             sort_dir = 'desc'
 
@@ -762,19 +1009,73 @@ def _delete_event_rows(context, stack_id, limit):
     return q.delete(synchronize_session='fetch')
 
 
+# The number of events that may still be created for each stack before its
+# events need counting again, most recently used stacks last.
+_event_inserts_until_prune = collections.OrderedDict()
+_EVENT_PRUNE_STACKS = 1000
+
+
+def _prune_events(context, stack_id, num_events=1):
+    """Keep the number of a stack's events within max_events_per_stack.
+
+    This must be called before inserting num_events new events for the
+    stack. Counting a stack's events on every insert is expensive, so they
+    are only counted once in every event_purge_batch_size inserts. When the
+    stack is then found to be at the limit, enough of the oldest events are
+    pruned to make room for the next batch, so the limit is never exceeded
+    by events from this engine. Events created concurrently by other engines
+    can push a stack over the limit by at most a batch each until its next
+    count.
+    """
+    max_events = cfg.CONF.max_events_per_stack
+    batch_size = max(1, min(cfg.CONF.event_purge_batch_size, max_events),
+                     num_events)
+
+    remaining = _event_inserts_until_prune.pop(stack_id, 0) - num_events
+    if remaining < 0:
+        room = max_events - event_count_all_by_stack(context, stack_id)
+        if room < batch_size:
+            _delete_event_rows(context, stack_id, batch_size - room)
+        remaining = batch_size - num_events
+
+    _event_inserts_until_prune[stack_id] = remaining
+    while len(_event_inserts_until_prune) > _EVENT_PRUNE_STACKS:
+        _event_inserts_until_prune.popitem(last=False)
+
+
 def event_create(context, values):
     if 'stack_id' in values and cfg.CONF.max_events_per_stack:
-        if ((event_count_all_by_stack(context, values['stack_id']) >=
-             cfg.CONF.max_events_per_stack)):
-            # prune
-            _delete_event_rows(
-                context, values['stack_id'], cfg.CONF.event_purge_batch_size)
+        _prune_events(context, values['stack_id'])
     event_ref = models.Event()
     event_ref.update(values)
     event_ref.save(_session(context))
     return event_ref
 
 
+def event_create_all(context, values_list):
+    """Create a number of events with a single multi-row INSERT.
+
+    Every dict in values_list must have the same keys.
+    """
+    if not values_list:
+        return
+    if cfg.CONF.max_events_per_stack:
+        stack_events = collections.Counter(v['stack_id'] for v in values_list)
+        for stack_id, num_events in six.iteritems(stack_events):
+            _prune_events(context, stack_id, num_events)
+
+    def row(values):
+        # Inserting into the table directly skips the model's truncation
+        row = dict(values)
+        reason = row.get('resource_status_reason')
+        row['resource_status_reason'] = reason and reason[:255] or ''
+        return row
+
+    session = _session(context)
+    session.execute(models.Event.__table__.insert(),
+                    [row(values) for values in values_list])
+
+
 def watch_rule_get(context, watch_rule_id):
     result = model_query(context, models.WatchRule).get(watch_rule_id)
     return result
@@ -791,6 +1092,21 @@ def watch_rule_get_all(context):
     return results
 
 
+def watch_rule_get_all_newer(context, watch_rule_id):
+    results = model_query(context, models.WatchRule).filter(
+        models.WatchRule.id > watch_rule_id).order_by(
+            models.WatchRule.id).all()
+    return results
+
+
+def watch_rule_count_and_max_id(context):
+    """Return the number of watch rules and the highest of their IDs."""
+    count, max_id = model_query(
+        context, sqlalchemy.func.count(models.WatchRule.id),
+        sqlalchemy.func.max(models.WatchRule.id)).one()
+    return count, max_id
+
+
 def watch_rule_get_all_by_stack(context, stack_id):
     results = model_query(
         context, models.WatchRule).filter_by(stack_id=stack_id).all()
@@ -839,6 +1155,17 @@ def watch_data_create(context, values):
     return obj_ref
 
 
+def watch_data_create_all(context, values_list):
+    """Create a number of watch data with a single multi-row INSERT.
+
+    Every dict in values_list must have the same keys.
+    """
+    if not values_list:
+        return
+    session = _session(context)
+    session.execute(models.WatchData.__table__.insert(), values_list)
+
+
 def watch_data_get_all(context):
     results = model_query(context, models.WatchData).all()
     return results
@@ -850,6 +1177,13 @@ def watch_data_get_all_by_watch_rule_id(context, watch_rule_id):
     return results
 
 
+def watch_data_delete_expired(context, watch_rule_id, expiry):
+    return model_query(context, models.WatchData).filter(
+        models.WatchData.watch_rule_id == watch_rule_id,
+        models.WatchData.created_at < expiry).delete(
+            synchronize_session=False)
+
+
 def software_config_create(context, values):
     obj_ref = models.SoftwareConfig()
     obj_ref.update(values)
@@ -1014,7 +1348,31 @@ def service_get_all_by_args(context, host, binary, hostname):
             filter_by(hostname=hostname).all())
 
 
-def purge_deleted(age, granularity='days'):
+PURGE_BATCH_SIZE = 1000
+
+# Tables cleaned up by purge_deleted(), in the order rows are removed from them
+PURGE_TABLES = ('event', 'resource_data', 'resource', 'watch_data',
+                'watch_rule', 'snapshot', 'stack_tag', 'sync_point_input',
+                'sync_point', 'stack_lock', 'stack', 'raw_template',
+                'raw_template_files', 'user_creds', 'service')
+
+
+def purge_deleted(age, granularity='days', batch_size=None, rate_limit=None):
+    """Remove records of stacks and services soft deleted before a given age.
+
+    Deleted stacks are purged batch_size at a time, with a set-based DELETE
+    per table for each batch; events, of which there may be very many, are
+    also removed batch_size rows at a time. Each of those steps is committed
+    in its own short transaction, and the stack rows are only removed once
+    everything referring to them has gone, so a purge that is interrupted
+    can be resumed simply by running it again.
+
+    :param batch_size: the maximum number of stacks or events to delete in
+                       one transaction
+    :param rate_limit: the maximum number of rows to delete per second, or
+                       None to run at full speed
+    :returns: a dict of the number of rows removed from each table
+    """
     try:
         age = int(age)
     except ValueError:
@@ -1026,6 +1384,23 @@ def purge_deleted(age, granularity='days'):
         raise exception.Error(
             _("granularity should be days, hours, minutes, or seconds"))
 
+    if batch_size is None:
+        batch_size = PURGE_BATCH_SIZE
+    try:
+        batch_size = int(batch_size)
+    except ValueError:
+        raise exception.Error(_("batch_size should be an integer"))
+    if batch_size < 1:
+        raise exception.Error(_("batch_size should be a positive integer"))
+
+    if rate_limit is not None:
+        try:
+            rate_limit = float(rate_limit)
+        except ValueError:
+            raise exception.Error(_("rate_limit should be a number"))
+        if rate_limit <= 0:
+            raise exception.Error(_("rate_limit should be a positive number"))
+
     if granularity == 'days':
         age = age * 86400
     elif granularity == 'hours':
@@ -1038,43 +1413,129 @@ def purge_deleted(age, granularity='days'):
     meta = sqlalchemy.MetaData()
     meta.bind = engine
 
-    # Purge deleted stacks
-    stack = sqlalchemy.Table('stack', meta, autoload=True)
-    event = sqlalchemy.Table('event', meta, autoload=True)
-    raw_template = sqlalchemy.Table('raw_template', meta, autoload=True)
-    user_creds = sqlalchemy.Table('user_creds', meta, autoload=True)
+    tables = dict((name, sqlalchemy.Table(name, meta, autoload=True))
+                  for name in PURGE_TABLES)
+    stack = tables['stack']
+    event = tables['event']
+    resource = tables['resource']
+    watch_rule = tables['watch_rule']
+    raw_template = tables['raw_template']
+    raw_template_files = tables['raw_template_files']
+    user_creds = tables['user_creds']
+    service = tables['service']
+
+    purged = collections.OrderedDict((name, 0) for name in PURGE_TABLES)
+    started = time.time()
+
+    def delete(conn, table, whereclause):
+        purged[table.name] += conn.execute(
+            table.delete().where(whereclause)).rowcount
+
+    def throttle():
+        if rate_limit is not None:
+            delay = (sum(six.itervalues(purged)) / rate_limit -
+                     (time.time() - started))
+            if delay > 0:
+                time.sleep(delay)
+
+    def unreferenced(conn, ids, *columns):
+        ids = set(ids) - set([None])
+        for column in columns:
+            if not ids:
+                break
+            stmt = sqlalchemy.select([column]).where(column.in_(ids))
+            ids -= set(row[0] for row in conn.execute(stmt))
+        return ids
 
-    stmt = sqlalchemy.select(
+    # Purge deleted stacks
+    deleted_stacks = sqlalchemy.select(
         [stack.c.id,
          stack.c.raw_template_id,
+         stack.c.prev_raw_template_id,
          stack.c.user_creds_id]
-    ).where(stack.c.deleted_at < time_line)
-    deleted_stacks = engine.execute(stmt)
-
-    for s in deleted_stacks:
-        event_del = event.delete().where(event.c.stack_id == s[0])
-        engine.execute(event_del)
-        stack_del = stack.delete().where(stack.c.id == s[0])
-        engine.execute(stack_del)
-        raw_template_del = raw_template.delete().where(
-            raw_template.c.id == s[1])
-        engine.execute(raw_template_del)
-        user_creds_del = user_creds.delete().where(user_creds.c.id == s[2])
-        engine.execute(user_creds_del)
+    ).where(stack.c.deleted_at < time_line).limit(batch_size)
+
+    while True:
+        batch = engine.execute(deleted_stacks).fetchall()
+        if not batch:
+            break
+        stack_ids = [s[0] for s in batch]
+
+        event_ids = sqlalchemy.select(
+            [event.c.id]
+        ).where(event.c.stack_id.in_(stack_ids)).limit(batch_size)
+        while True:
+            with engine.begin() as conn:
+                ids = [e[0] for e in conn.execute(event_ids)]
+                if ids:
+                    delete(conn, event, event.c.id.in_(ids))
+            throttle()
+            if len(ids) < batch_size:
+                break
+
+        with engine.begin() as conn:
+            resource_ids = sqlalchemy.select(
+                [resource.c.id]).where(resource.c.stack_id.in_(stack_ids))
+            rule_ids = sqlalchemy.select(
+                [watch_rule.c.id]).where(watch_rule.c.stack_id.in_(stack_ids))
+            template_ids = set(itertools.chain.from_iterable(
+                (s[1], s[2]) for s in batch))
+            template_ids.update(r[0] for r in conn.execute(sqlalchemy.select(
+                [resource.c.current_template_id]
+            ).where(resource.c.stack_id.in_(stack_ids)).distinct()))
+
+            delete(conn, tables['resource_data'],
+                   tables['resource_data'].c.resource_id.in_(resource_ids))
+            delete(conn, resource, resource.c.stack_id.in_(stack_ids))
+            delete(conn, tables['watch_data'],
+                   tables['watch_data'].c.watch_rule_id.in_(rule_ids))
+            for name in ('watch_rule', 'snapshot', 'stack_tag',
+                         'sync_point_input', 'sync_point', 'stack_lock'):
+                delete(conn, tables[name],
+                       tables[name].c.stack_id.in_(stack_ids))
+            delete(conn, stack, stack.c.id.in_(stack_ids))
+
+            # Templates and credentials may still be shared with stacks
+            # (e.g. nested stacks) that are not being purged.
+            template_ids = unreferenced(conn, template_ids,
+                                        stack.c.raw_template_id,
+                                        stack.c.prev_raw_template_id,
+                                        resource.c.current_template_id,
+                                        raw_template.c.predecessor)
+            if template_ids:
+                files_ids = set(r[0] for r in conn.execute(sqlalchemy.select(
+                    [raw_template.c.files_id]
+                ).where(raw_template.c.id.in_(template_ids)).distinct()))
+                files_ids.discard(None)
+                delete(conn, raw_template, raw_template.c.id.in_(template_ids))
+                # Files are shared by all the templates with the same ones,
+                # which may be being stored concurrently, so they are
+                # checked for references in the DELETE statement itself.
+                if files_ids:
+                    referenced = sqlalchemy.exists().where(
+                        raw_template.c.files_id == raw_template_files.c.id
+                    ).correlate(raw_template_files)
+                    delete(conn, raw_template_files,
+                           sqlalchemy.and_(
+                               raw_template_files.c.id.in_(files_ids),
+                               sqlalchemy.not_(referenced)))
+            creds_ids = unreferenced(conn, (s[3] for s in batch),
+                                     stack.c.user_creds_id)
+            if creds_ids:
+                delete(conn, user_creds, user_creds.c.id.in_(creds_ids))
+        throttle()
 
     # Purge deleted services
-    service = sqlalchemy.Table('service', meta, autoload=True)
-    stmt = (sqlalchemy.select([service.c.id]).
-            where(service.c.deleted_at < time_line))
-    deleted_services = engine.execute(stmt)
+    with engine.begin() as conn:
+        delete(conn, service, service.c.deleted_at < time_line)
 
-    for s in deleted_services:
-        stmt = service.delete().where(service.c.id == s[0])
-        engine.execute(stmt)
+    return purged
 
 
 def sync_point_delete_all_by_stack_and_traversal(context, stack_id,
                                                  traversal_id):
+    model_query(context, models.SyncPointInput).filter_by(
+        stack_id=stack_id, traversal_id=traversal_id).delete()
     rows_deleted = model_query(context, models.SyncPoint).filter_by(
         stack_id=stack_id, traversal_id=traversal_id).delete()
     return rows_deleted
@@ -1105,6 +1566,30 @@ def sync_point_update_input_data(context, entity_id,
     return rows_updated
 
 
+def sync_point_input_create(context, values):
+    sync_point_input_ref = models.SyncPointInput()
+    sync_point_input_ref.update(values)
+    sync_point_input_ref.save(_session(context))
+    return sync_point_input_ref
+
+
+def sync_point_input_get_all(context, entity_id, traversal_id, is_update):
+    results = model_query(context, models.SyncPointInput).filter_by(
+        entity_id=entity_id,
+        traversal_id=traversal_id,
+        is_update=is_update
+    ).order_by(models.SyncPointInput.id).all()
+    return results
+
+
+def sync_point_input_count(context, entity_id, traversal_id, is_update):
+    return model_query(context, models.SyncPointInput.id).filter_by(
+        entity_id=entity_id,
+        traversal_id=traversal_id,
+        is_update=is_update
+    ).count()
+
+
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
     if version is not None and int(version) < db_version(engine):
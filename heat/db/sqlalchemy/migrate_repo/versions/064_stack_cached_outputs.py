@@ -0,0 +1,27 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sqlalchemy
+
+from heat.db.sqlalchemy import types as heat_db_types
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData(bind=migrate_engine)
+
+    stack = sqlalchemy.Table('stack', meta, autoload=True)
+    cached_outputs = sqlalchemy.Column('cached_outputs', heat_db_types.Json)
+    cached_outputs.create(stack)
+    outputs_generation = sqlalchemy.Column('outputs_generation',
+                                           sqlalchemy.Integer)
+    outputs_generation.create(stack)
@@ -91,13 +91,27 @@ class StateAware(object):
     status_reason = sqlalchemy.Column('status_reason', sqlalchemy.Text)
 
 
+class RawTemplateFiles(BASE, HeatBase):
+    """Files referenced by templates, stored once for each distinct set."""
+
+    __tablename__ = 'raw_template_files'
+    # SHA-256 of the files, so that templates sharing them share the row
+    id = sqlalchemy.Column(sqlalchemy.String(64), primary_key=True)
+    files = sqlalchemy.Column(types.Json)
+
+
 class RawTemplate(BASE, HeatBase):
     """Represents an unparsed template which should be in JSON format."""
 
     __tablename__ = 'raw_template'
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
     template = sqlalchemy.Column(types.Json)
+    # Files of templates stored before raw_template_files was introduced
     files = sqlalchemy.Column(types.Json)
+    files_id = sqlalchemy.Column(
+        'files_id',
+        sqlalchemy.String(64),
+        sqlalchemy.ForeignKey('raw_template_files.id'))
     environment = sqlalchemy.Column('environment', types.Json)
     predecessor = sqlalchemy.Column('predecessor', sqlalchemy.Integer,
                                     sqlalchemy.ForeignKey('raw_template.id'))
@@ -139,6 +153,24 @@ class SyncPoint(BASE, HeatBase):
     input_data = sqlalchemy.Column(types.Json)
 
 
+class SyncPointInput(BASE, HeatBase):
+    """Represents the data sent to a syncpoint by one of its predecessors."""
+    __tablename__ = 'sync_point_input'
+    __table_args__ = (
+        sqlalchemy.Index('ix_sync_point_input_key',
+                         'entity_id', 'traversal_id', 'is_update'),
+        sqlalchemy.ForeignKeyConstraint(['stack_id'], ['stack.id'])
+    )
+
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    entity_id = sqlalchemy.Column(sqlalchemy.String(36), nullable=False)
+    traversal_id = sqlalchemy.Column(sqlalchemy.String(36), nullable=False)
+    is_update = sqlalchemy.Column(sqlalchemy.Boolean, nullable=False)
+    stack_id = sqlalchemy.Column(sqlalchemy.String(36),
+                                 nullable=False)
+    input_data = sqlalchemy.Column(types.Json)
+
+
 class Stack(BASE, HeatBase, SoftDelete, StateAware):
     """Represents a stack created by the heat engine."""
 
@@ -181,6 +213,9 @@ class Stack(BASE, HeatBase, SoftDelete, StateAware):
     current_traversal = sqlalchemy.Column('current_traversal',
                                           sqlalchemy.String(36))
     current_deps = sqlalchemy.Column('current_deps', types.Json)
+    cached_outputs = sqlalchemy.Column('cached_outputs', types.Json)
+    outputs_generation = sqlalchemy.Column('outputs_generation',
+                                           sqlalchemy.Integer)
 
     # Override timestamp column to store the correct value: it should be the
     # time the create/update call was issued, not the time the DB entry is
@@ -43,5 +43,10 @@ IMPL = LazyPluggable('backend',
                      sqlalchemy='heat.db.sqlalchemy.api')
 
 
-def purge_deleted(age, granularity='days'):
-    IMPL.purge_deleted(age, granularity)
+def purge_deleted(age, granularity='days', batch_size=None, rate_limit=None):
+    return IMPL.purge_deleted(age, granularity, batch_size=batch_size,
+                              rate_limit=rate_limit)
+
+
+def raw_template_files_dedupe(batch_size=None):
+    return IMPL.raw_template_files_dedupe(batch_size=batch_size)
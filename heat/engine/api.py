@@ -19,6 +19,7 @@ import six
 
 from heat.common.i18n import _
 from heat.common.i18n import _LE
+from heat.common import identifier
 from heat.common import param_utils
 from heat.common import template_format
 from heat.engine import constraints as constr
@@ -104,10 +105,13 @@ def format_stack_outputs(stack, outputs):
     return [format_stack_output(key) for key in outputs]
 
 
-def format_stack(stack, preview=False):
+def format_stack(stack, preview=False, refresh_outputs=False):
     '''
     Return a representation of the given stack that matches the API output
     expectations.
+
+    The outputs are taken from those cached for the stack if possible, unless
+    refresh_outputs is True.
     '''
     updated_time = stack.updated_time and stack.updated_time.isoformat()
     created_time = stack.created_time or timeutils.utcnow()
@@ -139,8 +143,56 @@ def format_stack(stack, preview=False):
 
     # allow users to view the outputs of stacks
     if (stack.action != stack.DELETE and stack.status != stack.IN_PROGRESS):
-        info[rpc_api.STACK_OUTPUTS] = format_stack_outputs(stack,
-                                                           stack.outputs)
+        outputs = None if refresh_outputs else stack.cached_outputs
+        if outputs is None:
+            outputs = format_stack_outputs(stack, stack.outputs)
+            if not preview:
+                stack.cache_outputs(outputs)
+        info[rpc_api.STACK_OUTPUTS] = outputs
+
+    return info
+
+
+def format_stack_db_object(stack, template=None):
+    '''
+    Return a summary representation of the given stack object.
+
+    This is built only from the stack's database records, so it does not
+    require the template to be parsed; the description is read directly
+    from the raw template, while the parameters and outputs of the stack
+    are not included. The content of the raw template may be passed in when
+    it has already been fetched, e.g. for a whole page of stacks at once.
+    '''
+    updated_time = stack.updated_at and stack.updated_at.isoformat()
+    deleted_time = stack.deleted_at and stack.deleted_at.isoformat()
+    tags = None
+    if stack.tags:
+        tags = [t.tag for t in stack.tags]
+    if template is None:
+        template = stack.raw_template.template
+    tmpl = template or {}
+    description = tmpl.get('description', tmpl.get('Description',
+                                                   'No description'))
+    info = {
+        rpc_api.STACK_ID: dict(identifier.HeatIdentifier(stack.tenant,
+                                                         stack.name,
+                                                         stack.id)),
+        rpc_api.STACK_NAME: stack.name,
+        rpc_api.STACK_CREATION_TIME: stack.created_at.isoformat(),
+        rpc_api.STACK_UPDATED_TIME: updated_time,
+        rpc_api.STACK_DELETION_TIME: deleted_time,
+        rpc_api.STACK_DESCRIPTION: description,
+        rpc_api.STACK_TMPL_DESCRIPTION: description,
+        rpc_api.STACK_ACTION: stack.action or '',
+        rpc_api.STACK_STATUS: stack.status or '',
+        rpc_api.STACK_STATUS_DATA: stack.status_reason,
+        rpc_api.STACK_DISABLE_ROLLBACK: stack.disable_rollback,
+        rpc_api.STACK_TIMEOUT: stack.timeout,
+        rpc_api.STACK_OWNER: stack.username,
+        rpc_api.STACK_PARENT: stack.owner_id,
+        rpc_api.STACK_USER_PROJECT_ID: stack.stack_user_project_id,
+        rpc_api.STACK_TAGS: tags,
+    }
 
     return info
 
@@ -233,12 +285,13 @@ def format_stack_preview(stack):
     return fmt_stack
 
 
-def format_event(event):
-    stack_identifier = event.stack.identifier()
+def format_event(event, stack_identifier=None):
+    if stack_identifier is None:
+        stack_identifier = event.stack.identifier()
     event_timestamp = event.timestamp or timeutils.utcnow()
 
     result = {
-        rpc_api.EVENT_ID: dict(event.identifier()),
+        rpc_api.EVENT_ID: dict(event.identifier(stack_identifier)),
         rpc_api.EVENT_STACK_ID: dict(stack_identifier),
         rpc_api.EVENT_STACK_NAME: stack_identifier.stack_name,
         rpc_api.EVENT_TIMESTAMP: event_timestamp.isoformat(),
@@ -12,17 +12,115 @@
 #    under the License.
 
 import abc
+import collections
+import functools
+import time
 
 from keystoneclient import auth
 from keystoneclient.auth.identity import v2
 from keystoneclient.auth.identity import v3
 from keystoneclient import exceptions
-from keystoneclient import session
 from oslo_config import cfg
 import six
 
 from heat.common import context
 from heat.common.i18n import _
+from heat.common import session_pool
+
+cfg.CONF.import_opt('client_lookup_cache_size', 'heat.common.config')
+cfg.CONF.import_opt('client_lookup_cache_ttl', 'heat.common.config')
+cfg.CONF.import_opt('client_lookup_engine_cache_ttl', 'heat.common.config')
+
+
+class LookupCache(object):
+    '''
+    A size- and time-bounded cache of the results of client lookups.
+
+    Entries expire ttl seconds after they were stored, and the least recently
+    used entries are discarded once there are more than max_size of them.
+    Lookups that raise an exception are not cached.
+    '''
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def get(self, key, lookup):
+        '''Return the cached result for key, calling lookup() on a miss.'''
+        now = time.time()
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            self._entries[key] = entry
+            return entry[1]
+
+        self.misses += 1
+        value = lookup()
+        if self.max_size > 0 and self.ttl > 0:
+            self._entries[key] = (now + self.ttl, value)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_engine_lookup_cache = None
+
+
+def engine_lookup_cache():
+    '''
+    Return the lookup cache shared by all the stack operations of the engine.
+
+    Returns None when the engine-wide cache is disabled.
+    '''
+    global _engine_lookup_cache
+
+    ttl = cfg.CONF.client_lookup_engine_cache_ttl
+    max_size = cfg.CONF.client_lookup_cache_size
+    if ttl <= 0 or max_size <= 0:
+        _engine_lookup_cache = None
+    elif (_engine_lookup_cache is None or
+            _engine_lookup_cache.ttl != ttl or
+            _engine_lookup_cache.max_size != max_size):
+        _engine_lookup_cache = LookupCache(max_size, ttl)
+    return _engine_lookup_cache
+
+
+def memoized_lookup(func):
+    '''
+    Decorator caching the results of a name to ID lookup of a client plugin.
+
+    Results are reused for the lifetime of the plugin (i.e. of the request
+    context, so a stack operation), and optionally shared with the other
+    operations of the same user through the engine-wide cache. The decorated
+    method must only take hashable positional arguments.
+    '''
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        key = (func.__name__,) + args
+        try:
+            hash(key)
+        except TypeError:
+            return func(self, *args)
+
+        def lookup():
+            engine_cache = engine_lookup_cache()
+            if engine_cache is None:
+                return func(self, *args)
+            return engine_cache.get(self._lookup_scope() + key,
+                                    lambda: func(self, *args))
+
+        return self.lookup_cache.get(key, lookup)
+
+    return wrapper
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -37,20 +135,38 @@ class ClientPlugin(object):
         self.clients = context.clients
         self._client = None
         self._keystone_session_obj = None
+        self._lookup_cache = None
+
+    @property
+    def lookup_cache(self):
+        '''The cache of the lookups made with this plugin's context.'''
+        if self._lookup_cache is None:
+            self._lookup_cache = LookupCache(
+                cfg.CONF.client_lookup_cache_size,
+                cfg.CONF.client_lookup_cache_ttl)
+        return self._lookup_cache
+
+    def _lookup_scope(self):
+        # Lookup results may depend on the visibility of the resources to the
+        # user (private flavors and images, per-user key pairs, ...), so the
+        # results are only shared between contexts of the same user.
+        return (type(self).__name__,
+                self.context.region_name or cfg.CONF.region_name_for_services,
+                self.context.tenant_id, self.context.user_id,
+                self.context.trust_id)
 
     @property
     def _keystone_session(self):
-        # FIXME(jamielennox): This session object is essentially static as the
-        # options won't change. Further it is allowed to be shared by multiple
-        # authentication requests so there is no reason to construct it fresh
-        # for every client plugin. It should be global and shared amongst them.
+        # The session of each plugin is cheap to construct, as the connection
+        # pool behind it is shared by every plugin in the process, and can
+        # be given the authentication plugin of this context.
         if not self._keystone_session_obj:
             o = {'cacert': self._get_client_option('keystone', 'ca_file'),
                  'insecure': self._get_client_option('keystone', 'insecure'),
                  'cert': self._get_client_option('keystone', 'cert_file'),
                  'key': self._get_client_option('keystone', 'key_file')}
 
-            self._keystone_session_obj = session.Session.construct(o)
+            self._keystone_session_obj = session_pool.get_session(o)
 
         return self._keystone_session_obj
 
@@ -166,6 +282,10 @@ class ClientPlugin(object):
         """Returns True if the exception is a conflict."""
         return False
 
+    def is_transient_error(self, ex):
+        '''Returns True if the request may succeed if it is retried later.'''
+        return self.is_over_limit(ex)
+
     def ignore_not_found(self, ex):
         '''Raises the exception unless it is a not-found.'''
         if not self.is_not_found(ex):
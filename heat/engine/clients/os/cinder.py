@@ -21,6 +21,7 @@ from heat.common import exception
 from heat.common.i18n import _
 from heat.common.i18n import _LI
 from heat.engine.clients import client_plugin
+from heat.engine.clients import status_poller
 from heat.engine import constraints
 from heat.engine import resource
 
@@ -32,6 +33,8 @@ class CinderClientPlugin(client_plugin.ClientPlugin):
 
     exceptions_module = exceptions
 
+    _volume_poller = None
+
     def get_volume_api_version(self):
         '''Returns the most recent API version.'''
 
@@ -95,6 +98,17 @@ class CinderClientPlugin(client_plugin.ClientPlugin):
                      {'volume': volume, 'ex': ex})
             raise exception.EntityNotFound(entity='Volume', name=volume)
 
+    @property
+    def volume_poller(self):
+        '''The poller of the volumes being waited for in this context.'''
+        if self._volume_poller is None:
+            self._volume_poller = status_poller.BulkStatusPoller(
+                lambda volume_ids, since: self.client().volumes.list(),
+                lambda volume_id: self.client().volumes.get(volume_id),
+                lambda volume: volume.status,
+                is_transient_error=self.is_transient_error)
+        return self._volume_poller
+
     def get_volume_snapshot(self, snapshot):
         try:
             return self.client().volume_snapshots.get(snapshot)
@@ -130,6 +144,11 @@ class CinderClientPlugin(client_plugin.ClientPlugin):
         return (isinstance(ex, exceptions.ClientException) and
                 ex.code == 409)
 
+    def is_transient_error(self, ex):
+        return (self.is_over_limit(ex) or
+                (isinstance(ex, exceptions.ClientException) and
+                 ex.code in (500, 503)))
+
     def check_detach_volume_complete(self, vol_id):
         try:
             vol = self.client().volumes.get(vol_id)
@@ -58,6 +58,7 @@ class GlanceClientPlugin(client_plugin.ClientPlugin):
     def is_conflict(self, ex):
         return isinstance(ex, exc.HTTPConflict)
 
+    @client_plugin.memoized_lookup
     def get_image_id(self, image_identifier):
         '''
         Return an id for the specified image name or identifier.
@@ -22,13 +22,19 @@ from oslo_utils import uuidutils
 
 from heat.common import exception
 from heat.engine.clients import client_plugin
+from heat.engine.clients import status_poller
 from heat.engine import constraints
 
 
+PORT_LIST_CHUNK_SIZE = 100
+
+
 class NeutronClientPlugin(client_plugin.ClientPlugin):
 
     exceptions_module = exceptions
 
+    _port_poller = None
+
     def _create(self):
 
         con = self.context
@@ -67,9 +73,39 @@ class NeutronClientPlugin(client_plugin.ClientPlugin):
             return False
         return ex.status_code == 413
 
+    def is_transient_error(self, ex):
+        return (isinstance(ex, exceptions.NeutronClientException) and
+                ex.status_code in (413, 500, 503))
+
     def is_no_unique(self, ex):
         return isinstance(ex, exceptions.NeutronClientNoUniqueMatch)
 
+    @property
+    def port_poller(self):
+        '''The poller of the ports being waited for in this context.'''
+        if self._port_poller is None:
+            self._port_poller = status_poller.BulkStatusPoller(
+                self._list_ports,
+                lambda port_id: self.client().show_port(port_id)['port'],
+                lambda port: port['status'],
+                get_id=lambda port: port['id'],
+                is_transient_error=self.is_transient_error)
+        return self._port_poller
+
+    def _list_ports(self, port_ids, since):
+        # Every ID is a separate query parameter, so they are listed in
+        # chunks to keep the request URI below the client's limit.
+        ports = []
+        for i in six.moves.range(0, len(port_ids), PORT_LIST_CHUNK_SIZE):
+            ports.extend(self.client().list_ports(
+                id=port_ids[i:i + PORT_LIST_CHUNK_SIZE])['ports'])
+        return ports
+
+    @client_plugin.memoized_lookup
+    def find_resourceid_by_name_or_id(self, resource, name_or_id):
+        return neutronV20.find_resourceid_by_name_or_id(
+            self.client(), resource, name_or_id)
+
     def find_neutron_resource(self, props, key, key_type):
         return neutronV20.find_resourceid_by_name_or_id(
             self.client(), key_type, props.get(key))
@@ -139,13 +175,13 @@ class NetworkConstraint(constraints.BaseCustomConstraint):
 
     def validate_with_client(self, client, value):
         try:
-            neutron_client = client.client('neutron')
+            client.client('neutron')
         except Exception:
             # is not using neutron
             client.client_plugin('nova').get_nova_network_id(value)
         else:
-            neutronV20.find_resourceid_by_name_or_id(
-                neutron_client, 'network', value)
+            client.client_plugin('neutron').find_resourceid_by_name_or_id(
+                'network', value)
 
 
 class PortConstraint(constraints.BaseCustomConstraint):
@@ -153,9 +189,8 @@ class PortConstraint(constraints.BaseCustomConstraint):
     expected_exceptions = (exceptions.NeutronClientException,)
 
     def validate_with_client(self, client, value):
-        neutron_client = client.client('neutron')
-        neutronV20.find_resourceid_by_name_or_id(
-            neutron_client, 'port', value)
+        client.client_plugin('neutron').find_resourceid_by_name_or_id(
+            'port', value)
 
 
 class RouterConstraint(constraints.BaseCustomConstraint):
@@ -163,9 +198,8 @@ class RouterConstraint(constraints.BaseCustomConstraint):
     expected_exceptions = (exceptions.NeutronClientException,)
 
     def validate_with_client(self, client, value):
-        neutron_client = client.client('neutron')
-        neutronV20.find_resourceid_by_name_or_id(
-            neutron_client, 'router', value)
+        client.client_plugin('neutron').find_resourceid_by_name_or_id(
+            'router', value)
 
 
 class SubnetConstraint(constraints.BaseCustomConstraint):
@@ -173,9 +207,8 @@ class SubnetConstraint(constraints.BaseCustomConstraint):
     expected_exceptions = (exceptions.NeutronClientException,)
 
     def validate_with_client(self, client, value):
-        neutron_client = client.client('neutron')
-        neutronV20.find_resourceid_by_name_or_id(
-            neutron_client, 'subnet', value)
+        client.client_plugin('neutron').find_resourceid_by_name_or_id(
+            'subnet', value)
 
 
 class IPConstraint(constraints.BaseCustomConstraint):
@@ -12,8 +12,8 @@
 #    under the License.
 
 import collections
+import datetime
 import email
-from email.mime import multipart
 from email.mime import text
 import logging
 import os
@@ -34,6 +34,7 @@ from heat.common.i18n import _
 from heat.common.i18n import _LI
 from heat.common.i18n import _LW
 from heat.engine.clients import client_plugin
+from heat.engine.clients import status_poller
 from heat.engine import constraints
 from heat.engine import resource
 from heat.engine import scheduler
@@ -44,6 +45,126 @@ LOG = logging.getLogger(__name__)
 NOVACLIENT_VERSION = "2"
 
 
+# The encoded cloud-init MIME parts that are the same for every server, by
+# instance user, user data format and configuration
+_CLOUDINIT_CACHE_SIZE = 32
+_cloudinit_cache = collections.OrderedDict()
+
+
+def _read_cloudinit_file(fn):
+    return pkgutil.get_data('heat', 'cloudinit/%s' % fn)
+
+
+def _make_subpart(content, filename, subtype=None):
+    if subtype is None:
+        subtype = os.path.splitext(filename)[0]
+    msg = text.MIMEText(content, _subtype=subtype)
+    msg.add_header('Content-Disposition', 'attachment',
+                   filename=filename)
+    return msg.as_string()
+
+
+def _make_multipart(subparts):
+    '''
+    Return a multipart/mixed MIME message made of the encoded subparts.
+
+    This matches MIMEMultipart(_subparts=...).as_string(), without encoding
+    the subparts again.
+    '''
+    boundary = None
+    while boundary is None or any(boundary in part for part in subparts):
+        boundary = '=' * 15 + uuidutils.generate_uuid().replace('-', '')
+    delimiter = '--%s' % boundary
+
+    lines = ['Content-Type: multipart/mixed; boundary="%s"' % boundary,
+             'MIME-Version: 1.0',
+             '']
+    for part in subparts:
+        lines.extend([delimiter, part])
+    lines.extend([delimiter + '--', ''])
+    return '\n'.join(lines)
+
+
+def _cloudinit_subparts(instance_user, user_data_format, config):
+    '''
+    Return the MIME parts of the user data that do not depend on the server.
+
+    They are returned as the tuples of the parts preceding the user data,
+    those between the user data and the metadata, and those following the
+    metadata. The parts are rendered and encoded once for each combination
+    of the arguments.
+    '''
+    key = (instance_user, user_data_format, config)
+    parts = _cloudinit_cache.pop(key, None)
+    if parts is None:
+        parts = _render_cloudinit_subparts(*key)
+    _cloudinit_cache[key] = parts
+    while len(_cloudinit_cache) > _CLOUDINIT_CACHE_SIZE:
+        _cloudinit_cache.popitem(last=False)
+    return parts
+
+
+def _render_cloudinit_subparts(instance_user, user_data_format, config):
+    watch_server_url, metadata_server_url, is_secure, vcerts = config
+    is_cfntools = user_data_format == 'HEAT_CFNTOOLS'
+
+    if instance_user:
+        config_custom_user = 'user: %s' % instance_user
+        # FIXME(shadower): compatibility workaround for cloud-init 0.6.3.
+        # We can drop this once we stop supporting 0.6.3 (which ships
+        # with Ubuntu 12.04 LTS).
+        #
+        # See bug https://bugs.launchpad.net/heat/+bug/1257410
+        boothook_custom_user = r"""useradd -m %s
+echo -e '%s\tALL=(ALL)\tNOPASSWD: ALL' >> /etc/sudoers
+""" % (instance_user, instance_user)
+    else:
+        config_custom_user = ''
+        boothook_custom_user = ''
+
+    cloudinit_config = string.Template(
+        _read_cloudinit_file('config')).safe_substitute(
+            add_custom_user=config_custom_user)
+    cloudinit_boothook = string.Template(
+        _read_cloudinit_file('boothook.sh')).safe_substitute(
+            add_custom_user=boothook_custom_user)
+
+    head = [(cloudinit_config, 'cloud-config'),
+            (cloudinit_boothook, 'boothook.sh', 'cloud-boothook'),
+            (_read_cloudinit_file('part_handler.py'),
+             'part-handler.py')]
+
+    middle = []
+    if is_cfntools:
+        middle.append((_read_cloudinit_file('loguserdata.py'),
+                      'loguserdata.py', 'x-shellscript'))
+
+    tail = [(watch_server_url, 'cfn-watch-server', 'x-cfninitdata')]
+
+    if is_cfntools:
+        tail.append((metadata_server_url,
+                     'cfn-metadata-server', 'x-cfninitdata'))
+
+        # Create a boto config which the cfntools on the host use to know
+        # where the cfn and cw API's are to be accessed
+        cfn_url = urlparse.urlparse(metadata_server_url)
+        cw_url = urlparse.urlparse(watch_server_url)
+        boto_cfg = "\n".join(["[Boto]",
+                              "debug = 0",
+                              "is_secure = %s" % is_secure,
+                              "https_validate_certificates = %s" % vcerts,
+                              "cfn_region_name = heat",
+                              "cfn_region_endpoint = %s" %
+                              cfn_url.hostname,
+                              "cloudwatch_region_name = heat",
+                              "cloudwatch_region_endpoint = %s" %
+                              cw_url.hostname])
+        tail.append((boto_cfg, 'cfn-boto-cfg', 'x-cfninitdata'))
+
+    return tuple(tuple(_make_subpart(*args) for args in attachments)
+                 for attachments in (head, middle, tail))
+
+
 class NovaClientPlugin(client_plugin.ClientPlugin):
 
     deferred_server_statuses = ['BUILD',
@@ -59,6 +180,8 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
 
     exceptions_module = exceptions
 
+    _server_poller = None
+
     def _create(self):
         endpoint_type = self._get_client_option('nova', 'endpoint_type')
         management_url = self.url_for(service_type='compute',
@@ -93,6 +216,12 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
     def is_over_limit(self, ex):
         return isinstance(ex, exceptions.OverLimit)
 
+    def is_transient_error(self, ex):
+        return (self.is_over_limit(ex) or
+                (isinstance(ex, exceptions.ClientException) and
+                 getattr(ex, 'http_status', getattr(ex, 'code', None)) in
+                 (500, 503)))
+
     def is_bad_request(self, ex):
         return isinstance(ex, exceptions.BadRequest)
 
@@ -170,6 +299,22 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
             else:
                 raise
 
+    @property
+    def server_poller(self):
+        """The poller of the servers being waited for in this context."""
+        if self._server_poller is None:
+            self._server_poller = status_poller.BulkStatusPoller(
+                self._list_servers, self.fetch_server, self.get_status,
+                is_transient_error=self.is_transient_error)
+        return self._server_poller
+
+    def _list_servers(self, server_ids, since):
+        # Nova can't filter servers by a list of IDs, but the servers being
+        # waited for have all changed since the first of them was created.
+        changes_since = datetime.datetime.utcfromtimestamp(since)
+        return self.client().servers.list(
+            search_opts={'changes-since': changes_since.isoformat()})
+
     def get_ip(self, server, net_type, ip_version):
         """Return the server's IP of the given type and version."""
         if net_type in server.addresses:
@@ -199,6 +344,20 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
         """
         # not checking with is_uuid_like as most tests use strings e.g. '1234'
         if isinstance(server, six.string_types):
+            server_id = server
+        else:
+            server_id = server.id
+
+        if self.server_poller.watch(server_id):
+            latest = self.server_poller.get(server_id)
+            if latest is None:
+                return False
+            elif isinstance(server, six.string_types):
+                server = latest
+            elif latest is not server:
+                server._add_details(latest._info)
+            status = self.get_status(server)
+        elif isinstance(server, six.string_types):
             server = self.fetch_server(server)
             if server is None:
                 return False
@@ -212,7 +371,9 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
 
         if status in self.deferred_server_statuses:
             return False
-        elif status == 'ACTIVE':
+
+        self.server_poller.done(server_id)
+        if status == 'ACTIVE':
             return True
         elif status == 'ERROR':
             fault = getattr(server, 'fault', {})
@@ -227,6 +388,7 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
                 resource_status=server.status,
                 result=_('%s is not active') % res_name)
 
+    @client_plugin.memoized_lookup
     def get_flavor_id(self, flavor):
         '''
         Get the id for the specified flavor name.
@@ -249,6 +411,7 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
             raise exception.FlavorMissing(flavor_id=flavor)
         return flavor_id
 
+    @client_plugin.memoized_lookup
     def get_keypair(self, key_name):
         '''
         Get the public key specified by :key_name:
@@ -285,43 +448,15 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
         is_cfntools = user_data_format == 'HEAT_CFNTOOLS'
         is_software_config = user_data_format == 'SOFTWARE_CONFIG'
 
-        def make_subpart(content, filename, subtype=None):
-            if subtype is None:
-                subtype = os.path.splitext(filename)[0]
-            msg = text.MIMEText(content, _subtype=subtype)
-            msg.add_header('Content-Disposition', 'attachment',
-                           filename=filename)
-            return msg
-
-        def read_cloudinit_file(fn):
-            return pkgutil.get_data('heat', 'cloudinit/%s' % fn)
-
-        if instance_user:
-            config_custom_user = 'user: %s' % instance_user
-            # FIXME(shadower): compatibility workaround for cloud-init 0.6.3.
-            # We can drop this once we stop supporting 0.6.3 (which ships
-            # with Ubuntu 12.04 LTS).
-            #
-            # See bug https://bugs.launchpad.net/heat/+bug/1257410
-            boothook_custom_user = r"""useradd -m %s
-echo -e '%s\tALL=(ALL)\tNOPASSWD: ALL' >> /etc/sudoers
-""" % (instance_user, instance_user)
-        else:
-            config_custom_user = ''
-            boothook_custom_user = ''
-
-        cloudinit_config = string.Template(
-            read_cloudinit_file('config')).safe_substitute(
-                add_custom_user=config_custom_user)
-        cloudinit_boothook = string.Template(
-            read_cloudinit_file('boothook.sh')).safe_substitute(
-                add_custom_user=boothook_custom_user)
-
-        attachments = [(cloudinit_config, 'cloud-config'),
-                       (cloudinit_boothook, 'boothook.sh', 'cloud-boothook'),
-                       (read_cloudinit_file('part_handler.py'),
-                        'part-handler.py')]
+        conf = cfg.CONF
+        config = ('%s' % conf.heat_watch_server_url,
+                  '%s' % conf.heat_metadata_server_url,
+                  '%s' % conf.instance_connection_is_secure,
+                  '%s' % conf.instance_connection_https_validate_certificates)
+        head, middle, tail = _cloudinit_subparts(instance_user,
+                                                 user_data_format, config)
 
+        attachments = []
         if is_cfntools:
             attachments.append((userdata, 'cfn-userdata', 'x-cfninitdata'))
         elif is_software_config:
@@ -340,44 +475,16 @@ echo -e '%s\tALL=(ALL)\tNOPASSWD: ALL' >> /etc/sudoers
             else:
                 attachments.append((userdata, 'userdata', 'x-shellscript'))
 
-        if is_cfntools:
-            attachments.append((read_cloudinit_file('loguserdata.py'),
-                               'loguserdata.py', 'x-shellscript'))
+        subparts = list(head)
+        subparts.extend(_make_subpart(*args) for args in attachments)
+        subparts.extend(middle)
 
         if metadata:
-            attachments.append((jsonutils.dumps(metadata),
-                                'cfn-init-data', 'x-cfninitdata'))
+            subparts.append(_make_subpart(jsonutils.dumps(metadata),
+                                          'cfn-init-data', 'x-cfninitdata'))
+        subparts.extend(tail)
 
-        attachments.append((cfg.CONF.heat_watch_server_url,
-                            'cfn-watch-server', 'x-cfninitdata'))
-
-        if is_cfntools:
-            attachments.append((cfg.CONF.heat_metadata_server_url,
-                                'cfn-metadata-server', 'x-cfninitdata'))
-
-            # Create a boto config which the cfntools on the host use to know
-            # where the cfn and cw API's are to be accessed
-            cfn_url = urlparse.urlparse(cfg.CONF.heat_metadata_server_url)
-            cw_url = urlparse.urlparse(cfg.CONF.heat_watch_server_url)
-            is_secure = cfg.CONF.instance_connection_is_secure
-            vcerts = cfg.CONF.instance_connection_https_validate_certificates
-            boto_cfg = "\n".join(["[Boto]",
-                                  "debug = 0",
-                                  "is_secure = %s" % is_secure,
-                                  "https_validate_certificates = %s" % vcerts,
-                                  "cfn_region_name = heat",
-                                  "cfn_region_endpoint = %s" %
-                                  cfn_url.hostname,
-                                  "cloudwatch_region_name = heat",
-                                  "cloudwatch_region_endpoint = %s" %
-                                  cw_url.hostname])
-            attachments.append((boto_cfg,
-                                'cfn-boto-cfg', 'x-cfninitdata'))
-
-        subparts = [make_subpart(*args) for args in attachments]
-        mime_blob = multipart.MIMEMultipart(_subparts=subparts)
-
-        return mime_blob.as_string()
+        return _make_multipart(subparts)
 
     def delete_server(self, server):
         '''
@@ -543,6 +650,7 @@ echo -e '%s\tALL=(ALL)\tNOPASSWD: ALL' >> /etc/sudoers
 
         return ConsoleUrls(server)
 
+    @client_plugin.memoized_lookup
     def get_net_id_by_label(self, label):
         try:
             net_id = self.client().networks.find(label=label).id
@@ -556,6 +664,7 @@ echo -e '%s\tALL=(ALL)\tNOPASSWD: ALL' >> /etc/sudoers
             raise exception.PhysicalResourceNameAmbiguity(name=label)
         return net_id
 
+    @client_plugin.memoized_lookup
     def get_nova_network_id(self, net_identifier):
         if uuidutils.is_uuid_like(net_identifier):
             try:
@@ -0,0 +1,171 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+from oslo_config import cfg
+from oslo_log import log as logging
+
+from heat.common.i18n import _LW
+
+cfg.CONF.import_opt('bulk_status_poll_threshold', 'heat.common.config')
+cfg.CONF.import_opt('bulk_status_poll_max_interval', 'heat.common.config')
+
+LOG = logging.getLogger(__name__)
+
+
+MIN_INTERVAL = 1
+SINCE_MARGIN = 60
+
+
+class BulkStatusPoller(object):
+    '''
+    Poll the status of many resources of one type with a single list call.
+
+    Resources being waited for are registered with watch(). Once at least
+    bulk_status_poll_threshold of them are watched, their latest state comes
+    from a listing made at most once per polling interval, which is shared by
+    all the resources waiting on the poller. The interval is reset whenever
+    the status of a watched resource changes, and doubles otherwise, up to
+    bulk_status_poll_max_interval. Resources missing from a listing are
+    fetched individually. If a listing fails with a transient error, the
+    results of the previous listing are kept and the interval is doubled.
+
+    :param list_resources: called with the IDs of the watched resources and
+        the timestamp before which they were all created, it returns the
+        current objects for (at least) those resources.
+    :param get_resource: called with a resource ID, it returns the current
+        object for that resource or None.
+    :param get_status: called with an object, it returns its status.
+    :param get_id: called with an object, it returns its ID.
+    :param is_transient_error: called with an exception raised by
+        list_resources, it returns True if the error can be tolerated.
+    '''
+
+    def __init__(self, list_resources, get_resource, get_status,
+                 get_id=lambda res: res.id,
+                 is_transient_error=lambda ex: False):
+        self._list_resources = list_resources
+        self._get_resource = get_resource
+        self._get_status = get_status
+        self._get_id = get_id
+        self._is_transient_error = is_transient_error
+        self._watched = {}
+        self._results = {}
+        self._missing = set()
+        self._next_poll = 0
+        self.interval = MIN_INTERVAL
+        self.polls = 0
+        self.fetches = 0
+
+    @property
+    def max_interval(self):
+        return max(cfg.CONF.bulk_status_poll_max_interval, MIN_INTERVAL)
+
+    def watch(self, res_id):
+        '''
+        Register a resource being waited for.
+
+        Returns True if the watched resources are polled in bulk.
+        '''
+        now = time.time()
+        first_seen = self._watched.get(res_id, (now, now))[0]
+        self._watched[res_id] = (first_seen, now)
+        return len(self._watched) >= cfg.CONF.bulk_status_poll_threshold
+
+    def done(self, res_id):
+        '''Stop watching a resource that is no longer waited for.'''
+        self._watched.pop(res_id, None)
+        self._results.pop(res_id, None)
+        self._missing.discard(res_id)
+
+    def get(self, res_id):
+        '''
+        Return the latest object from the bulk listings for a resource.
+
+        A listing is made if one is due. None is returned if no listing has
+        included the resource yet.
+        '''
+        if res_id not in self._watched:
+            self.watch(res_id)
+        if time.time() >= self._next_poll:
+            self.poll()
+
+        if res_id in self._missing:
+            self._missing.discard(res_id)
+            self.fetches += 1
+            return self._get_resource(res_id)
+        return self._results.get(res_id)
+
+    def fetch(self, res_id):
+        '''
+        Return the current object for a resource being waited for.
+
+        The object comes from the bulk listings if enough resources are
+        watched (and may be None until the resource is listed), or else
+        from an individual request.
+        '''
+        if self.watch(res_id):
+            return self.get(res_id)
+        self.fetches += 1
+        return self._get_resource(res_id)
+
+    def poll(self):
+        '''List the watched resources and record their latest objects.'''
+        now = time.time()
+        # Forget about resources that are no longer being waited for, e.g.
+        # because their creation was cancelled.
+        expiry = now - max(3 * self.max_interval, SINCE_MARGIN)
+        for res_id, (first_seen, last_seen) in list(self._watched.items()):
+            if last_seen < expiry:
+                self.done(res_id)
+        if not self._watched:
+            return
+
+        # Other threads waiting on the poller use the results of this poll
+        # rather than making their own.
+        self._next_poll = now + self.interval
+        since = min(first for first, last in self._watched.values())
+        try:
+            resources = self._list_resources(list(self._watched),
+                                             since - SINCE_MARGIN)
+        except Exception as ex:
+            if not self._is_transient_error(ex):
+                raise
+            LOG.warn(_LW('Received the following exception when listing '
+                         'the status of %(count)d resources: %(exception)s'),
+                     {'count': len(self._watched), 'exception': ex})
+            self.interval = min(2 * self.interval, self.max_interval)
+            self._next_poll = now + self.interval
+            return
+        self.polls += 1
+
+        changed = False
+        listed = set()
+        for res in resources:
+            res_id = self._get_id(res)
+            if res_id not in self._watched:
+                continue
+            listed.add(res_id)
+            previous = self._results.get(res_id)
+            if (previous is None or
+                    self._get_status(previous) != self._get_status(res)):
+                changed = True
+            self._results[res_id] = res
+        self._missing = set(self._watched) - listed
+
+        if changed:
+            self.interval = MIN_INTERVAL
+        else:
+            self.interval = min(2 * self.interval, self.max_interval)
+        self._next_poll = now + self.interval
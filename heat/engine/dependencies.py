@@ -165,16 +165,22 @@ class Graph(collections.defaultdict):
 
         This is a destructive operation for the graph.
         '''
-        for iteration in six.moves.xrange(len(graph)):
-            for key, node in six.iteritems(graph):
-                if not node:
-                    yield key
-                    del graph[key]
-                    break
-            else:
-                # There are nodes remaining, but none without
-                # dependencies: a cycle
-                raise CircularDependencyException(cycle=six.text_type(graph))
+        ready = collections.deque(key for key, node in six.iteritems(graph)
+                                  if not node)
+        while ready:
+            key = ready.popleft()
+            node = graph[key]
+            yield key
+            del graph[key]
+
+            for rqr in node.required_by():
+                if rqr in graph and not graph[rqr]:
+                    ready.append(rqr)
+
+        if graph:
+            # There are nodes remaining, but none without
+            # dependencies: a cycle
+            raise CircularDependencyException(cycle=six.text_type(graph))
 
 
 class Dependencies(object):
@@ -187,12 +193,14 @@ class Dependencies(object):
         '''
         edges = edges or []
         self._graph = Graph()
+        self._order = None
         for e in edges:
             self += e
 
     def __iadd__(self, edge):
         '''Add another edge, in the form of a (requirer, required) tuple.'''
         requirer, required = edge
+        self._order = None
 
         if required is None:
             # Just ensure the node is created by accessing the defaultdict
@@ -229,23 +237,20 @@ class Dependencies(object):
         if last not in self._graph:
             raise KeyError
 
-        def get_edges(key):
-            def requirer_edges(rqr):
-                # Concatenate the dependency on the current node with the
-                # recursive generated list
-                return itertools.chain([(rqr, key)], get_edges(rqr))
-
-            # Get the edge list for each node that requires the current node
-            edge_lists = six.moves.map(requirer_edges,
-                                       self._graph[key].required_by())
-            # Combine the lists into one long list
-            return itertools.chain.from_iterable(edge_lists)
-
         if self._graph[last].stem():
             # Nothing requires this, so just add the node itself
             edges = [(last, None)]
         else:
-            edges = get_edges(last)
+            edges = []
+            visited = set([last])
+            queue = collections.deque([last])
+            while queue:
+                key = queue.popleft()
+                for rqr in self._graph[key].required_by():
+                    edges.append((rqr, key))
+                    if rqr not in visited:
+                        visited.add(rqr)
+                        queue.append(rqr)
 
         return Dependencies(edges)
 
@@ -293,10 +298,22 @@ class Dependencies(object):
         else:
             return self._graph.copy()
 
+    def _toposorted(self, reverse=False):
+        '''
+        Iterate over the nodes in topological order.
+
+        The order is calculated once and cached until another edge is added.
+        '''
+        if self._order is None:
+            self._order = tuple(Graph.toposort(self.graph()))
+
+        for key in (reversed(self._order) if reverse else self._order):
+            yield key
+
     def __iter__(self):
         '''Return a topologically sorted iterator.'''
-        return Graph.toposort(self.graph())
+        return self._toposorted()
 
     def __reversed__(self):
         '''Return a reverse topologically sorted iterator.'''
-        return Graph.toposort(self.graph(reverse=True))
+        return self._toposorted(reverse=True)
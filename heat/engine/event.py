@@ -11,13 +11,28 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+import uuid
+
+import eventlet
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import timeutils
 import six
 
+from heat.common import context as heat_context
 from heat.common import exception
 from heat.common.i18n import _
+from heat.common.i18n import _LE
 from heat.common import identifier
 from heat.objects import event as event_object
 
+cfg.CONF.import_opt('strict_event_store', 'heat.common.config')
+cfg.CONF.import_opt('event_flush_interval', 'heat.common.config')
+cfg.CONF.import_opt('event_flush_batch_size', 'heat.common.config')
+
+LOG = logging.getLogger(__name__)
+
 
 class Event(object):
     '''Class representing a Resource state change.'''
@@ -60,7 +75,17 @@ class Event(object):
         st = (stack if stack is not None else
               parser.Stack.load(context, ev.stack_id))
 
-        return cls(context, st, ev.resource_action, ev.resource_status,
+        return cls.from_db_object(context, ev, st)
+
+    @classmethod
+    def from_db_object(cls, context, ev, stack=None):
+        '''
+        Create an Event from a database object without loading its Stack.
+
+        An Event created without a stack can only be identified by passing the
+        stack's identifier to identifier().
+        '''
+        return cls(context, stack, ev.resource_action, ev.resource_status,
                    ev.resource_status_reason, ev.physical_resource_id,
                    ev.resource_properties, ev.resource_name,
                    ev.resource_type, ev.uuid, ev.created_at, ev.id)
@@ -84,16 +109,84 @@ class Event(object):
         if self.timestamp is not None:
             ev['created_at'] = self.timestamp
 
+        if not cfg.CONF.strict_event_store:
+            # The ID is not known until the event is written, but generate
+            # the other values that the database would otherwise fill in so
+            # that they reflect when the event actually occurred.
+            if self.uuid is None:
+                self.uuid = str(uuid.uuid4())
+            if self.timestamp is None:
+                self.timestamp = timeutils.utcnow()
+            ev['uuid'] = self.uuid
+            ev['created_at'] = self.timestamp
+            _event_buffer.add(ev)
+            return None
+
         new_ev = event_object.Event.create(self.context, ev)
         self.id = new_ev.id
         return self.id
 
-    def identifier(self):
+    def identifier(self, stack_identifier=None):
         '''Return a unique identifier for the event.'''
         if self.uuid is None:
             return None
 
+        if stack_identifier is None:
+            stack_identifier = self.stack.identifier()
+
         res_id = identifier.ResourceIdentifier(
-            resource_name=self.resource_name, **self.stack.identifier())
+            resource_name=self.resource_name, **stack_identifier)
 
         return identifier.EventIdentifier(event_id=str(self.uuid), **res_id)
+
+
+class EventBuffer(object):
+    '''
+    Buffer of events waiting to be written to the database in batches.
+
+    Events are written once event_flush_batch_size of them have been added,
+    or at most event_flush_interval seconds after the first of them was.
+    '''
+
+    def __init__(self):
+        self._events = []
+        self._timer = None
+        self._flush_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._events)
+
+    def add(self, values):
+        '''Add the values of an event to be stored.'''
+        self._events.append(values)
+        if len(self._events) >= cfg.CONF.event_flush_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = eventlet.spawn_after(cfg.CONF.event_flush_interval,
+                                               self.flush)
+
+    def flush(self):
+        '''Write all of the buffered events to the database.'''
+        # Holding the lock while writing keeps the events in order.
+        with self._flush_lock:
+            timer, self._timer = self._timer, None
+            if timer is not None and timer is not eventlet.getcurrent():
+                timer.cancel()
+
+            events, self._events = self._events, []
+            if not events:
+                return
+
+            try:
+                event_object.Event.create_all(
+                    heat_context.get_admin_context(), events)
+            except Exception:
+                LOG.exception(_LE('Failed to store %d events'), len(events))
+
+
+_event_buffer = EventBuffer()
+
+
+def flush():
+    '''Write any buffered events to the database.'''
+    _event_buffer.flush()
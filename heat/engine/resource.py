@@ -52,6 +52,9 @@ LOG = logging.getLogger(__name__)
 
 datetime = dt.datetime
 
+# The polling policies of the actions in progress, by resource ID
+_polling_policies = {}
+
 
 def _register_class(resource_type, resource_class):
     resources.global_env().register_class(resource_type, resource_class)
@@ -129,6 +132,11 @@ class Resource(object):
     # Default name to use for calls to self.client()
     default_client_name = None
 
+    # Number of steps (of about a second each) between two calls to the
+    # check_<ACTION>_complete() methods while an action is in progress: the
+    # initial interval, and the maximum it backs off to.
+    check_poll_interval = (1, 5)
+
     def __new__(cls, name, definition, stack):
         '''Create a new Resource of the appropriate class for its type.'''
 
@@ -236,15 +244,18 @@ class Resource(object):
         self._stackref = weakref.ref(stack)
 
     @classmethod
-    def load(cls, context, resource_id, data):
+    def load(cls, context, resource_id, data, load_template=None):
         # FIXME(sirushtim): Import this in global space.
         from heat.engine import stack as stack_mod
+        if load_template is None:
+            load_template = template.Template.load
         db_res = resource_objects.Resource.get_obj(context, resource_id)
-        stack = stack_mod.Stack.load(context, db_res.stack_id, cache_data=data)
+        stack = stack_mod.Stack.load(context, db_res.stack_id, cache_data=data,
+                                     load_template=load_template)
         # NOTE(sirushtim): Because on delete/cleanup operations, we simply
         # update with another template, the stack object won't have the
         # template of the previous stack-run.
-        tmpl = template.Template.load(context, db_res.current_template_id)
+        tmpl = load_template(context, db_res.current_template_id)
         stack_res = tmpl.resource_definitions(stack)[db_res.name]
         resource = cls(db_res.name, stack_res, stack)
         resource._load_data(db_res)
@@ -293,6 +304,7 @@ class Resource(object):
         rs = resource_objects.Resource.get_obj(self.stack.context, self.id)
         rs.update_and_save({'rsrc_metadata': metadata})
         self._rsrc_metadata = metadata
+        self.stack.clear_cached_outputs()
 
     def clear_requirers(self, gone_requires):
         self.requires = set(self.requires) - set(gone_requires)
@@ -579,8 +591,20 @@ class Resource(object):
             handler_data = handler(*args)
             yield
             if callable(check):
-                while not check(handler_data):
-                    yield
+                initial, maximum = self.check_poll_interval
+                policy = scheduler.PollingPolicy(initial, maximum)
+                if self.id is not None:
+                    _polling_policies[self.id] = policy
+                try:
+                    while not check(handler_data):
+                        for step in policy.wait():
+                            yield
+                finally:
+                    if _polling_policies.get(self.id) is policy:
+                        del _polling_policies[self.id]
+                    LOG.debug('%(resource)s %(action)s: %(policy)r',
+                              {'resource': six.text_type(self),
+                               'action': handler_action, 'policy': policy})
 
     @scheduler.wrappertask
     def _do_action(self, action, pre_func=None, resource_data=None):
@@ -1228,6 +1252,9 @@ class Resource(object):
 
         try:
             signal_result = self.handle_signal(details)
+            # The signal may have changed attributes the outputs depend on
+            self.stack.clear_cached_outputs()
+            self._wake_pollers()
             if signal_result:
                 reason_string = "Signal: %s" % signal_result
             else:
@@ -1242,6 +1269,21 @@ class Resource(object):
             failure = exception.ResourceFailure(ex, self)
             raise failure
 
+    def _wake_pollers(self):
+        '''
+        Make any action in progress on this resource, or on the resources
+        that depend on it (e.g. a wait condition on its handle), check for
+        its completion right away.
+        '''
+        if not _polling_policies:
+            return
+        waiting = [self]
+        waiting.extend(self.stack.dependencies.required_by(self))
+        for res in waiting:
+            policy = _polling_policies.get(res.id)
+            if policy is not None:
+                policy.wake()
+
     def handle_update(self, json_snippet=None, tmpl_diff=None, prop_diff=None):
         if prop_diff:
             raise UpdateReplace(self.name)
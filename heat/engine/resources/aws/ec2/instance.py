@@ -349,6 +349,8 @@ class Instance(resource.Resource):
 
     default_client_name = 'nova'
 
+    check_poll_interval = (2, 10)
+
     def __init__(self, name, json_snippet, stack):
         super(Instance, self).__init__(name, json_snippet, stack)
         self.ipaddress = None
@@ -724,7 +726,9 @@ class Instance(resource.Resource):
         Refresh the metadata if new_metadata is None
         '''
         if new_metadata is None:
-            self.metadata_set(self.t.metadata())
+            metadata = self.t.metadata()
+            if metadata != self.metadata_get():
+                self.metadata_set(metadata)
 
     def validate(self):
         '''
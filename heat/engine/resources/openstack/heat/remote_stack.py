@@ -139,7 +139,7 @@ class RemoteStack(resource.Resource):
             tmpl = template_format.parse(self.properties[self.TEMPLATE])
             args = {
                 'template': tmpl,
-                'files': self.stack.t.files,
+                'files': dict(self.stack.t.files),
                 'environment': env.user_env_as_dict(),
             }
             self.heat().stacks.validate(**args)
@@ -160,7 +160,7 @@ class RemoteStack(resource.Resource):
             'timeout_mins': self.properties[self.TIMEOUT],
             'disable_rollback': True,
             'parameters': params,
-            'files': self.stack.t.files,
+            'files': dict(self.stack.t.files),
             'environment': env.user_env_as_dict(),
         }
         remote_stack_id = self.heat().stacks.create(**args)['stack']['id']
@@ -210,7 +210,7 @@ class RemoteStack(resource.Resource):
                 'template': tmpl,
                 'timeout_mins': self.properties[self.TIMEOUT],
                 'disable_rollback': self.stack.disable_rollback,
-                'files': self.stack.t.files,
+                'files': dict(self.stack.t.files),
                 'environment': env.user_env_as_dict(),
             }
             self.heat().stacks.update(**fields)
@@ -345,8 +345,14 @@ class Port(neutron.NeutronResource):
             self.resource_id)['port']
 
     def check_create_complete(self, *args):
-        attributes = self._show_resource()
-        return self.is_built(attributes)
+        poller = self.client_plugin().port_poller
+        attributes = poller.fetch(self.resource_id)
+        if attributes is None:
+            return False
+        if not self.is_built(attributes):
+            return False
+        poller.done(self.resource_id)
+        return True
 
     def handle_delete(self):
         client = self.neutron()
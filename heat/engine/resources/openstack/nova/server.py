@@ -503,6 +503,8 @@ class Server(stack_user.StackUser):
 
     default_client_name = 'nova'
 
+    check_poll_interval = (2, 10)
+
     def __init__(self, name, json_snippet, stack):
         super(Server, self).__init__(name, json_snippet, stack)
         if self.user_data_software_config():
@@ -1156,10 +1158,11 @@ class Server(stack_user.StackUser):
             # attributes referenced in the template metadata may change
             # and the resource itself adds keys to the metadata which
             # are not specified in the template (e.g the deployments data)
-            meta = self.metadata_get(refresh=True) or {}
-            tmpl_meta = self.t.metadata()
-            meta.update(tmpl_meta)
-            self.metadata_set(meta)
+            current_meta = self.metadata_get(refresh=True) or {}
+            meta = dict(current_meta)
+            meta.update(self.t.metadata())
+            if meta != current_meta:
+                self.metadata_set(meta)
 
     @staticmethod
     def _check_maximum(count, maximum, msg):
@@ -48,6 +48,10 @@ class StackResource(resource.Resource):
     # template parsing.
     requires_deferred_auth = True
 
+    # Nested stacks complete as soon as their last resource does, so keep
+    # checking on them often.
+    check_poll_interval = (1, 2)
+
     def __init__(self, name, json_snippet, stack):
         super(StackResource, self).__init__(name, json_snippet, stack)
         self._nested = None
@@ -273,7 +277,7 @@ class StackResource(resource.Resource):
                 name,
                 parsed_template.t,
                 child_env.user_env_as_dict(),
-                parsed_template.files,
+                dict(parsed_template.files),
                 args,
                 owner_id=self.stack.id,
                 user_creds_id=self.stack.user_creds_id,
@@ -418,7 +422,7 @@ class StackResource(resource.Resource):
                 nested_stack.identifier(),
                 parsed_template.t,
                 child_env.user_env_as_dict(),
-                parsed_template.files,
+                dict(parsed_template.files),
                 args)
         except Exception as ex:
             LOG.exception('update_stack')
@@ -516,6 +520,6 @@ class StackResource(resource.Resource):
                         [at for at in self.attributes_schema])
         schema_hash = hashlib.sha256(';'.join(schema_names))
         definition = {'template': self.child_template(),
-                      'files': self.stack.t.files}
+                      'files': dict(self.stack.t.files)}
         definition_hash = hashlib.sha256(jsonutils.dumps(definition))
         return (schema_hash.hexdigest(), definition_hash.hexdigest())
@@ -11,6 +11,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import hashlib
+
+from oslo_config import cfg
 from oslo_serialization import jsonutils
 from requests import exceptions
 import six
@@ -25,11 +29,106 @@ from heat.engine import properties
 from heat.engine.resources import stack_resource
 from heat.engine import template
 
+cfg.CONF.import_opt('max_template_size', 'heat.common.config')
+cfg.CONF.import_opt('template_cache_size', 'heat.common.config')
+
+
+class _TemplateCache(object):
+    '''
+    An engine-wide LRU cache of data derived from the content of provider
+    templates, keyed by its hash.
+
+    Its size is bounded by the template_cache_size option.
+    '''
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def get(self, key, compute):
+        '''Return the cached value for key, calling compute() on a miss.'''
+        try:
+            value = self._entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            value = compute()
+        else:
+            self.hits += 1
+        self._entries[key] = value
+        while len(self._entries) > max(cfg.CONF.template_cache_size, 0):
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_parsed_templates = _TemplateCache()
+_template_schemas = _TemplateCache()
+
+
+def _content_hash(data):
+    if isinstance(data, six.text_type):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def _copy(data):
+    if isinstance(data, dict):
+        return dict((k, _copy(v)) for k, v in six.iteritems(data))
+    if isinstance(data, list):
+        return [_copy(v) for v in data]
+    return data
+
+
+def _parse(data):
+    # The parsed template is shared, so it must not be modified
+    if len(data) > cfg.CONF.max_template_size:
+        # Let the parser report the error
+        return template_format.parse(data)
+    return _parsed_templates.get(_content_hash(data),
+                                 lambda: template_format.parse(data))
+
+
+def parse_template(data):
+    '''
+    Parse the content of a provider template.
+
+    The template is only parsed the first time the same content is seen by
+    the engine; a copy of the result is returned, which the caller may
+    modify.
+    '''
+    return _copy(_parse(data))
+
+
+def template_schemas(data, param_defaults):
+    '''
+    Return the properties and attributes schemas of a provider template.
+
+    The schemas are shared by all the resources using the same template
+    content and parameter defaults, and must not be modified.
+    '''
+    def get_schemas():
+        # param_schemata() sets the defaults in the template, so use a copy
+        tmpl = template.Template(parse_template(data))
+        return TemplateResource.get_schemas(tmpl, param_defaults)
+
+    try:
+        defaults = tuple(sorted(six.iteritems(param_defaults)))
+        key = (_content_hash(data), defaults)
+        hash(key)
+    except TypeError:
+        return get_schemas()
+    return _template_schemas.get(key, get_schemas)
+
 
 def generate_class(name, template_name, env):
     data = TemplateResource.get_template_file(template_name, ('file',))
-    tmpl = template.Template(template_format.parse(data))
-    props, attrs = TemplateResource.get_schemas(tmpl, env.param_defaults)
+    props, attrs = template_schemas(data, env.param_defaults)
     cls = type(name, (TemplateResource,),
                {'properties_schema': props,
                 'attributes_schema': attrs})
@@ -83,7 +182,8 @@ class TemplateResource(stack_resource.StackResource):
     @staticmethod
     def get_template_file(template_name, allowed_schemes):
         try:
-            return urlfetch.get(template_name, allowed_schemes=allowed_schemes)
+            return urlfetch.get_cached(template_name,
+                                       allowed_schemes=allowed_schemes)
         except (IOError, exceptions.RequestException) as r_exc:
             args = {'name': template_name, 'exc': six.text_type(r_exc)}
             msg = _('Could not fetch remote template '
@@ -100,15 +200,18 @@ class TemplateResource(stack_resource.StackResource):
     def _generate_schema(self, definition):
         self._parsed_nested = None
         try:
-            tmpl = template.Template(self.child_template())
+            data = self.template_data()
+            _parse(data)
         except (exception.TemplateNotFound, ValueError) as download_error:
             self.validation_exception = download_error
             tmpl = template.Template(
                 {"HeatTemplateFormatVersion": "2012-12-12"})
+            schemas = self.get_schemas(tmpl, self.stack.env.param_defaults)
+        else:
+            schemas = template_schemas(data, self.stack.env.param_defaults)
 
         # re-generate the properties and attributes from the template.
-        self.properties_schema, self.attributes_schema = self.get_schemas(
-            tmpl, self.stack.env.param_defaults)
+        self.properties_schema, self.attributes_schema = schemas
 
         self.properties = definition.properties(self.properties_schema,
                                                 self.context)
@@ -158,7 +261,7 @@ class TemplateResource(stack_resource.StackResource):
 
     def child_template(self):
         if not self._parsed_nested:
-            self._parsed_nested = template_format.parse(self.template_data())
+            self._parsed_nested = parse_template(self.template_data())
         return self._parsed_nested
 
     def regenerate_info_schema(self, definition):
@@ -268,7 +371,9 @@ class TemplateResource(stack_resource.StackResource):
         Refresh the metadata if new_metadata is None
         '''
         if new_metadata is None:
-            self.metadata_set(self.t.metadata())
+            metadata = self.t.metadata()
+            if metadata != self.metadata_get():
+                self.metadata_set(metadata)
 
     def handle_update(self, json_snippet, tmpl_diff, prop_diff):
         return self.update_with_template(self.child_template(),
@@ -24,6 +24,8 @@ class BaseVolume(resource.Resource):
 
     default_client_name = 'cinder'
 
+    check_poll_interval = (2, 10)
+
     def handle_create(self):
         backup_id = self.properties.get(self.BACKUP_ID)
         cinder = self.client()
@@ -44,12 +46,16 @@ class BaseVolume(resource.Resource):
         return vol.id
 
     def check_create_complete(self, vol_id):
-        vol = self.client().volumes.get(vol_id)
+        poller = self.client_plugin().volume_poller
+        vol = poller.fetch(vol_id)
+        if vol is None:
+            return False
 
-        if vol.status == 'available':
-            return True
         if vol.status in self._volume_creating_status:
             return False
+        poller.done(vol_id)
+        if vol.status == 'available':
+            return True
         if vol.status == 'error':
             raise resource.ResourceInError(
                 resource_status=vol.status)
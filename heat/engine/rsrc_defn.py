@@ -66,6 +66,7 @@ class ResourceDefinitionCore(object):
 
         self._hash = hash(self.resource_type)
         self._rendering = None
+        self._all_dep_attrs = None
 
         assert isinstance(self.description, six.string_types)
 
@@ -141,15 +142,26 @@ class ResourceDefinitionCore(object):
             deletion_policy=reparse_snippet(self._deletion_policy),
             update_policy=reparse_snippet(self._update_policy))
 
+    def all_dep_attrs(self):
+        """
+        Return a list of all the (resource_name, attribute) pairs referenced
+        in resources' properties and metadata fields.
+
+        The functions in the definition are only inspected on the first call.
+        """
+        if self._all_dep_attrs is None:
+            self._all_dep_attrs = list(itertools.chain(
+                function.all_dep_attrs(self._properties),
+                function.all_dep_attrs(self._metadata)))
+        return self._all_dep_attrs
+
     def dep_attrs(self, resource_name):
         """
         Return an iterator over dependent attributes for specified
         resource_name in resources' properties and metadata fields.
         """
-        return itertools.chain(function.dep_attrs(self._properties,
-                                                  resource_name),
-                               function.dep_attrs(self._metadata,
-                                                  resource_name))
+        return (attr for name, attr in self.all_dep_attrs()
+                if name == resource_name)
 
     def dependencies(self, stack):
         """
@@ -175,6 +187,13 @@ class ResourceDefinitionCore(object):
                                strict_func_deps(self._metadata,
                                                 path(METADATA)))
 
+    def metadata_dependencies(self):
+        """
+        Return an iterator over the Resource objects referenced in metadata.
+        """
+        return function.dependencies(self._metadata,
+                                     '.'.join([self.name, METADATA]))
+
     def properties(self, schema, context=None):
         """
         Return a Properties object representing the resource properties.
@@ -11,8 +11,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import functools
 import itertools
+import random
 import sys
 import time
 import types
@@ -284,6 +286,64 @@ class TaskRunner(object):
         return not self.done()
 
 
+class PollingPolicy(object):
+    """
+    A policy deciding at which steps a task polls for the completion of an
+    asynchronous operation.
+
+    After each poll that finds the operation incomplete, the task waits for a
+    number of steps before polling again. The wait starts at `initial` steps
+    and is multiplied by `backoff` after every poll, up to `maximum` steps.
+    It is randomised by up to `jitter` times its length, so that tasks
+    started together do not keep polling on the same steps. Calling wake()
+    makes the task poll again at its next step, e.g. when a signal arrives.
+    """
+
+    def __init__(self, initial=1, maximum=1, backoff=2, jitter=0.2):
+        self.initial = initial
+        self.maximum = max(maximum, initial)
+        self.backoff = backoff
+        self.jitter = jitter
+        # Polls that found the operation incomplete, and steps without a poll
+        self.wasted = 0
+        self.skipped = 0
+        self._interval = None
+        self._remaining = 0
+
+    def wait(self):
+        """
+        A task that waits until the next poll is due.
+
+        It is run after each poll that found the operation incomplete.
+        """
+        self.wasted += 1
+        if self._interval is None:
+            self._interval = self.initial
+        else:
+            self._interval = min(self._interval * self.backoff, self.maximum)
+
+        spread = self.jitter * self._interval
+        steps = self._interval + random.uniform(-spread, spread)
+        self._remaining = max(int(round(steps)), 1)
+
+        waited = 0
+        while self._remaining > 0:
+            self._remaining -= 1
+            if waited:
+                self.skipped += 1
+            waited += 1
+            yield
+
+    def wake(self):
+        """Poll again at the next step and restart the backoff."""
+        self._remaining = 0
+        self._interval = None
+
+    def __repr__(self):
+        return '%s(wasted=%d, skipped=%d)' % (type(self).__name__,
+                                              self.wasted, self.skipped)
+
+
 def wrappertask(task):
     """
     Decorator for a task that needs to drive a subtask.
@@ -373,6 +433,10 @@ class DependencyTaskGroup(object):
         """
         self._runners = dict((o, TaskRunner(task, o)) for o in dependencies)
         self._graph = dependencies.graph(reverse=reverse)
+        self._ready_queue = collections.deque(k for k, n in
+                                              six.iteritems(self._graph)
+                                              if not n)
+        self._running_tasks = collections.OrderedDict()
         self.error_wait_time = error_wait_time
         self.aggregate_exceptions = aggregate_exceptions
 
@@ -390,7 +454,7 @@ class DependencyTaskGroup(object):
     def __call__(self):
         """Return a co-routine which runs the task group."""
         raised_exceptions = []
-        while any(six.itervalues(self._runners)):
+        while self._ready_queue or self._running_tasks:
             try:
                 for k, r in self._ready():
                     r.start()
@@ -399,7 +463,7 @@ class DependencyTaskGroup(object):
 
                 for k, r in self._running():
                     if r.step():
-                        del self._graph[k]
+                        self._complete(k)
             except Exception:
                 exc_info = sys.exc_info()
                 if self.aggregate_exceptions:
@@ -429,26 +493,43 @@ class DependencyTaskGroup(object):
             node_runner = self._runners[dependent_node]
             self._cancel_recursively(dependent_node, node_runner)
 
+        self._running_tasks.pop(key, None)
+        del self._graph[key]
+
+    def _complete(self, key):
+        """
+        Remove a finished subtask from the graph and queue any of the subtasks
+        that require it which have no remaining unmet dependencies.
+        """
+        node = self._graph[key]
+        del self._running_tasks[key]
         del self._graph[key]
 
+        for requirer in node.required_by():
+            if requirer in self._graph and not self._graph[requirer]:
+                self._ready_queue.append(requirer)
+
     def _ready(self):
         """
         Iterate over all subtasks that are ready to start - i.e. all their
         dependencies have been satisfied but they have not yet been started.
+
+        Only the subtasks queued as their last dependency completed are
+        examined, so the cost does not grow with the size of the graph.
         """
-        for k, n in six.iteritems(self._graph):
-            if not n:
-                runner = self._runners[k]
-                if runner and not runner.started():
-                    yield k, runner
+        while self._ready_queue:
+            k = self._ready_queue.popleft()
+            runner = self._runners[k]
+            if runner and not runner.started():
+                self._running_tasks[k] = runner
+                yield k, runner
 
     def _running(self):
         """
         Iterate over all subtasks that are currently running - i.e. they have
         been started but have not yet completed.
         """
-        running = lambda k_r: k_r[0] in self._graph and k_r[1].started()
-        return six.moves.filter(running, six.iteritems(self._runners))
+        return list(six.iteritems(self._running_tasks))
 
 
 class PollingTaskGroup(object):
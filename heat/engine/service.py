@@ -15,6 +15,7 @@ import collections
 import datetime
 import os
 import socket
+import time
 import warnings
 
 import eventlet
@@ -53,6 +54,7 @@ from heat.engine import template as templatem
 from heat.engine import watchrule
 from heat.engine import worker
 from heat.objects import event as event_object
+from heat.objects import raw_template as raw_template_object
 from heat.objects import resource as resource_objects
 from heat.objects import service as service_objects
 from heat.objects import snapshot as snapshot_object
@@ -215,6 +217,119 @@ class ThreadGroupManager(object):
             event.send(message)
 
 
+class SignalQueue(object):
+    """
+    Queue of resource signals, processed in batches for each stack.
+
+    The signals to a stack are processed in the order they were received by
+    a single thread per stack, which loads the stack once for all of the
+    signals queued since it last did so. Synchronous signals are not
+    queued, but processed in the thread that received them. The statistics
+    returned by metrics() are logged by the engine with each service report.
+    """
+
+    def __init__(self, handler):
+        """
+        Initialise with the function that processes a signal.
+
+        The handler is called with the loaded stack, the name of the
+        resource and the signal details, and returns the result of the
+        signal.
+        """
+        self.handler = handler
+        self._pending = collections.defaultdict(list)
+        self._active = set()
+        self.received = 0
+        self.processed = 0
+        self.batches = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def put(self, cnxt, thread_group_mgr, stack_id, resource_name, details,
+            sync_call=False):
+        """
+        Queue a signal to a resource.
+
+        If sync_call is True, the signal is processed at once in the calling
+        thread and its result returned; otherwise return immediately.
+        """
+        self.received += 1
+        if sync_call:
+            # Synchronous signals (e.g. from CFN wait conditions) do not wait
+            # behind the queued signals to the stack, whose handlers could
+            # delay the reply past the RPC timeout.
+            self.processed += 1
+            stack = parser.Stack.load(cnxt, stack_id=stack_id,
+                                      use_stored_context=True)
+            return self.handler(stack, resource_name, details)
+
+        self._pending[stack_id].append((resource_name, details, time.time()))
+        if stack_id not in self._active:
+            self._active.add(stack_id)
+            thread_group_mgr.start(stack_id, self._process, cnxt, stack_id)
+
+    def depth(self):
+        """Return the number of signals waiting to be processed."""
+        return sum(len(signals) for signals in six.itervalues(self._pending))
+
+    def metrics(self):
+        """
+        Return statistics about the queue.
+
+        The wait times are the number of seconds between a signal being
+        queued and its processing starting.
+        """
+        wait_avg = self.wait_total / self.processed if self.processed else 0
+        return {
+            'depth': self.depth(),
+            'stacks': len(self._pending),
+            'received': self.received,
+            'processed': self.processed,
+            'batches': self.batches,
+            'wait_avg': wait_avg,
+            'wait_max': self.wait_max,
+        }
+
+    def _process(self, cnxt, stack_id):
+        try:
+            while stack_id in self._pending:
+                batch = self._pending.pop(stack_id)
+                self.batches += 1
+                LOG.debug("Processing %(count)d signals to stack %(stack)s "
+                          "(%(depth)d more queued)",
+                          {'count': len(batch), 'stack': stack_id,
+                           'depth': self.depth()})
+                try:
+                    # This is not "nice" converting to the stored context
+                    # here, but this happens because the keystone user
+                    # associated with the signal doesn't have permission to
+                    # read the secret key of the user associated with the
+                    # cfn-credentials file
+                    stack = parser.Stack.load(cnxt, stack_id=stack_id,
+                                              use_stored_context=True)
+                except Exception as ex:
+                    LOG.exception(_LE('Failed to load stack %(stack)s to '
+                                      'signal it: %(msg)s'),
+                                  {'stack': stack_id, 'msg': ex})
+                    stack = None
+
+                for resource_name, details, queued in batch:
+                    self.processed += 1
+                    wait = time.time() - queued
+                    self.wait_total += wait
+                    self.wait_max = max(self.wait_max, wait)
+                    try:
+                        if stack is None:
+                            raise exception.ResourceNotAvailable(
+                                resource_name=resource_name)
+                        self.handler(stack, resource_name, details)
+                    except Exception as ex:
+                        LOG.exception(_LE('signal %(name)s : %(msg)s'),
+                                      {'name': resource_name, 'msg': ex})
+        finally:
+            self._active.discard(stack_id)
+
+
 @profiler.trace_cls("rpc")
 class EngineListener(service.Service):
     '''
@@ -267,7 +382,7 @@ class EngineService(service.Service):
     by the RPC caller.
     """
 
-    RPC_API_VERSION = '1.9'
+    RPC_API_VERSION = '1.11'
 
     def __init__(self, host, topic, manager=None):
         super(EngineService, self).__init__()
@@ -289,6 +404,7 @@ class EngineService(service.Service):
         self.manage_thread_grp = None
         self._rpc_server = None
         self.software_config = service_software_config.SoftwareConfigService()
+        self.signal_queue = SignalQueue(self._resource_signal)
 
         if cfg.CONF.instance_user:
             warnings.warn('The "instance_user" option in heat.conf is '
@@ -312,7 +428,7 @@ class EngineService(service.Service):
         self.stack_watch = service_stack_watch.StackWatch(
             self.thread_group_mgr)
 
-        # Create a periodic_watcher_task per-stack
+        # Schedule the watch rules of every stack
         admin_context = context.get_admin_context()
         stacks = stack_object.Stack.get_all(
             admin_context,
@@ -377,10 +493,14 @@ class EngineService(service.Service):
             LOG.info(_LI("WorkerService is stopped in engine %s"),
                      self.engine_id)
 
+        # Stop evaluating watch rules
+        self.thread_group_mgr.stop_timers(service_stack_watch.WATCH_TIMER_KEY)
+
         # Wait for all active threads to be finished
         for stack_id in list(self.thread_group_mgr.groups.keys()):
-            # Ignore dummy service task
-            if stack_id == cfg.CONF.periodic_interval:
+            # Ignore dummy service task and the watch rule timer
+            if stack_id in (cfg.CONF.periodic_interval,
+                            service_stack_watch.WATCH_TIMER_KEY):
                 continue
             LOG.info(_LI("Waiting stack %s processing to be finished"),
                      stack_id)
@@ -389,6 +509,7 @@ class EngineService(service.Service):
             LOG.info(_LI("Stack %s processing was finished"), stack_id)
 
         self.manage_thread_grp.stop()
+        evt.flush()
         ctxt = context.get_admin_context()
         service_objects.Service.delete(ctxt, self.service_id)
         LOG.info(_LI('Service %s is deleted'), self.service_id)
@@ -450,13 +571,15 @@ class EngineService(service.Service):
         return s
 
     @context.request_context
-    def show_stack(self, cnxt, stack_identity):
+    def show_stack(self, cnxt, stack_identity, refresh_outputs=False):
         """
         Return detailed information about one or all stacks.
 
         :param cnxt: RPC context.
         :param stack_identity: Name of the stack you want to show, or None
             to show all
+        :param refresh_outputs: If True, resolve the outputs again rather than
+            returning those cached for the stack
         """
         if stack_identity is not None:
             db_stack = self._get_stack(cnxt, stack_identity, show_deleted=True)
@@ -464,7 +587,8 @@ class EngineService(service.Service):
         else:
             stacks = parser.Stack.load_all(cnxt)
 
-        return [api.format_stack(stack) for stack in stacks]
+        return [api.format_stack(stack, refresh_outputs=refresh_outputs)
+                for stack in stacks]
 
     def get_revision(self, cnxt):
         return cfg.CONF.revision['heat_revision']
@@ -500,15 +624,20 @@ class EngineService(service.Service):
             multiple tags using the boolean OR expression
         :returns: a list of formatted stacks
         """
-        stacks = parser.Stack.load_all(cnxt, limit, marker, sort_keys,
-                                       sort_dir, filters, tenant_safe,
-                                       show_deleted, resolve_data=False,
-                                       show_nested=show_nested,
-                                       show_hidden=show_hidden,
-                                       tags=tags, tags_any=tags_any,
-                                       not_tags=not_tags,
-                                       not_tags_any=not_tags_any)
-        return [api.format_stack(stack) for stack in stacks]
+        # Summaries are built from the database records alone, so that
+        # listing stacks neither parses their templates nor resolves their
+        # outputs; use show_stack for the full representation.
+        stacks = stack_object.Stack.get_all(cnxt, limit, sort_keys, marker,
+                                            sort_dir, filters, tenant_safe,
+                                            show_deleted, show_nested,
+                                            show_hidden, tags, tags_any,
+                                            not_tags, not_tags_any)
+        stacks = list(stacks)
+        # The descriptions come from a single query for the whole page.
+        templates = raw_template_object.RawTemplate.get_templates(
+            cnxt, [stack.raw_template_id for stack in stacks])
+        return [api.format_stack_db_object(
+            stack, templates.get(stack.raw_template_id)) for stack in stacks]
 
     @context.request_context
     def count_stacks(self, cnxt, filters=None, tenant_safe=True,
@@ -1103,6 +1232,7 @@ class EngineService(service.Service):
                 sort_keys=sort_keys,
                 sort_dir=sort_dir,
                 filters=filters)
+            stacks = {st.id: st}
         else:
             events = event_object.Event.get_all_by_tenant(
                 cnxt, limit=limit,
@@ -1110,17 +1240,22 @@ class EngineService(service.Service):
                 sort_keys=sort_keys,
                 sort_dir=sort_dir,
                 filters=filters)
-
-        stacks = {}
-
-        def get_stack(stack_id):
-            if stack_id not in stacks:
-                stacks[stack_id] = parser.Stack.load(cnxt, stack_id)
-            return stacks[stack_id]
-
-        return [api.format_event(evt.Event.load(cnxt,
-                                                e.id, e,
-                                                get_stack(e.stack_id)))
+            # Only the stack identifiers are needed to format the events, so
+            # fetch them all in one query instead of loading each Stack.
+            stacks = dict((s.id, s) for s in stack_object.Stack.get_identities(
+                cnxt, set(e.stack_id for e in events)))
+
+        stack_ids = {}
+
+        def get_stack_identifier(stack_id):
+            if stack_id not in stack_ids:
+                s = stacks[stack_id]
+                stack_ids[stack_id] = identifier.HeatIdentifier(s.tenant,
+                                                                s.name, s.id)
+            return stack_ids[stack_id]
+
+        return [api.format_event(evt.Event.from_db_object(cnxt, e),
+                                 get_stack_identifier(e.stack_id))
                 for e in events]
 
     def _authorize_stack_user(self, cnxt, stack, resource_name):
@@ -1181,36 +1316,33 @@ class EngineService(service.Service):
                           implementation.
         '''
 
-        def _resource_signal(stack, rsrc, details):
-            LOG.debug("signaling resource %s:%s" % (stack.name, rsrc.name))
-            rsrc.signal(details)
+        s = self._get_stack(cnxt, stack_identity)
 
-            # Refresh the metadata for all other resources, since signals can
-            # update metadata which is used by other resources, e.g
-            # when signalling a WaitConditionHandle resource, and other
-            # resources may refer to WaitCondition Fn::GetAtt Data
-            for r in stack.dependencies:
-                if (r.name != rsrc.name and r.id is not None and
-                        r.action != r.INIT):
-                    r.metadata_update()
+        if resource_objects.Resource.get_by_name_and_stack(
+                cnxt, resource_name, s.id) is None:
+            # Load the stack only to report the reason for the failure
+            stack = parser.Stack.load(cnxt, stack=s, use_stored_context=True)
+            self._verify_stack_resource(stack, resource_name)
 
-        s = self._get_stack(cnxt, stack_identity)
+        # Signals are queued so that a burst of signals to the same stack is
+        # processed with a single load of the stack
+        return self.signal_queue.put(cnxt, self.thread_group_mgr, s.id,
+                                     resource_name, details,
+                                     sync_call=sync_call)
 
-        # This is not "nice" converting to the stored context here,
-        # but this happens because the keystone user associated with the
-        # signal doesn't have permission to read the secret key of
-        # the user associated with the cfn-credentials file
-        stack = parser.Stack.load(cnxt, stack=s, use_stored_context=True)
+    def _resource_signal(self, stack, resource_name, details):
         self._verify_stack_resource(stack, resource_name)
 
         rsrc = stack[resource_name]
-        if callable(rsrc.signal):
-            if sync_call:
-                _resource_signal(stack, rsrc, details)
-                return rsrc.metadata_get()
-            else:
-                self.thread_group_mgr.start(stack.id, _resource_signal,
-                                            stack, rsrc, details)
+        LOG.debug("signaling resource %s:%s" % (stack.name, rsrc.name))
+        rsrc.signal(details)
+
+        # Refresh the metadata of other resources, since signals can
+        # update metadata which is used by other resources, e.g
+        # when signalling a WaitConditionHandle resource, and other
+        # resources may refer to WaitCondition Fn::GetAtt Data
+        stack.refresh_dependent_metadata(rsrc.name)
+        return rsrc.metadata_get()
 
     @context.request_context
     def find_physical_resource(self, cnxt, physical_resource_id):
@@ -1405,13 +1537,11 @@ class EngineService(service.Service):
         refresh_stack = parser.Stack.load(cnxt, stack=s,
                                           use_stored_context=True)
 
-        # Refresh the metadata for all other resources, since we expect
+        # Refresh the metadata of other resources, since we expect
         # resource_name to be a WaitCondition resource, and other
         # resources may refer to WaitCondition Fn::GetAtt Data, which
         # is updated here.
-        for res in refresh_stack.dependencies:
-            if res.name != resource_name and res.id is not None:
-                res.metadata_update()
+        refresh_stack.refresh_dependent_metadata(resource_name)
 
         return resource.metadata_get()
 
@@ -1421,25 +1551,35 @@ class EngineService(service.Service):
         This could be used by CloudWatch and WaitConditions
         and treat HA service events like any other CloudWatch.
         '''
-        def get_matching_watches():
-            if watch_name:
-                yield watchrule.WatchRule.load(cnxt, watch_name)
-            else:
-                for wr in watch_rule.WatchRule.get_all(cnxt):
-                    if watchrule.rule_can_use_sample(wr, stats_data):
-                        yield watchrule.WatchRule.load(cnxt, watch=wr)
+        self._create_watch_data(cnxt, watch_name, [stats_data])
+        return stats_data
+
+    @context.request_context
+    def create_watch_data_batch(self, cnxt, watch_name, stats_data_list):
+        '''
+        Store a number of metric samples, as create_watch_data does for one,
+        with a single insert.
+        '''
+        self._create_watch_data(cnxt, watch_name, stats_data_list)
+        return stats_data_list
 
-        rule_run = False
-        for rule in get_matching_watches():
-            rule.create_watch_data(stats_data)
-            rule_run = True
+    def _create_watch_data(self, cnxt, watch_name, stats_data_list):
+        if watch_name:
+            rule = watchrule.WatchRule.load(cnxt, watch_name)
+            samples = [(rule, stats_data) for stats_data in stats_data_list]
+        else:
+            loaded = {}
+            samples = [(rule, stats_data)
+                       for i, stats_data in enumerate(stats_data_list)
+                       for rule in watchrule.get_matching_rules(
+                           cnxt, stats_data, loaded, refresh=(i == 0))]
 
-        if not rule_run:
+        if not samples:
             if watch_name is None:
                 watch_name = 'Unknown'
             raise exception.WatchRuleNotFound(watch_name=watch_name)
 
-        return stats_data
+        watchrule.create_watch_data(cnxt, samples)
 
     @context.request_context
     def show_watch(self, cnxt, watch_name):
@@ -1623,6 +1763,13 @@ class EngineService(service.Service):
                 dict(deleted_at=None))
             LOG.info(_LI('Service %s is started'), self.service_id)
 
+        if self.signal_queue.received:
+            LOG.info(_LI('Resource signals: %(depth)d queued for %(stacks)d '
+                         'stacks, %(processed)d of %(received)d processed in '
+                         '%(batches)d batches, waiting %(wait_avg).3fs on '
+                         'average and %(wait_max).3fs at most'),
+                     self.signal_queue.metrics())
+
     def service_manage_cleanup(self):
         cnxt = context.get_admin_context()
         last_updated_window = (3 * cfg.CONF.periodic_interval)
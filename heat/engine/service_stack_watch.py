@@ -11,11 +11,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+import heapq
+
 from oslo_log import log as logging
 from oslo_utils import timeutils
 import six
 
 from heat.common import context
+from heat.common import exception
+from heat.common.i18n import _
 from heat.common.i18n import _LE
 from heat.common.i18n import _LW
 from heat.engine import stack
@@ -26,17 +31,51 @@ from heat.rpc import api as rpc_api
 
 LOG = logging.getLogger(__name__)
 
+# The key of the single timer evaluating the watch rules of every stack
+WATCH_TIMER_KEY = 'periodic_watcher_task'
+
 
 class StackWatch(object):
+    """
+    Evaluate the watch rules of the watched stacks as they fall due.
+
+    A single timer is shared by every stack. The rules are kept in a
+    priority queue ordered by the time they are next due, so that each tick
+    only touches the rules that are due, and a stack is only loaded when one
+    of its rules has actions to run.
+    """
+
     def __init__(self, thread_group_mgr):
         self.thread_group_mgr = thread_group_mgr
+        self._timer_started = False
+        # Heap of (due time, rule ID); entries whose due time no longer
+        # matches self._due are stale and ignored.
+        self._queue = []
+        self._due = {}
+        self._periods = {}
+        self._stacks = set()
+        self._last_rule_id = 0
+
+    def _schedule(self, rule_id, due):
+        self._due[rule_id] = due
+        heapq.heappush(self._queue, (due, rule_id))
+
+    def _schedule_rule(self, wr, now):
+        if wr.state == rpc_api.WATCH_STATE_CEILOMETER_CONTROLLED:
+            return False
+        if wr.id not in self._due:
+            self._periods[wr.id] = watchrule.rule_period(wr.rule)
+            self._schedule(wr.id, now + self._periods[wr.id])
+        return True
 
     def start_watch_task(self, stack_id, cnxt):
 
+        now = timeutils.utcnow()
+
         def stack_has_a_watchrule(sid):
+            self._stacks.add(sid)
             wrs = watch_rule_object.WatchRule.get_all_by_stack(cnxt, sid)
 
-            now = timeutils.utcnow()
             start_watch_thread = False
             for wr in wrs:
                 # reset the last_evaluated so we don't fire off alarms when
@@ -45,7 +84,7 @@ class StackWatch(object):
                     cnxt, wr.id,
                     {'last_evaluated': now})
 
-                if wr.state != rpc_api.WATCH_STATE_CEILOMETER_CONTROLLED:
+                if self._schedule_rule(wr, now):
                     start_watch_thread = True
 
             children = stack_object.Stack.get_all_by_owner_id(cnxt, sid)
@@ -55,60 +94,108 @@ class StackWatch(object):
 
             return start_watch_thread
 
-        if stack_has_a_watchrule(stack_id):
-            self.thread_group_mgr.add_timer(
-                stack_id,
-                self.periodic_watcher_task,
-                sid=stack_id)
-
-    def check_stack_watches(self, sid):
-        # Retrieve the stored credentials & create context
-        # Require tenant_safe=False to the stack_get to defeat tenant
-        # scoping otherwise we fail to retrieve the stack
-        LOG.debug("Periodic watcher task for stack %s" % sid)
-        admin_context = context.get_admin_context()
-        db_stack = stack_object.Stack.get_by_id(admin_context,
-                                                sid,
-                                                tenant_safe=False,
-                                                eager_load=True)
-        if not db_stack:
-            LOG.error(_LE("Unable to retrieve stack %s for periodic task"),
-                      sid)
-            return
-        stk = stack.Stack.load(admin_context, stack=db_stack,
-                               use_stored_context=True)
-
-        # recurse into any nested stacks.
-        children = stack_object.Stack.get_all_by_owner_id(admin_context, sid)
-        for child in children:
-            self.check_stack_watches(child.id)
-
-        # Get all watchrules for this stack and evaluate them
-        try:
-            wrs = watch_rule_object.WatchRule.get_all_by_stack(admin_context,
-                                                               sid)
-        except Exception as ex:
-            LOG.warn(_LW('periodic_task db error watch rule removed? %(ex)s'),
-                     ex)
-            return
-
-        def run_alarm_action(stk, actions, details):
-            for action in actions:
-                action(details=details)
-            for res in six.itervalues(stk):
-                res.metadata_update()
+        if stack_has_a_watchrule(stack_id) and not self._timer_started:
+            self.thread_group_mgr.add_timer(WATCH_TIMER_KEY,
+                                            self.periodic_watcher_task)
+            self._timer_started = True
 
+    def _schedule_new_rules(self, cnxt, now):
+        """Schedule rules added to the watched stacks, e.g. by updates."""
+        wrs = watch_rule_object.WatchRule.get_all_newer(cnxt,
+                                                        self._last_rule_id)
         for wr in wrs:
-            rule = watchrule.WatchRule.load(stk.context, watch=wr)
-            actions = rule.evaluate()
+            self._last_rule_id = max(self._last_rule_id, wr.id)
+            if wr.stack_id not in self._stacks:
+                root_id = stack_object.Stack.get_root_id(cnxt, wr.stack_id)
+                if root_id not in self._stacks:
+                    continue
+                self._stacks.add(wr.stack_id)
+            self._schedule_rule(wr, now)
+
+    def _evaluate_rule(self, cnxt, rule_id, now):
+        # Unless the rule is found to be deleted, it is always rescheduled,
+        # so that an error evaluating it is retried after its period.
+        due = now + self._periods.get(rule_id, datetime.timedelta())
+        try:
+            wr = watch_rule_object.WatchRule.get_by_id(cnxt, rule_id)
+            if wr is None:
+                # The rule has been deleted with its stack
+                self._periods.pop(rule_id, None)
+                due = None
+                return
+
+            rule = watchrule.WatchRule.load(cnxt, watch=wr)
+            self._periods[rule_id] = rule.timeperiod
+            stacks = []
+
+            def load_stack():
+                # Require tenant_safe=False to the stack_get to defeat tenant
+                # scoping otherwise we fail to retrieve the stack
+                db_stack = stack_object.Stack.get_by_id(cnxt, rule.stack_id,
+                                                        tenant_safe=False,
+                                                        eager_load=True)
+                if not db_stack:
+                    raise exception.NotFound(
+                        _('Stack %s not found') % rule.stack_id)
+                stk = stack.Stack.load(cnxt, stack=db_stack,
+                                       use_stored_context=True)
+                stacks.append(stk)
+                return stk
+
+            actions = rule.evaluate(load_stack)
+
+            due = rule.last_evaluated + rule.timeperiod
+            if due <= now:
+                due = now + rule.timeperiod
             if actions:
-                self.thread_group_mgr.start(sid, run_alarm_action, stk,
-                                            actions, rule.get_details())
-
-    def periodic_watcher_task(self, sid):
+                self.thread_group_mgr.start(rule.stack_id, self._run_actions,
+                                            stacks[0], actions,
+                                            rule.get_details())
+        except Exception as ex:
+            LOG.error(_LE('Unable to evaluate watch rule %(id)s: %(ex)s'),
+                      {'id': rule_id, 'ex': ex})
+        finally:
+            if due is not None:
+                self._schedule(rule_id, due)
+
+    @staticmethod
+    def _run_actions(stk, actions, details):
+        for action in actions:
+            action(details=details)
+        for res in six.itervalues(stk):
+            res.metadata_update()
+
+    def check_watches(self):
+        """Evaluate the watch rules that are due."""
+        admin_context = context.get_admin_context()
+        now = timeutils.utcnow()
+        try:
+            self._schedule_new_rules(admin_context, now)
+        except Exception as ex:
+            LOG.warn(_LW('periodic_task db error finding new watch rules: '
+                         '%(ex)s'), {'ex': ex})
+
+        due_rules = []
+        while self._queue and self._queue[0][0] <= now:
+            due, rule_id = heapq.heappop(self._queue)
+            if self._due.get(rule_id) == due:
+                del self._due[rule_id]
+                due_rules.append(rule_id)
+
+        LOG.debug("Periodic watcher task: %(due)d of %(total)d watch rules "
+                  "due" % {'due': len(due_rules),
+                           'total': len(due_rules) + len(self._due)})
+        for rule_id in due_rules:
+            self._evaluate_rule(admin_context, rule_id, now)
+
+    def periodic_watcher_task(self):
         """
-        Periodic task, created for each stack, triggers watch-rule
-        evaluation for all rules defined for the stack
-        sid = stack ID
+        Periodic task, shared by every watched stack, which triggers the
+        evaluation of the watch rules that are due.
         """
-        self.check_stack_watches(sid)
+        # An exception raised from here would stop the timer for good, and
+        # with it the evaluation of the watch rules of every stack.
+        try:
+            self.check_watches()
+        except Exception:
+            LOG.exception(_LE('Periodic watcher task failed'))
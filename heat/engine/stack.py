@@ -90,7 +90,8 @@ class Stack(collections.Mapping):
                  use_stored_context=False, username=None,
                  nested_depth=0, strict_validate=True, convergence=False,
                  current_traversal=None, tags=None, prev_raw_template_id=None,
-                 current_deps=None, cache_data=None):
+                 current_deps=None, cache_data=None, cached_outputs=None,
+                 outputs_generation=None):
 
         '''
         Initialise from a context, name, Template object and (optionally)
@@ -142,6 +143,8 @@ class Stack(collections.Mapping):
         self.prev_raw_template_id = prev_raw_template_id
         self.current_deps = current_deps
         self.cache_data = cache_data
+        self.cached_outputs = cached_outputs
+        self.outputs_generation = outputs_generation
         self._worker_client = None
 
         if use_stored_context:
@@ -266,6 +269,23 @@ class Stack(collections.Mapping):
     def reset_dependencies(self):
         self._dependencies = None
 
+    def refresh_dependent_metadata(self, resource_name):
+        '''
+        Refresh the metadata of resources affected by a change in the named
+        resource, e.g. after it has been signalled.
+
+        Only resources whose metadata references the named resource, or a
+        resource that (directly or indirectly) depends on it, are refreshed;
+        the metadata of all other resources cannot have changed.
+        '''
+        changed = set(r.name for r in self.dependencies[self[resource_name]])
+        for res in self.dependencies:
+            if (res.name == resource_name or res.name not in changed or
+                    res.id is None or res.action == res.INIT):
+                continue
+            if any(r.name in changed for r in res.t.metadata_dependencies()):
+                res.metadata_update()
+
     def root_stack_id(self):
         if not self.owner_id:
             return self.id
@@ -314,18 +334,30 @@ class Stack(collections.Mapping):
         if not self.parameters.set_stack_id(self.identifier()):
             LOG.warn(_LW("Unable to set parameters StackId identifier"))
 
+    @staticmethod
+    def get_dep_attrs_index(resources, outputs):
+        '''
+        Return a mapping from each resource name to the set of its attributes
+        that are referenced by the specified resources and outputs.
+        '''
+        attr_lists = itertools.chain((res.t.all_dep_attrs()
+                                      for res in resources),
+                                     (function.all_dep_attrs(
+                                         out.get('Value', ''))
+                                      for out in six.itervalues(outputs)))
+        index = collections.defaultdict(set)
+        for resource_name, attr in itertools.chain.from_iterable(attr_lists):
+            index[resource_name].add(attr)
+        return index
+
     @staticmethod
     def get_dep_attrs(resources, outputs, resource_name):
         '''
         Return the set of dependent attributes for specified resource name by
         inspecting all resources and outputs in template.
         '''
-        attr_lists = itertools.chain((res.dep_attrs(resource_name)
-                                      for res in resources),
-                                     (function.dep_attrs(out.get('Value', ''),
-                                                         resource_name)
-                                      for out in six.itervalues(outputs)))
-        return set(itertools.chain.from_iterable(attr_lists))
+        return set(Stack.get_dep_attrs_index(resources,
+                                             outputs)[resource_name])
 
     @staticmethod
     def _get_dependencies(resources):
@@ -338,7 +370,8 @@ class Stack(collections.Mapping):
 
     @classmethod
     def load(cls, context, stack_id=None, stack=None, show_deleted=True,
-             use_stored_context=False, force_reload=False, cache_data=None):
+             use_stored_context=False, force_reload=False, cache_data=None,
+             load_template=None):
         '''Retrieve a Stack from the database.'''
         if stack is None:
             stack = stack_object.Stack.get_by_id(
@@ -355,7 +388,8 @@ class Stack(collections.Mapping):
 
         return cls._from_db(context, stack,
                             use_stored_context=use_stored_context,
-                            cache_data=cache_data)
+                            cache_data=cache_data,
+                            load_template=load_template)
 
     @classmethod
     def load_all(cls, context, limit=None, marker=None, sort_keys=None,
@@ -383,8 +417,11 @@ class Stack(collections.Mapping):
 
     @classmethod
     def _from_db(cls, context, stack, resolve_data=True,
-                 use_stored_context=False, cache_data=None):
-        template = tmpl.Template.load(
+                 use_stored_context=False, cache_data=None,
+                 load_template=None):
+        if load_template is None:
+            load_template = tmpl.Template.load
+        template = load_template(
             context, stack.raw_template_id, stack.raw_template)
         tags = None
         if stack.tags:
@@ -406,7 +443,9 @@ class Stack(collections.Mapping):
                    username=stack.username, convergence=stack.convergence,
                    current_traversal=stack.current_traversal, tags=tags,
                    prev_raw_template_id=stack.prev_raw_template_id,
-                   current_deps=stack.current_deps, cache_data=cache_data)
+                   current_deps=stack.current_deps, cache_data=cache_data,
+                   cached_outputs=stack.cached_outputs,
+                   outputs_generation=stack.outputs_generation)
 
     def get_kwargs_for_cloning(self, keep_status=False, only_db=False):
         """Get common kwargs for calling Stack() for cloning.
@@ -689,6 +728,8 @@ class Stack(collections.Mapping):
                          self.name, 'OS::Heat::Stack')
 
         ev.store()
+        if status != self.IN_PROGRESS:
+            event.flush()
 
     @profiler.trace('Stack.state_set', hide_args=False)
     def state_set(self, action, status, reason):
@@ -719,6 +760,32 @@ class Stack(collections.Mapping):
             stack.update_and_save({'action': action,
                                    'status': status,
                                    'status_reason': reason})
+            self.clear_cached_outputs()
+
+    def cache_outputs(self, outputs):
+        '''
+        Store the formatted outputs of the stack in the database, so that
+        they need not be resolved again until something changes.
+
+        The outputs are not stored if they have been discarded since the
+        stack was loaded, as they may have been resolved from stale data.
+        '''
+        if self.id is None:
+            return
+        if stack_object.Stack.cache_outputs(self.context, self.id, outputs,
+                                            self.outputs_generation):
+            self.cached_outputs = outputs
+
+    def clear_cached_outputs(self):
+        '''
+        Discard the stored outputs of the stack, and of any stacks that it is
+        nested in, as they may now resolve to different values.
+        '''
+        self.cached_outputs = None
+        if self.id is not None:
+            self.outputs_generation = (
+                stack_object.Stack.clear_cached_outputs(self.context,
+                                                        self.id))
 
     @property
     def state(self):
@@ -1560,7 +1627,7 @@ class Stack(collections.Mapping):
             'id': self.id,
             'action': self.action,
             'environment': self.env.user_env_as_dict(),
-            'files': self.t.files,
+            'files': dict(self.t.files),
             'status': self.status,
             'template': self.t.t,
             'resources': dict((res.name, res.prepare_abandon())
@@ -68,11 +68,36 @@ def delete_all(context, stack_id, traversal_id):
 
 def update_input_data(context, entity_id, current_traversal,
                       is_update, atomic_key, input_data):
-    sync_point_object.SyncPoint.update_input_data(
+    return sync_point_object.SyncPoint.update_input_data(
         context, entity_id, current_traversal, is_update, atomic_key,
         input_data)
 
 
+def add_input_data(context, entity_id, current_traversal, is_update,
+                   stack_id, input_data):
+    """
+    Records the data sent to a sync point by one of its predecessors.
+
+    Each notification is stored as a row of its own, so concurrent
+    predecessors never have to read, modify and write the same sync point.
+    """
+    sync_point_object.SyncPoint.add_input_data(
+        context, entity_id, current_traversal, is_update, stack_id,
+        serialize_input_data(input_data))
+
+
+def get_input_data(context, entity_id, current_traversal, is_update):
+    """
+    Retrieves the data received so far by a sync point from its predecessors.
+    """
+    input_data = {}
+    for db_input_data in sync_point_object.SyncPoint.get_all_input_data(
+            context, entity_id, current_traversal, is_update):
+        input_data.update(deserialize_input_data(db_input_data))
+
+    return input_data
+
+
 def deserialize_input_data(db_input_data):
     db_input_data = db_input_data.get('input_data')
     if not db_input_data:
@@ -89,23 +114,39 @@ def sync(cnxt, entity_id, current_traversal, is_update, propagate,
          predecessors, new_data):
     sync_point = get(cnxt, entity_id, current_traversal,
                      is_update)
-    input_data = dict(deserialize_input_data(sync_point.input_data))
-    input_data.update(new_data)
-    waiting = predecessors - set(input_data)
-
-    # Note: update must be atomic
-    update_input_data(cnxt, entity_id, current_traversal,
-                      is_update, sync_point.atomic_key,
-                      serialize_input_data(input_data))
+    add_input_data(cnxt, entity_id, current_traversal, is_update,
+                   sync_point.stack_id, new_data)
 
     key = make_key(entity_id, current_traversal, is_update)
+    # Each predecessor notifies the sync point once (barring retries), so
+    # the input data need not be loaded until enough of them have arrived.
+    received = sync_point_object.SyncPoint.count_input_data(
+        cnxt, entity_id, current_traversal, is_update)
+    if received < len(predecessors):
+        LOG.debug('[%s] Waiting %s: Got %d of %d inputs',
+                  key, entity_id, received, len(predecessors))
+        return
+
+    input_data = get_input_data(cnxt, entity_id, current_traversal,
+                                is_update)
+    waiting = predecessors - set(input_data)
     if waiting:
         LOG.debug('[%s] Waiting %s: Got %s; still need %s',
                   key, entity_id, _dump_list(input_data), _dump_list(waiting))
-    else:
-        LOG.debug('[%s] Ready %s: Got %s',
-                  key, entity_id, _dump_list(input_data))
-        propagate(entity_id, input_data)
+        return
+
+    # Note: more than one predecessor may see the complete set of input data
+    # when they finish at the same time. Only the one that atomically moves
+    # the sync point on from its initial state gets to propagate.
+    if not update_input_data(cnxt, entity_id, current_traversal,
+                             is_update, 0,
+                             serialize_input_data(input_data)):
+        LOG.debug('[%s] Ready %s: Already propagated', key, entity_id)
+        return
+
+    LOG.debug('[%s] Ready %s: Got %s',
+              key, entity_id, _dump_list(input_data))
+    propagate(entity_id, input_data)
 
 
 class SyncPointNotFound(Exception):
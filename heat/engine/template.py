@@ -23,6 +23,7 @@ from stevedore import extension
 from heat.common import exception
 from heat.common.i18n import _
 from heat.engine import environment
+from heat.engine import template_files
 from heat.objects import raw_template as template_object
 
 LOG = logging.getLogger(__name__)
@@ -112,12 +113,22 @@ class Template(collections.Mapping):
         '''
         self.id = template_id
         self.t = template
-        self.files = files or {}
+        self.files = files
         self.maps = self[self.MAPPINGS]
         self.env = env or environment.Environment({})
         self.version = get_version(self.t,
                                    list(six.iterkeys(_template_classes)))
 
+    @property
+    def files(self):
+        return self._files
+
+    @files.setter
+    def files(self, files):
+        if not isinstance(files, template_files.TemplateFiles):
+            files = template_files.TemplateFiles(files)
+        self._files = files
+
     def __deepcopy__(self, memo):
         return Template(copy.deepcopy(self.t, memo), files=self.files,
                         env=self.env)
@@ -128,13 +139,17 @@ class Template(collections.Mapping):
         if t is None:
             t = template_object.RawTemplate.get_by_id(context, template_id)
         env = environment.Environment(t.environment)
-        return cls(t.template, template_id=template_id, files=t.files, env=env)
+        # The files are loaded only if they are used
+        files = template_files.TemplateFiles(t.files, files_id=t.files_id,
+                                             context=context)
+        return cls(t.template, template_id=template_id, files=files, env=env)
 
     def store(self, context=None):
         '''Store the Template in the database and return its ID.'''
         rt = {
             'template': self.t,
-            'files': self.files,
+            'files': None,
+            'files_id': self.files.store(context),
             'environment': self.env.user_env_as_dict()
         }
         if self.id is None:
@@ -0,0 +1,101 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+import copy
+
+from heat.objects import raw_template_files as files_object
+
+# The sets of files most recently loaded from the database, by ID. They are
+# shared by all the templates referencing them, and must not be modified.
+_FILES_CACHE_SIZE = 100
+_files_cache = collections.OrderedDict()
+
+
+def _load(context, files_id):
+    files = _files_cache.pop(files_id, None)
+    if files is None:
+        files = files_object.RawTemplateFiles.get_by_id(context,
+                                                        files_id).files
+    _files_cache[files_id] = files
+    while len(_files_cache) > _FILES_CACHE_SIZE:
+        _files_cache.popitem(last=False)
+    return files
+
+
+class TemplateFiles(collections.MutableMapping):
+    '''
+    The files referenced by a template, e.g. provider templates and the
+    targets of get_file.
+
+    Files stored in the database are only loaded when first accessed, and
+    are shared with the other templates referencing the same set of files
+    until they are modified.
+    '''
+
+    def __init__(self, files=None, files_id=None, context=None):
+        # The ID of the stored files, if they have not been modified since
+        self.files_id = files_id
+        self._context = context
+        if files is None and files_id is None:
+            files = {}
+        self._files = files
+        self._shared = files is None
+
+    @property
+    def files(self):
+        if self._files is None:
+            self._files = _load(self._context, self.files_id)
+        return self._files
+
+    def _modify(self):
+        if self._shared:
+            self._files = dict(self.files)
+            self._shared = False
+        self.files_id = None
+        return self._files
+
+    def store(self, context=None):
+        '''Store the files in the database, if needed, and return their ID.'''
+        if self.files_id is None:
+            self.files_id = files_object.RawTemplateFiles.create(
+                context, dict(self.files)).id
+        return self.files_id
+
+    def __getitem__(self, key):
+        return self.files[key]
+
+    def __setitem__(self, key, value):
+        # Resources set their provider template again each time they use it
+        if key in self.files and self.files[key] == value:
+            return
+        self._modify()[key] = value
+
+    def __delitem__(self, key):
+        del self._modify()[key]
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __len__(self):
+        return len(self.files)
+
+    def __deepcopy__(self, memo):
+        if self._files is None:
+            return TemplateFiles(files_id=self.files_id,
+                                 context=self._context)
+        return TemplateFiles(copy.deepcopy(self._files, memo),
+                             files_id=self.files_id, context=self._context)
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self.files)
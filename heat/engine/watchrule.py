@@ -13,7 +13,9 @@
 
 
 import datetime
+import time
 
+from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import timeutils
 
@@ -28,6 +30,8 @@ from heat.objects import watch_data as watch_data_objects
 from heat.objects import watch_rule as watch_rule_objects
 from heat.rpc import api as rpc_api
 
+cfg.CONF.import_opt('watch_rule_index_reload_interval', 'heat.common.config')
+
 LOG = logging.getLogger(__name__)
 
 
@@ -63,12 +67,7 @@ class WatchRule(object):
         self.state = state
         self.rule = rule
         self.stack_id = stack_id
-        period = 0
-        if 'Period' in rule:
-            period = int(rule['Period'])
-        elif 'period' in rule:
-            period = int(rule['period'])
-        self.timeperiod = datetime.timedelta(seconds=period)
+        self.timeperiod = rule_period(rule)
         self.id = wid
         self.watch_data = watch_data or []
         self.last_evaluated = last_evaluated
@@ -116,6 +115,7 @@ class WatchRule(object):
         else:
             watch_rule_objects.WatchRule.update_by_id(self.context, self.id,
                                                       wr_values)
+        _rule_index.add(self.id, self.state, self.rule)
 
     def destroy(self):
         '''
@@ -123,6 +123,7 @@ class WatchRule(object):
         '''
         if self.id:
             watch_rule_objects.WatchRule.delete(self.context, self.id)
+            _rule_index.remove(self.id)
 
     def do_data_cmp(self, data, threshold):
         op = self.rule['ComparisonOperator']
@@ -137,124 +138,119 @@ class WatchRule(object):
         else:
             return False
 
-    def do_Maximum(self):
-        data = 0
-        have_data = False
+    def _rollup(self):
+        """
+        Aggregate the samples within the period in a single pass.
+
+        Returns a tuple of the number of samples and their sum, minimum and
+        maximum values (the latter two being None if there are no samples).
+        """
+        count = 0
+        total = 0
+        minimum = maximum = None
+        period_start = self.now - self.timeperiod
+        metric = self.rule['MetricName']
         for d in self.watch_data:
-            if d.created_at < self.now - self.timeperiod:
+            if d.created_at < period_start:
                 continue
-            if not have_data:
-                data = float(d.data[self.rule['MetricName']]['Value'])
-                have_data = True
-            if float(d.data[self.rule['MetricName']]['Value']) > data:
-                data = float(d.data[self.rule['MetricName']]['Value'])
-
-        if not have_data:
-            return self.NODATA
-
-        if self.do_data_cmp(data,
-                            float(self.rule['Threshold'])):
+            value = float(d.data[metric]['Value'])
+            count += 1
+            total += value
+            if minimum is None or value < minimum:
+                minimum = value
+            if maximum is None or value > maximum:
+                maximum = value
+        return count, total, minimum, maximum
+
+    def _compare(self, data):
+        if self.do_data_cmp(data, float(self.rule['Threshold'])):
             return self.ALARM
         else:
             return self.NORMAL
 
-    def do_Minimum(self):
-        data = 0
-        have_data = False
-        for d in self.watch_data:
-            if d.created_at < self.now - self.timeperiod:
-                continue
-            if not have_data:
-                data = float(d.data[self.rule['MetricName']]['Value'])
-                have_data = True
-            elif float(d.data[self.rule['MetricName']]['Value']) < data:
-                data = float(d.data[self.rule['MetricName']]['Value'])
-
-        if not have_data:
+    def do_Maximum(self):
+        count, total, minimum, maximum = self._rollup()
+        if not count:
             return self.NODATA
+        return self._compare(maximum)
 
-        if self.do_data_cmp(data,
-                            float(self.rule['Threshold'])):
-            return self.ALARM
-        else:
-            return self.NORMAL
+    def do_Minimum(self):
+        count, total, minimum, maximum = self._rollup()
+        if not count:
+            return self.NODATA
+        return self._compare(minimum)
 
     def do_SampleCount(self):
         '''
         count all samples within the specified period
         '''
-        data = 0
-        for d in self.watch_data:
-            if d.created_at < self.now - self.timeperiod:
-                continue
-            data = data + 1
-
-        if self.do_data_cmp(data,
-                            float(self.rule['Threshold'])):
-            return self.ALARM
-        else:
-            return self.NORMAL
+        count, total, minimum, maximum = self._rollup()
+        return self._compare(count)
 
     def do_Average(self):
-        data = 0
-        samples = 0
-        for d in self.watch_data:
-            if d.created_at < self.now - self.timeperiod:
-                continue
-            samples = samples + 1
-            data = data + float(d.data[self.rule['MetricName']]['Value'])
-
-        if samples == 0:
+        count, total, minimum, maximum = self._rollup()
+        if not count:
             return self.NODATA
-
-        data = data / samples
-        if self.do_data_cmp(data,
-                            float(self.rule['Threshold'])):
-            return self.ALARM
-        else:
-            return self.NORMAL
+        return self._compare(total / count)
 
     def do_Sum(self):
-        data = 0
-        for d in self.watch_data:
-            if d.created_at < self.now - self.timeperiod:
-                LOG.debug('ignoring %s' % str(d.data))
-                continue
-            data = data + float(d.data[self.rule['MetricName']]['Value'])
+        count, total, minimum, maximum = self._rollup()
+        return self._compare(total)
 
-        if self.do_data_cmp(data,
-                            float(self.rule['Threshold'])):
-            return self.ALARM
-        else:
-            return self.NORMAL
+    def discard_expired_data(self):
+        '''
+        Delete the stored samples that are too old to be used by the rule.
+        '''
+        if not self.id or not self.timeperiod:
+            return
+        expiry = self.now - self.timeperiod
+        watch_data_objects.WatchData.delete_expired(self.context, self.id,
+                                                    expiry)
+        self.watch_data = [d for d in self.watch_data
+                           if d.created_at >= expiry]
 
     def get_alarm_state(self):
         fn = getattr(self, 'do_%s' % self.rule['Statistic'])
         return fn()
 
-    def evaluate(self):
+    def evaluate(self, load_stack=None):
+        '''
+        Evaluate the rule if it is due, returning the actions to run.
+
+        load_stack is an optional function returning the Stack to run the
+        actions on; by default it is loaded with the context of the rule. It
+        is only called if there are actions to run.
+        '''
         if self.state in [self.CEILOMETER_CONTROLLED, self.SUSPENDED]:
             return []
         # has enough time progressed to run the rule
         self.now = timeutils.utcnow()
         if self.now < (self.last_evaluated + self.timeperiod):
             return []
-        return self.run_rule()
+        return self.run_rule(load_stack)
 
     def get_details(self):
         return {'alarm': self.name,
                 'state': self.state}
 
-    def run_rule(self):
+    def run_rule(self, load_stack=None):
         new_state = self.get_alarm_state()
-        actions = self.rule_actions(new_state)
+        actions = self.rule_actions(new_state, load_stack)
         self.state = new_state
 
         self.last_evaluated = self.now
         self.store()
+        self.discard_expired_data()
         return actions
 
-    def rule_actions(self, new_state):
+    def _load_stack(self):
+        s = stack_object.Stack.get_by_id(
+            self.context,
+            self.stack_id,
+            eager_load=True)
+        return stack.Stack.load(self.context, stack=s)
+
+    def rule_actions(self, new_state, load_stack=None):
         LOG.info(_LI('WATCH: stack:%(stack)s, watch_name:%(watch_name)s, '
                      'new_state:%(new_state)s'), {'stack': self.stack_id,
                                                   'watch_name': self.name,
@@ -263,11 +259,7 @@ class WatchRule(object):
         if self.ACTION_MAP[new_state] not in self.rule:
             LOG.info(_LI('no action for new state %s'), new_state)
         else:
-            s = stack_object.Stack.get_by_id(
-                self.context,
-                self.stack_id,
-                eager_load=True)
-            stk = stack.Stack.load(self.context, stack=s)
+            stk = (load_stack or self._load_stack)()
             if (stk.action != stk.DELETE
                     and stk.status == stk.COMPLETE):
                 for refid in self.rule[self.ACTION_MAP[new_state]]:
@@ -297,7 +289,8 @@ class WatchRule(object):
                       'k': k, 'sample': sample})
             clients.client('ceilometer').samples.create(**sample)
 
-    def create_watch_data(self, data):
+    def _watch_data_values(self, data):
+        """Return the values to store for a sample, or None to ignore it."""
         if self.state == self.CEILOMETER_CONTROLLED:
             # this is a short term measure for those that have cfn-push-stats
             # within their templates, but want to use Ceilometer alarms.
@@ -308,7 +301,7 @@ class WatchRule(object):
         if self.state == self.SUSPENDED:
             LOG.debug('Ignoring metric data for %s, SUSPENDED state'
                       % self.name)
-            return []
+            return
 
         if self.rule['MetricName'] not in data:
             # Our simplified cloudwatch implementation only expects a single
@@ -321,13 +314,20 @@ class WatchRule(object):
                                       'data': data})
             return
 
-        watch_data = {
+        return {
             'data': data,
             'watch_rule_id': self.id
         }
+
+    def create_watch_data(self, data):
+        watch_data = self._watch_data_values(data)
+        if watch_data is None:
+            return
+
         wd = watch_data_objects.WatchData.create(self.context, watch_data)
         LOG.debug('new watch:%(name)s data:%(data)s'
                   % {'name': self.name, 'data': str(wd.data)})
+        self.discard_expired_data()
 
     def state_set(self, state):
         '''
@@ -363,6 +363,38 @@ class WatchRule(object):
         return actions
 
 
+def rule_period(rule):
+    """Return the period over which a watch rule is evaluated."""
+    period = 0
+    if 'Period' in rule:
+        period = int(rule['Period'])
+    elif 'period' in rule:
+        period = int(rule['period'])
+    return datetime.timedelta(seconds=period)
+
+
+def _rule_metric_dimensions(state, rule):
+    """Return the metric name and dimensions a watch rule matches on."""
+    if state == WatchRule.CEILOMETER_CONTROLLED:
+        metric = rule['meter_name']
+        rule_dims = {}
+        for k, v in iter(rule.get('matching_metadata', {}).items()):
+            name = k.split('.')[-1]
+            rule_dims[name] = v
+    else:
+        metric = rule['MetricName']
+        rule_dims = dict((d['Name'], d['Value'])
+                         for d in rule.get('Dimensions', []))
+    return metric, rule_dims
+
+
+def _sample_dimensions(sample):
+    data_dims = sample.get('Dimensions', {})
+    if isinstance(data_dims, list):
+        data_dims = data_dims[0] if data_dims else {}
+    return data_dims
+
+
 def rule_can_use_sample(wr, stats_data):
     def match_dimesions(rule, data):
         for k, v in iter(rule.items()):
@@ -374,16 +406,7 @@ def rule_can_use_sample(wr, stats_data):
 
     if wr.state == WatchRule.SUSPENDED:
         return False
-    if wr.state == WatchRule.CEILOMETER_CONTROLLED:
-        metric = wr.rule['meter_name']
-        rule_dims = {}
-        for k, v in iter(wr.rule.get('matching_metadata', {}).items()):
-            name = k.split('.')[-1]
-            rule_dims[name] = v
-    else:
-        metric = wr.rule['MetricName']
-        rule_dims = dict((d['Name'], d['Value'])
-                         for d in wr.rule.get('Dimensions', []))
+    metric, rule_dims = _rule_metric_dimensions(wr.state, wr.rule)
 
     if metric not in stats_data:
         return False
@@ -392,9 +415,155 @@ def rule_can_use_sample(wr, stats_data):
         if k == 'Namespace':
             continue
         if k == metric:
-            data_dims = v.get('Dimensions', {})
-            if isinstance(data_dims, list):
-                data_dims = data_dims[0]
-            if match_dimesions(rule_dims, data_dims):
+            if match_dimesions(rule_dims, _sample_dimensions(v)):
                 return True
     return False
+
+
+class WatchRuleIndex(object):
+    """
+    An index of the watch rules in the database, by metric and dimensions.
+
+    Rules are grouped by metric name and then by the names of the dimensions
+    they match on, so that the rules which can use a sample are found with
+    one dictionary lookup per distinct set of dimension names, rather than by
+    checking every rule. The index is updated as rules are stored and
+    destroyed by this engine. When refresh() is called, the index is rebuilt
+    if the number of rules or the highest rule ID in the database shows that
+    another engine has added or removed some, or else if it is older than
+    the watch_rule_index_reload_interval option. Until then, samples matching
+    dimensions changed in place by another engine are missed.
+
+    Only the IDs of candidate rules are returned; callers must still check
+    each rule with rule_can_use_sample() once it is loaded.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._loaded_at = None
+        self._max_id = None
+        self._keys = {}
+        self._rules = {}
+
+    def _load(self, context):
+        self.reset()
+        for wr in watch_rule_objects.WatchRule.get_all(context):
+            self.add(wr.id, wr.state, wr.rule)
+        self._loaded_at = time.time()
+
+    def add(self, rule_id, state, rule):
+        self.remove(rule_id)
+        self._max_id = max(rule_id, self._max_id or rule_id)
+        try:
+            metric, rule_dims = _rule_metric_dimensions(state, rule)
+            names = tuple(sorted(rule_dims))
+            values = tuple(rule_dims[n] for n in names)
+            by_names = self._rules.setdefault(metric, {})
+            by_names.setdefault(names, {}).setdefault(values,
+                                                      set()).add(rule_id)
+        except (KeyError, TypeError) as ex:
+            # Still counted, so that the index is not reloaded on every use
+            LOG.debug('Not indexing watch rule %(id)s: %(ex)s' %
+                      {'id': rule_id, 'ex': ex})
+            self._keys[rule_id] = None
+            return
+        self._keys[rule_id] = (metric, names, values)
+
+    def remove(self, rule_id):
+        key = self._keys.pop(rule_id, None)
+        if key is None:
+            return
+        metric, names, values = key
+        by_names = self._rules[metric]
+        by_values = by_names[names]
+        by_values[values].discard(rule_id)
+        if not by_values[values]:
+            del by_values[values]
+            if not by_values:
+                del by_names[names]
+                if not by_names:
+                    del self._rules[metric]
+
+    def refresh(self, context):
+        """Rebuild the index if it may be out of date."""
+        if (self._loaded_at is not None and
+                time.time() - self._loaded_at <
+                cfg.CONF.watch_rule_index_reload_interval):
+            count, max_id = watch_rule_objects.WatchRule.count_and_max_id(
+                context)
+            if count == len(self._keys) and max_id == self._max_id:
+                return
+        self._load(context)
+
+    def candidates(self, stats_data):
+        """Return the IDs of the rules which may use the given sample."""
+        rule_ids = set()
+        for metric, sample in iter(stats_data.items()):
+            if metric == 'Namespace' or metric not in self._rules:
+                continue
+            data_dims = _sample_dimensions(sample)
+            for names, by_values in iter(self._rules[metric].items()):
+                if not all(n in data_dims for n in names):
+                    continue
+                try:
+                    values = tuple(data_dims[n] for n in names)
+                    rule_ids.update(by_values.get(values, ()))
+                except TypeError:
+                    continue
+        return sorted(rule_ids)
+
+
+_rule_index = WatchRuleIndex()
+
+
+def get_matching_rules(context, stats_data, loaded=None, refresh=True):
+    """
+    Return the loaded watch rules that can use the given sample.
+
+    Rules found in the optional dict of loaded rules, keyed by ID, are
+    reused rather than loaded again, and newly loaded rules are added to it.
+    When matching a batch of samples, pass refresh=False for all but the
+    first of them so that the index is only checked against the database
+    once.
+    """
+    if loaded is None:
+        loaded = {}
+    if refresh:
+        _rule_index.refresh(context)
+    for rule_id in _rule_index.candidates(stats_data):
+        rule = loaded.get(rule_id)
+        if rule is None:
+            wr = watch_rule_objects.WatchRule.get_by_id(context, rule_id)
+            if wr is None or not rule_can_use_sample(wr, stats_data):
+                continue
+            rule = loaded[rule_id] = WatchRule.load(context, watch=wr)
+        elif not rule_can_use_sample(rule, stats_data):
+            continue
+        yield rule
+
+
+def create_watch_data(context, samples):
+    """
+    Store a number of samples with a single insert.
+
+    samples is a list of (WatchRule, data) pairs, and each pair is handled
+    as WatchRule.create_watch_data() would handle the data.
+    """
+    values_list = []
+    rules = []
+    for rule, data in samples:
+        values = rule._watch_data_values(data)
+        if values is None:
+            continue
+        values_list.append(values)
+        if rule not in rules:
+            rules.append(rule)
+
+    watch_data_objects.WatchData.create_all(context, values_list)
+    LOG.debug('new watch data: %(count)d samples for %(rules)s'
+              % {'count': len(values_list),
+                 'rules': ', '.join(r.name for r in rules)})
+    for rule in rules:
+        rule.discard_expired_data()
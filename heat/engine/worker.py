@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+
 from oslo_log import log as logging
 import oslo_messaging
 from osprofiler import profiler
@@ -26,11 +28,99 @@ from heat.common import messaging as rpc_messaging
 from heat.engine import dependencies
 from heat.engine import resource
 from heat.engine import sync_point
+from heat.engine import template
 from heat.openstack.common import service
 from heat.rpc import worker_client as rpc_client
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of traversals for which parsed data is cached by each worker
+TRAVERSAL_CACHE_SIZE = 64
+
+
+class TraversalCacheEntry(object):
+    '''
+    The data shared by every node processed in a single traversal.
+    '''
+
+    def __init__(self):
+        self.stack_id = None
+        self._templates = {}
+        self._dependencies = None
+        self._dep_attrs = None
+
+    def load_template(self, context, template_id, t=None):
+        '''Load a Template, parsing it only once per traversal.'''
+        if template_id not in self._templates:
+            self._templates[template_id] = template.Template.load(
+                context, template_id, t)
+        return self._templates[template_id]
+
+    def dependencies(self, stack):
+        '''Return the dependencies and graph of the traversal.'''
+        if self._dependencies is None:
+            current_deps = ([tuple(i), (tuple(j) if j is not None else None)]
+                            for i, j in stack.current_deps['edges'])
+            deps = dependencies.Dependencies(edges=current_deps)
+            self._dependencies = deps, deps.graph()
+        return self._dependencies
+
+    def dep_attrs(self, stack):
+        '''Return the index of attributes referenced in the traversal.'''
+        if self._dep_attrs is None:
+            self._dep_attrs = stack.get_dep_attrs_index(
+                six.itervalues(stack.resources), stack.outputs)
+        return self._dep_attrs
+
+
+class TraversalCache(object):
+    '''
+    Cache of the parsed data shared by the nodes of a traversal.
+
+    Entries are keyed by the (globally unique) traversal ID and belong to a
+    single stack. Only the current traversal of each stack is kept: the entry
+    for a previous traversal is evicted as soon as a node of a newer traversal
+    of the same stack is processed.
+    '''
+
+    def __init__(self, max_size=TRAVERSAL_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+        self._current = {}
+
+    def get(self, traversal_id):
+        '''Return the entry for a traversal, creating it if necessary.'''
+        entry = self._entries.pop(traversal_id, None)
+        if entry is None:
+            entry = TraversalCacheEntry()
+        self._entries[traversal_id] = entry
+
+        while len(self._entries) > self.max_size:
+            self._evict_entry(*self._entries.popitem(last=False))
+
+        return entry
+
+    def set_current(self, stack_id, traversal_id):
+        '''Record the current traversal of a stack.'''
+        previous = self._current.get(stack_id)
+        if previous is not None and previous != traversal_id:
+            self.evict(previous)
+
+        entry = self._entries.get(traversal_id)
+        if entry is not None:
+            entry.stack_id = stack_id
+            self._current[stack_id] = traversal_id
+
+    def evict(self, traversal_id):
+        '''Remove the entry for a traversal from the cache.'''
+        entry = self._entries.pop(traversal_id, None)
+        if entry is not None:
+            self._evict_entry(traversal_id, entry)
+
+    def _evict_entry(self, traversal_id, entry):
+        if self._current.get(entry.stack_id) == traversal_id:
+            del self._current[entry.stack_id]
+
 
 @profiler.trace_cls("rpc")
 class WorkerService(service.Service):
@@ -57,6 +147,7 @@ class WorkerService(service.Service):
 
         self._rpc_client = None
         self._rpc_server = None
+        self._traversal_cache = TraversalCache()
 
     def start(self):
         target = oslo_messaging.Target(
@@ -92,20 +183,21 @@ class WorkerService(service.Service):
         The node may be associated with either an update or a cleanup of its
         associated resource.
         '''
+        cache = self._traversal_cache.get(current_traversal)
         try:
-            rsrc, stack = resource.Resource.load(cnxt, resource_id, data)
+            rsrc, stack = resource.Resource.load(
+                cnxt, resource_id, data, load_template=cache.load_template)
         except exception.NotFound:
             return
         tmpl = stack.t
 
         if current_traversal != rsrc.stack.current_traversal:
             LOG.debug('[%s] Traversal cancelled; stopping.', current_traversal)
+            self._traversal_cache.evict(current_traversal)
             return
 
-        current_deps = ([tuple(i), (tuple(j) if j is not None else None)]
-                        for i, j in rsrc.stack.current_deps['edges'])
-        deps = dependencies.Dependencies(edges=current_deps)
-        graph = deps.graph()
+        self._traversal_cache.set_current(stack.id, current_traversal)
+        deps, graph = cache.dependencies(rsrc.stack)
 
         if is_update:
             if (rsrc.replaced_by is not None and
@@ -122,7 +214,8 @@ class WorkerService(service.Service):
             except resource.UpdateInProgress:
                 return
 
-            input_data = construct_input_data(rsrc)
+            input_data = construct_input_data(rsrc,
+                                              cache.dep_attrs(rsrc.stack))
         else:
             try:
                 check_resource_cleanup(rsrc, tmpl.id, data)
@@ -154,11 +247,12 @@ class WorkerService(service.Service):
             pass
 
 
-def construct_input_data(rsrc):
-    attributes = rsrc.stack.get_dep_attrs(
-        six.itervalues(rsrc.stack.resources),
-        rsrc.stack.outputs,
-        rsrc.name)
+def construct_input_data(rsrc, dep_attrs=None):
+    if dep_attrs is None:
+        dep_attrs = rsrc.stack.get_dep_attrs_index(
+            six.itervalues(rsrc.stack.resources),
+            rsrc.stack.outputs)
+    attributes = dep_attrs.get(rsrc.name, set())
     resolved_attributes = {attr: rsrc.FnGetAtt(attr) for attr in attributes}
     input_data = {'id': rsrc.id,
                   'name': rsrc.name,
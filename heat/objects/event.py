@@ -78,3 +78,7 @@ class Event(base.VersionedObject, base.VersionedObjectDictCompat):
     def create(cls, context, values):
         return cls._from_db_object(context, cls(),
                                    db_api.event_create(context, values))
+
+    @classmethod
+    def create_all(cls, context, values_list):
+        db_api.event_create_all(context, values_list)
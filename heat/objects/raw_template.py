@@ -36,6 +36,7 @@ class RawTemplate(
     fields = {
         'id': fields.StringField(),
         'files': heat_fields.JsonField(nullable=True),
+        'files_id': fields.StringField(nullable=True),
         'template': heat_fields.JsonField(),
         'environment': heat_fields.JsonField(),
         'predecessor': fields.IntegerField(),
@@ -69,6 +70,10 @@ class RawTemplate(
         raw_template = cls._from_db_object(context, cls(), raw_template_db)
         return raw_template
 
+    @classmethod
+    def get_templates(cls, context, template_ids):
+        return db_api.raw_template_get_templates(context, template_ids)
+
     @classmethod
     def encrypt_hidden_parameters(cls, tmpl):
         if cfg.CONF.encrypt_parameters_and_properties:
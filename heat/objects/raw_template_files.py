@@ -0,0 +1,51 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""
+RawTemplateFiles object
+"""
+
+from oslo_versionedobjects import base
+from oslo_versionedobjects import fields
+
+from heat.db import api as db_api
+from heat.objects import fields as heat_fields
+
+
+class RawTemplateFiles(
+    base.VersionedObject,
+    base.VersionedObjectDictCompat,
+    base.ComparableVersionedObject,
+):
+    fields = {
+        'id': fields.StringField(),
+        'files': heat_fields.JsonField(),
+    }
+
+    @staticmethod
+    def _from_db_object(context, tpl_files, db_tpl_files):
+        for field in tpl_files.fields:
+            tpl_files[field] = db_tpl_files[field]
+        tpl_files._context = context
+        tpl_files.obj_reset_changes()
+        return tpl_files
+
+    @classmethod
+    def get_by_id(cls, context, files_id):
+        db_tpl_files = db_api.raw_template_files_get(context, files_id)
+        return cls._from_db_object(context, cls(), db_tpl_files)
+
+    @classmethod
+    def create(cls, context, files):
+        db_tpl_files = db_api.raw_template_files_create(context, files)
+        return cls._from_db_object(context, cls(), db_tpl_files)
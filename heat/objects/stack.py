@@ -17,10 +17,13 @@
 Stack object
 """
 
+from oslo_serialization import jsonutils
+from oslo_utils import encodeutils
 from oslo_versionedobjects import base
 from oslo_versionedobjects import fields
 
 
+from heat.common import crypt
 from heat.db import api as db_api
 from heat.objects import fields as heat_fields
 from heat.objects import raw_template
@@ -59,27 +62,44 @@ class Stack(
         'prev_raw_template': fields.ObjectField('RawTemplate'),
         'tags': fields.ObjectField('StackTagList'),
         'parent_resource_name': fields.StringField(nullable=True),
+        'cached_outputs': heat_fields.JsonField(nullable=True),
+        'outputs_generation': fields.IntegerField(nullable=True),
     }
 
     @staticmethod
     def _from_db_object(context, stack, db_stack):
         for field in stack.fields:
             if field == 'raw_template':
-                stack['raw_template'] = (
-                    raw_template.RawTemplate.get_by_id(
-                        context, db_stack['raw_template_id']))
+                # The template is only loaded on demand (see obj_load_attr),
+                # unless it is being refreshed.
+                if stack.obj_attr_is_set(field):
+                    stack['raw_template'] = (
+                        raw_template.RawTemplate.get_by_id(
+                            context, db_stack['raw_template_id']))
             elif field == 'tags':
-                if db_stack.get(field) is not None:
-                    stack['tags'] = stack_tag.StackTagList.get(
-                        context, db_stack['id'])
+                if db_stack.get(field):
+                    stack['tags'] = base.obj_make_list(
+                        context, stack_tag.StackTagList(), stack_tag.StackTag,
+                        db_stack[field])
                 else:
                     stack['tags'] = None
+            elif field == 'cached_outputs':
+                stack['cached_outputs'] = Stack._decrypt_outputs(
+                    db_stack.__dict__.get(field))
             else:
                 stack[field] = db_stack.__dict__.get(field)
         stack._context = context
         stack.obj_reset_changes()
         return stack
 
+    def obj_load_attr(self, attrname):
+        if attrname != 'raw_template':
+            return super(Stack, self).obj_load_attr(attrname)
+
+        self['raw_template'] = raw_template.RawTemplate.get_by_id(
+            self._context, self.raw_template_id)
+        self.obj_reset_changes([attrname])
+
     @classmethod
     def get_root_id(cls, context, stack_id):
         return db_api.stack_get_root_id(context, stack_id)
@@ -134,6 +154,10 @@ class Stack(
             db_stacks)
         return stacks
 
+    @classmethod
+    def get_identities(cls, context, stack_ids):
+        return db_api.stack_get_identities(context, stack_ids)
+
     @classmethod
     def count_all(cls, context, **kwargs):
         return db_api.stack_count_all(context, **kwargs)
@@ -150,6 +174,28 @@ class Stack(
     def update_by_id(cls, context, stack_id, values):
         return db_api.stack_update(context, stack_id, values)
 
+    @staticmethod
+    def _decrypt_outputs(encrypted_outputs):
+        if encrypted_outputs is None:
+            return None
+        method, value = encrypted_outputs
+        decrypt_function = getattr(crypt, method)
+        return jsonutils.loads(
+            encodeutils.safe_decode(decrypt_function(value)))
+
+    @classmethod
+    def cache_outputs(cls, context, stack_id, outputs, generation):
+        # Outputs may reveal secrets (e.g. passwords or private keys), so
+        # they are only stored encrypted, like redacted resource data.
+        encrypted_outputs = list(crypt.encrypt(
+            encodeutils.safe_encode(jsonutils.dumps(outputs))))
+        return db_api.stack_cache_outputs(context, stack_id,
+                                          encrypted_outputs, generation)
+
+    @classmethod
+    def clear_cached_outputs(cls, context, stack_id):
+        return db_api.stack_clear_cached_outputs(context, stack_id)
+
     @classmethod
     def delete(cls, context, stack_id):
         return db_api.stack_delete(context, stack_id)
@@ -82,6 +82,36 @@ class SyncPoint(base.VersionedObject,
             atomic_key,
             input_data)
 
+    @classmethod
+    def add_input_data(cls,
+                       context,
+                       entity_id,
+                       traversal_id,
+                       is_update,
+                       stack_id,
+                       input_data):
+        values = {'entity_id': entity_id, 'traversal_id': traversal_id,
+                  'is_update': is_update, 'stack_id': stack_id,
+                  'input_data': input_data}
+        return db_api.sync_point_input_create(context, values)
+
+    @classmethod
+    def get_all_input_data(cls,
+                           context,
+                           entity_id,
+                           traversal_id,
+                           is_update):
+        return [i.input_data for i in db_api.sync_point_input_get_all(
+            context,
+            entity_id,
+            traversal_id,
+            is_update)]
+
+    @classmethod
+    def count_input_data(cls, context, entity_id, traversal_id, is_update):
+        return db_api.sync_point_input_count(context, entity_id,
+                                             traversal_id, is_update)
+
     @classmethod
     def delete_all_by_stack_and_traversal(cls,
                                           context,
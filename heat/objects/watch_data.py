@@ -54,6 +54,10 @@ class WatchData(base.VersionedObject, base.VersionedObjectDictCompat):
         db_data = db_api.watch_data_create(context, values)
         return cls._from_db_object(context, cls(), db_data)
 
+    @classmethod
+    def create_all(cls, context, values_list):
+        db_api.watch_data_create_all(context, values_list)
+
     @classmethod
     def get_all(cls, context):
         return [cls._from_db_object(context, cls(), db_data)
@@ -64,3 +68,8 @@ class WatchData(base.VersionedObject, base.VersionedObjectDictCompat):
         return (cls._from_db_object(context, cls(), db_data)
                 for db_data in db_api.watch_data_get_all_by_watch_rule_id(
                     context, watch_rule_id))
+
+    @classmethod
+    def delete_expired(cls, context, watch_rule_id, expiry):
+        return db_api.watch_data_delete_expired(context, watch_rule_id,
+                                                expiry)
@@ -43,21 +43,39 @@ class WatchRule(base.VersionedObject, base.VersionedObjectDictCompat):
     @staticmethod
     def _from_db_object(context, rule, db_rule):
         for field in rule.fields:
+            # The stack and the watch data are only loaded on demand (see
+            # obj_load_attr), unless they are being refreshed.
             if field == 'stack':
-                rule[field] = stack.Stack._from_db_object(
-                    context, stack.Stack(), db_rule[field])
+                if rule.obj_attr_is_set(field):
+                    rule[field] = stack.Stack._from_db_object(
+                        context, stack.Stack(), db_rule[field])
             elif field == 'watch_data':
-                rule[field] = watch_data.WatchData.get_all_by_watch_rule_id(
-                    context, db_rule['id'])
+                if rule.obj_attr_is_set(field):
+                    rule[field] = (
+                        watch_data.WatchData.get_all_by_watch_rule_id(
+                            context, db_rule['id']))
             else:
                 rule[field] = db_rule[field]
         rule._context = context
         rule.obj_reset_changes()
         return rule
 
+    def obj_load_attr(self, attrname):
+        if attrname == 'stack':
+            self['stack'] = stack.Stack.get_by_id(self._context,
+                                                  self.stack_id)
+        elif attrname == 'watch_data':
+            self['watch_data'] = watch_data.WatchData.get_all_by_watch_rule_id(
+                self._context, self.id)
+        else:
+            return super(WatchRule, self).obj_load_attr(attrname)
+        self.obj_reset_changes([attrname])
+
     @classmethod
     def get_by_id(cls, context, rule_id):
         db_rule = db_api.watch_rule_get(context, rule_id)
+        if db_rule is None:
+            return None
         return cls._from_db_object(context, cls(), db_rule)
 
     @classmethod
@@ -70,12 +88,22 @@ class WatchRule(base.VersionedObject, base.VersionedObjectDictCompat):
         return [cls._from_db_object(context, cls(), db_rule)
                 for db_rule in db_api.watch_rule_get_all(context)]
 
+    @classmethod
+    def get_all_newer(cls, context, watch_rule_id):
+        return [cls._from_db_object(context, cls(), db_rule)
+                for db_rule in db_api.watch_rule_get_all_newer(context,
+                                                               watch_rule_id)]
+
     @classmethod
     def get_all_by_stack(cls, context, stack_id):
         return [cls._from_db_object(context, cls(), db_rule)
                 for db_rule in db_api.watch_rule_get_all_by_stack(context,
                                                                   stack_id)]
 
+    @classmethod
+    def count_and_max_id(cls, context):
+        return db_api.watch_rule_count_and_max_id(context)
+
     @classmethod
     def update_by_id(cls, context, watch_id, values):
         db_api.watch_rule_update(context, watch_id, values)
@@ -30,6 +30,8 @@ class EngineClient(object):
         1.1 - Add support_status argument to list_resource_types()
         1.4 - Add support for service list
         1.9 - Add template_type option to generate_template()
+        1.10 - Add refresh_outputs option to show_stack()
+        1.11 - Add create_watch_data_batch()
     '''
 
     BASE_RPC_API_VERSION = '1.0'
@@ -167,15 +169,19 @@ class EngineClient(object):
                                              not_tags_any=not_tags_any),
                          version='1.8')
 
-    def show_stack(self, ctxt, stack_identity):
+    def show_stack(self, ctxt, stack_identity, refresh_outputs=False):
         """
         Return detailed information about one or all stacks.
         :param ctxt: RPC context.
         :param stack_identity: Name of the stack you want to show, or None to
         show all
+        :param refresh_outputs: Resolve the outputs again rather than using
+        the cached values
         """
         return self.call(ctxt, self.make_msg('show_stack',
-                                             stack_identity=stack_identity))
+                                             stack_identity=stack_identity,
+                                             refresh_outputs=refresh_outputs),
+                         version='1.10')
 
     def preview_stack(self, ctxt, stack_name, template, params, files, args):
         """
@@ -475,6 +481,19 @@ class EngineClient(object):
                                              watch_name=watch_name,
                                              stats_data=stats_data))
 
+    def create_watch_data_batch(self, ctxt, watch_name, stats_data_list):
+        '''
+        Post a number of metric samples with a single call.
+        :param ctxt: RPC context.
+        :param watch_name: Name of the watch/alarm, or None to match the
+                           samples to watches by their dimensions.
+        :param stats_data_list: A list of the data to post.
+        '''
+        return self.call(ctxt, self.make_msg('create_watch_data_batch',
+                                             watch_name=watch_name,
+                                             stats_data_list=stats_data_list),
+                         version='1.11')
+
     def show_watch(self, ctxt, watch_name):
         """
         The show_watch method returns the attributes of one watch
@@ -609,6 +609,35 @@ class HeatMigrationsCheckers(test_migrations.WalkVersionsMixin,
     def _check_062(self, engine, data):
         self.assertColumnExists(engine, 'stack', 'parent_resource_name')
 
+    def _check_063(self, engine, data):
+        column_list = [('id', False),
+                       ('entity_id', False),
+                       ('traversal_id', False),
+                       ('is_update', False),
+                       ('stack_id', False),
+                       ('input_data', True),
+                       ('updated_at', True),
+                       ('created_at', True)]
+        for column in column_list:
+            self.assertColumnExists(engine, 'sync_point_input', column[0])
+            if not column[1]:
+                self.assertColumnIsNotNullable(engine, 'sync_point_input',
+                                               column[0])
+            else:
+                self.assertColumnIsNullable(engine, 'sync_point_input',
+                                            column[0])
+
+    def _check_064(self, engine, data):
+        self.assertColumnExists(engine, 'stack', 'cached_outputs')
+        self.assertColumnExists(engine, 'stack', 'outputs_generation')
+
+    def _check_065(self, engine, data):
+        for column in ('id', 'files', 'created_at', 'updated_at'):
+            self.assertColumnExists(engine, 'raw_template_files', column)
+        self.assertColumnIsNotNullable(engine, 'raw_template_files', 'id')
+        self.assertColumnExists(engine, 'raw_template', 'files_id')
+        self.assertColumnIsNullable(engine, 'raw_template', 'files_id')
+
 
 class TestHeatMigrationsMySQL(HeatMigrationsCheckers,
                               test_base.MySQLOpportunisticTestCase):
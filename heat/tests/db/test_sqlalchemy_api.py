@@ -18,6 +18,7 @@ import uuid
 import mock
 import mox
 from oslo_config import cfg
+from oslo_db import exception as db_exception
 from oslo_utils import timeutils
 import six
 
@@ -215,6 +216,16 @@ class SqlAlchemyTest(common.HeatTestCase):
         args, _ = mock_paginate_query.call_args
         self.assertIn(['created_at', 'id'], args)
 
+    @mock.patch.object(db_api.utils, 'paginate_query')
+    def test_events_paginate_query_default_sorts_by_id(
+            self, mock_paginate_query):
+        query = mock.Mock()
+        model = mock.Mock()
+        db_api._events_paginate_query(self.ctx, query, model, sort_keys=None)
+        args, _ = mock_paginate_query.call_args
+        self.assertIn(['id'], args)
+        self.assertIn('desc', args)
+
     @mock.patch.object(db_api.utils, 'paginate_query')
     def test_paginate_query_default_sorts_dir_by_desc(self,
                                                       mock_paginate_query):
@@ -1429,6 +1440,15 @@ class DBAPIRawTemplateTest(common.HeatTestCase):
         self.assertEqual(tp.id, template.id)
         self.assertEqual(tp.template, template.template)
 
+    def test_raw_template_get_templates(self):
+        t = template_format.parse(wp_template)
+        tp1 = create_raw_template(self.ctx, template=t)
+        tp2 = create_raw_template(self.ctx, template={'foo': 'bar'})
+        templates = db_api.raw_template_get_templates(
+            self.ctx, [tp1.id, tp2.id, tp1.id])
+        self.assertEqual({tp1.id: t, tp2.id: {'foo': 'bar'}}, templates)
+        self.assertEqual({}, db_api.raw_template_get_templates(self.ctx, []))
+
     def test_raw_template_update(self):
         another_wp_template = '''
         {
@@ -1479,6 +1499,73 @@ class DBAPIRawTemplateTest(common.HeatTestCase):
                           self.ctx, tp.id)
 
 
+class DBAPIRawTemplateFilesTest(common.HeatTestCase):
+    def setUp(self):
+        super(DBAPIRawTemplateFilesTest, self).setUp()
+        self.ctx = utils.dummy_context()
+
+    def test_raw_template_files_create(self):
+        files = {'foo': 'bar', 'provider.yaml': 'heat_template_version: x'}
+        first = db_api.raw_template_files_create(self.ctx, files)
+        second = db_api.raw_template_files_create(self.ctx, dict(files))
+        self.assertEqual(64, len(first.id))
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(files, db_api.raw_template_files_get(
+            self.ctx, first.id).files)
+
+        other = db_api.raw_template_files_create(self.ctx, {'foo': 'baz'})
+        self.assertNotEqual(first.id, other.id)
+
+    def test_raw_template_files_get_not_found(self):
+        self.assertRaises(exception.NotFound, db_api.raw_template_files_get,
+                          self.ctx, 'missing')
+
+    def test_raw_template_files_dedupe(self):
+        shared = [create_raw_template(self.ctx) for i in range(3)]
+        other = create_raw_template(self.ctx, files={'foo': 'baz'})
+        stored = db_api.raw_template_files_create(self.ctx, {'foo': 'baz'})
+
+        self.assertEqual((4, 1),
+                         db_api.raw_template_files_dedupe(batch_size=2))
+
+        files_ids = set()
+        for rt in shared:
+            db_rt = db_api.raw_template_get(self.ctx, rt.id)
+            self.assertIsNone(db_rt.files)
+            files_ids.add(db_rt.files_id)
+        self.assertEqual(1, len(files_ids))
+        self.assertEqual({'foo': 'bar'}, db_api.raw_template_files_get(
+            self.ctx, files_ids.pop()).files)
+        self.assertEqual(stored.id, db_api.raw_template_get(
+            self.ctx, other.id).files_id)
+
+        # Running it again has nothing left to do
+        self.assertEqual((0, 0), db_api.raw_template_files_dedupe())
+
+    def test_purge_deleted_shared_files(self):
+        deleted_at = datetime.datetime.now() - datetime.timedelta(days=2)
+        files = db_api.raw_template_files_create(self.ctx, {'foo': 'bar'})
+        creds = create_user_creds(self.ctx)
+        stacks = [create_stack(self.ctx,
+                               create_raw_template(self.ctx, files=None,
+                                                   files_id=files.id),
+                               creds)
+                  for i in range(2)]
+
+        db_api.stack_update(self.ctx, stacks[0].id,
+                            {'deleted_at': deleted_at})
+        purged = db_api.purge_deleted(age=1)
+        self.assertEqual(1, purged['raw_template'])
+        self.assertEqual(0, purged['raw_template_files'])
+
+        db_api.stack_update(self.ctx, stacks[1].id,
+                            {'deleted_at': deleted_at})
+        purged = db_api.purge_deleted(age=1)
+        self.assertEqual(1, purged['raw_template_files'])
+        self.assertRaises(exception.NotFound, db_api.raw_template_files_get,
+                          self.ctx, files.id)
+
+
 class DBAPIUserCredsTest(common.HeatTestCase):
     def setUp(self):
         super(DBAPIUserCredsTest, self).setUp()
@@ -1628,6 +1715,46 @@ class DBAPIStackTest(common.HeatTestCase):
         self.assertRaises(exception.NotFound, db_api.stack_update, self.ctx,
                           UUID2, values)
 
+    def test_stack_clear_cached_outputs(self):
+        outputs = [{'output_key': 'foo', 'output_value': 'bar'}]
+        root = create_stack(self.ctx, self.template, self.user_creds,
+                            cached_outputs=outputs)
+        child = create_stack(self.ctx, self.template, self.user_creds,
+                             owner_id=root.id, cached_outputs=outputs)
+        other = create_stack(self.ctx, self.template, self.user_creds,
+                             cached_outputs=outputs)
+
+        db_api.stack_clear_cached_outputs(self.ctx, child.id)
+
+        self.assertIsNone(db_api.stack_get(self.ctx, root.id).cached_outputs)
+        self.assertIsNone(db_api.stack_get(self.ctx, child.id).cached_outputs)
+        self.assertEqual(outputs,
+                         db_api.stack_get(self.ctx, other.id).cached_outputs)
+
+    def test_stack_cache_outputs(self):
+        outputs = [{'output_key': 'foo', 'output_value': 'bar'}]
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        generation = stack.outputs_generation
+
+        self.assertTrue(db_api.stack_cache_outputs(self.ctx, stack.id,
+                                                   outputs, generation))
+        self.assertEqual(outputs,
+                         db_api.stack_get(self.ctx, stack.id).cached_outputs)
+
+    def test_stack_cache_outputs_cleared_since_read(self):
+        outputs = [{'output_key': 'foo', 'output_value': 'bar'}]
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        generation = stack.outputs_generation
+
+        new_generation = db_api.stack_clear_cached_outputs(self.ctx, stack.id)
+        self.assertNotEqual(generation, new_generation)
+
+        self.assertFalse(db_api.stack_cache_outputs(self.ctx, stack.id,
+                                                    outputs, generation))
+        self.assertIsNone(db_api.stack_get(self.ctx, stack.id).cached_outputs)
+        self.assertTrue(db_api.stack_cache_outputs(self.ctx, stack.id,
+                                                   outputs, new_generation))
+
     def test_stack_get_returns_a_stack(self):
         stack = create_stack(self.ctx, self.template, self.user_creds)
         ret_stack = db_api.stack_get(self.ctx, stack.id, show_deleted=False)
@@ -1708,6 +1835,22 @@ class DBAPIStackTest(common.HeatTestCase):
                                                            parent_stack2.id)
         self.assertEqual(2, len(stack2_children))
 
+    def test_stack_get_identities(self):
+        stack1 = create_stack(self.ctx, self.template, self.user_creds,
+                              name='stack1', tenant='tenant1')
+        stack2 = create_stack(self.ctx, self.template, self.user_creds,
+                              name='stack2', tenant='tenant2')
+        create_stack(self.ctx, self.template, self.user_creds)
+        db_api.stack_delete(self.ctx, stack2.id)
+
+        identities = db_api.stack_get_identities(self.ctx,
+                                                 [stack1.id, stack2.id,
+                                                  stack1.id])
+        self.assertEqual(sorted([(stack1.id, 'stack1', 'tenant1'),
+                                 (stack2.id, 'stack2', 'tenant2')]),
+                         sorted(tuple(i) for i in identities))
+        self.assertEqual([], db_api.stack_get_identities(self.ctx, []))
+
     def test_stack_get_all_with_regular_tenant(self):
         values = [
             {'tenant': UUID1},
@@ -1800,6 +1943,69 @@ class DBAPIStackTest(common.HeatTestCase):
         self._deleted_stack_existance(utils.dummy_context(), stacks,
                                       (), (0, 1, 2, 3, 4))
 
+    def test_purge_deleted_child_tables(self):
+        deleted_at = datetime.datetime.now() - datetime.timedelta(days=2)
+        templates = [create_raw_template(self.ctx) for i in range(2)]
+        creds = create_user_creds(self.ctx)
+        stack = create_stack(self.ctx, templates[0], creds)
+        nested = create_stack(self.ctx, templates[1], creds,
+                              owner_id=stack.id)
+
+        res = create_resource(self.ctx, stack)
+        create_resource_data(self.ctx, res)
+        [create_event(self.ctx, stack_id=stack.id) for i in range(3)]
+        rule = create_watch_rule(self.ctx, stack)
+        create_watch_data(self.ctx, rule)
+        db_api.snapshot_create(self.ctx, {'tenant': self.ctx.tenant_id,
+                                          'status': 'COMPLETE',
+                                          'stack_id': stack.id})
+        db_api.stack_tags_set(self.ctx, stack.id, ['tag1', 'tag2'])
+        create_sync_point(self.ctx, stack_id=stack.id)
+        db_api.sync_point_input_create(self.ctx, {
+            'entity_id': res.id, 'traversal_id': 'dummy-uuid',
+            'is_update': True, 'stack_id': stack.id, 'input_data': {}})
+        db_api.stack_update(self.ctx, stack.id, {'deleted_at': deleted_at})
+
+        purged = db_api.purge_deleted(age=1, batch_size=2)
+
+        self.assertEqual({'event': 3, 'resource_data': 1, 'resource': 1,
+                          'watch_data': 1, 'watch_rule': 1, 'snapshot': 1,
+                          'stack_tag': 2, 'sync_point_input': 1,
+                          'sync_point': 1, 'stack_lock': 0, 'stack': 1,
+                          'raw_template': 1, 'raw_template_files': 0,
+                          'user_creds': 0, 'service': 0},
+                         dict(purged))
+        self.assertEqual(list(db_api.PURGE_TABLES), list(purged))
+        self._deleted_stack_existance(utils.dummy_context(),
+                                      [stack, nested], (1,), (0,))
+        # The credentials are still in use by the nested stack
+        self.assertIsNotNone(db_api.user_creds_get(creds.id))
+        self.assertIsNotNone(db_api.raw_template_get(self.ctx,
+                                                     templates[1].id))
+
+        # Running the purge again has nothing left to do
+        purged = db_api.purge_deleted(age=1, batch_size=2)
+        self.assertEqual(0, sum(purged.values()))
+
+    def test_purge_deleted_invalid_batch(self):
+        self.assertRaises(exception.Error, db_api.purge_deleted, 1,
+                          batch_size=0)
+        self.assertRaises(exception.Error, db_api.purge_deleted, 1,
+                          batch_size='a')
+        self.assertRaises(exception.Error, db_api.purge_deleted, 1,
+                          rate_limit=-1)
+
+    @mock.patch('time.sleep')
+    def test_purge_deleted_rate_limit(self, mock_sleep):
+        deleted_at = datetime.datetime.now() - datetime.timedelta(days=2)
+        for i in range(3):
+            create_stack(self.ctx, create_raw_template(self.ctx),
+                         create_user_creds(self.ctx), deleted_at=deleted_at)
+
+        purged = db_api.purge_deleted(age=1, batch_size=1, rate_limit=1)
+        self.assertEqual(3, purged['stack'])
+        self.assertTrue(mock_sleep.called)
+
     def _deleted_stack_existance(self, ctx, stacks, existing, deleted):
         for s in existing:
             self.assertIsNotNone(db_api.stack_get(ctx, stacks[s].id,
@@ -1827,6 +2033,66 @@ class DBAPIStackTest(common.HeatTestCase):
         self.assertEqual(root.id, db_api.stack_get_root_id(
             self.ctx, child_1.id))
 
+    def test_stack_count_total_resources_deleted_nested(self):
+        root = create_stack(self.ctx, self.template, self.user_creds)
+        child = create_stack(self.ctx, self.template, self.user_creds,
+                             owner_id=root.id)
+        deleted = create_stack(self.ctx, self.template, self.user_creds,
+                               owner_id=root.id,
+                               deleted_at=timeutils.utcnow())
+        for stack in (root, child, deleted):
+            create_resource(self.ctx, stack)
+
+        self.assertEqual(2, db_api.stack_count_total_resources(self.ctx,
+                                                               root.id))
+        with mock.patch.object(db_api, '_supports_recursive_cte',
+                               return_value=False):
+            self.assertEqual(2, db_api.stack_count_total_resources(
+                self.ctx, root.id))
+
+    @mock.patch.object(db_api, '_supports_recursive_cte',
+                       return_value=False)
+    def test_stack_get_root_id_no_cte(self, mock_cte):
+        self.test_stack_get_root_id()
+        self.assertTrue(mock_cte.called)
+
+    @mock.patch.object(db_api, '_supports_recursive_cte',
+                       return_value=False)
+    def test_stack_count_total_resources_no_cte(self, mock_cte):
+        self.test_stack_count_total_resources()
+        self.assertTrue(mock_cte.called)
+
+    def test_stack_count_total_resources_cte_error(self):
+        nested_stack_ids = db_api._nested_stack_ids
+
+        def nested_stack_ids_cte_error(context, stack_id, recursive=True):
+            if recursive:
+                raise db_exception.DBError('WITH RECURSIVE not supported')
+            return nested_stack_ids(context, stack_id, recursive)
+
+        with mock.patch.object(db_api, '_nested_stack_ids',
+                               side_effect=nested_stack_ids_cte_error):
+            self.test_stack_count_total_resources()
+
+    def test_supports_recursive_cte(self):
+        def supports(name, version):
+            dialect = mock.Mock(server_version_info=version,
+                                _is_mariadb=False)
+            dialect.name = name
+            session = mock.Mock()
+            session.get_bind.return_value.dialect = dialect
+            return db_api._supports_recursive_cte(session)
+
+        self.assertTrue(supports('postgresql', (9, 1)))
+        self.assertTrue(supports('sqlite', (3, 8, 3)))
+        self.assertFalse(supports('sqlite', (3, 7, 17)))
+        self.assertTrue(supports('mysql', (8, 0, 11)))
+        self.assertFalse(supports('mysql', (5, 7, 22)))
+        self.assertFalse(supports('mysql', (10, 1, 14, 'MariaDB')))
+        self.assertFalse(supports('mysql', (5, 5, 5, 10, 0, 38, 'MariaDB')))
+        self.assertTrue(supports('mysql', (10, 2, 2, 'MariaDB')))
+        self.assertTrue(supports('mysql', (5, 5, 5, 10, 3, 9, 'MariaDB')))
+
     def test_stack_count_total_resources(self):
 
         def add_resources(stack, count):
@@ -2127,6 +2393,57 @@ class DBAPIEventTest(common.HeatTestCase):
         self.assertEqual('create_complete', ret_event.resource_status_reason)
         self.assertEqual({'name': 'foo'}, ret_event.resource_properties)
 
+    def test_event_create_all(self):
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        values = [{'stack_id': stack.id, 'uuid': str(uuid.uuid4()),
+                   'resource_name': 'res%d' % i,
+                   'resource_status_reason': 'x' * 300,
+                   'resource_properties': {'name': 'foo'}}
+                  for i in range(3)]
+
+        db_api.event_create_all(self.ctx, values)
+
+        events = db_api.event_get_all_by_stack(self.ctx, stack.id,
+                                               sort_dir='asc')
+        self.assertEqual([v['uuid'] for v in values],
+                         [e.uuid for e in events])
+        self.assertEqual(255, len(events[0].resource_status_reason))
+        self.assertEqual({'name': 'foo'}, events[0].resource_properties)
+        self.assertIsNotNone(events[0].created_at)
+
+    def test_event_create_all_prunes(self):
+        cfg.CONF.set_override('max_events_per_stack', 3)
+        cfg.CONF.set_override('event_purge_batch_size', 1)
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        create_event(self.ctx, stack_id=stack.id, resource_name='old')
+
+        db_api.event_create_all(self.ctx, [
+            {'stack_id': stack.id, 'uuid': str(uuid.uuid4()),
+             'resource_name': 'res%d' % i} for i in range(3)])
+
+        events = db_api.event_get_all_by_stack(self.ctx, stack.id)
+        self.assertEqual(['res2', 'res1', 'res0'],
+                         [e.resource_name for e in events])
+
+    def test_event_create_prunes_in_batches(self):
+        cfg.CONF.set_override('max_events_per_stack', 5)
+        cfg.CONF.set_override('event_purge_batch_size', 2)
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+
+        with mock.patch.object(db_api, 'event_count_all_by_stack',
+                               wraps=db_api.event_count_all_by_stack) as count:
+            for i in range(10):
+                create_event(self.ctx, stack_id=stack.id,
+                             resource_name='res%d' % i)
+                events = db_api.event_get_all_by_stack(self.ctx, stack.id)
+                self.assertTrue(len(events) <= 5)
+
+            self.assertEqual(5, count.call_count)
+
+        events = db_api.event_get_all_by_stack(self.ctx, stack.id)
+        self.assertEqual(['res9', 'res8', 'res7', 'res6', 'res5'],
+                         [e.resource_name for e in events])
+
     def test_event_get_all(self):
         self.stack1 = create_stack(self.ctx, self.template, self.user_creds,
                                    tenant='tenant1')
@@ -2259,6 +2576,23 @@ class DBAPIWatchRuleTest(common.HeatTestCase):
         names = [wr.name for wr in wrs]
         [self.assertIn(val['name'], names) for val in values]
 
+    def test_watch_rule_get_all_newer(self):
+        wrs = [create_watch_rule(self.ctx, self.stack, name=name)
+               for name in ('rule1', 'rule2', 'rule3')]
+
+        newer = db_api.watch_rule_get_all_newer(self.ctx, wrs[0].id)
+        self.assertEqual(['rule2', 'rule3'], [wr.name for wr in newer])
+        self.assertEqual([], db_api.watch_rule_get_all_newer(self.ctx,
+                                                             wrs[2].id))
+
+    def test_watch_rule_count_and_max_id(self):
+        self.assertEqual((0, None),
+                         db_api.watch_rule_count_and_max_id(self.ctx))
+        wrs = [create_watch_rule(self.ctx, self.stack, name=name)
+               for name in ('rule1', 'rule2')]
+        self.assertEqual((2, wrs[1].id),
+                         db_api.watch_rule_count_and_max_id(self.ctx))
+
     def test_watch_rule_get_all_by_stack(self):
         self.stack1 = create_stack(self.ctx, self.template, self.user_creds)
 
@@ -2319,6 +2653,21 @@ class DBAPIWatchDataTest(common.HeatTestCase):
         self.assertEqual('{"foo": "bar"}', json.dumps(ret_data[0].data))
         self.assertEqual(self.watch_rule.id, ret_data[0].watch_rule_id)
 
+    def test_watch_data_create_all(self):
+        other_rule = create_watch_rule(self.ctx, self.stack, name='other')
+        values = [{'data': {'foo': 'd1'}, 'watch_rule_id': self.watch_rule.id},
+                  {'data': {'foo': 'd2'}, 'watch_rule_id': self.watch_rule.id},
+                  {'data': {'foo': 'd3'}, 'watch_rule_id': other_rule.id}]
+        db_api.watch_data_create_all(self.ctx, values)
+
+        watch_data = db_api.watch_data_get_all_by_watch_rule_id(
+            self.ctx, self.watch_rule.id)
+        self.assertEqual([{'foo': 'd1'}, {'foo': 'd2'}],
+                         sorted((wd.data for wd in watch_data),
+                                key=lambda d: d['foo']))
+        self.assertIsNotNone(watch_data[0].created_at)
+        self.assertEqual(3, len(db_api.watch_data_get_all(self.ctx)))
+
     def test_watch_data_get_all(self):
         values = [
             {'data': json.loads('{"foo": "d1"}')},
@@ -2332,6 +2681,22 @@ class DBAPIWatchDataTest(common.HeatTestCase):
         data = [wd.data for wd in watch_data]
         [self.assertIn(val['data'], data) for val in values]
 
+    def test_watch_data_delete_expired(self):
+        now = timeutils.utcnow()
+        old = now - datetime.timedelta(seconds=600)
+        create_watch_data(self.ctx, self.watch_rule, created_at=old)
+        new = create_watch_data(self.ctx, self.watch_rule, created_at=now)
+        other_rule = create_watch_rule(self.ctx, self.stack, name='other')
+        create_watch_data(self.ctx, other_rule, created_at=old)
+
+        expiry = now - datetime.timedelta(seconds=300)
+        self.assertEqual(1, db_api.watch_data_delete_expired(
+            self.ctx, self.watch_rule.id, expiry))
+        watch_data = db_api.watch_data_get_all_by_watch_rule_id(
+            self.ctx, self.watch_rule.id)
+        self.assertEqual([new.id], [wd.id for wd in watch_data])
+        self.assertEqual(2, len(db_api.watch_data_get_all(self.ctx)))
+
 
 class DBAPIServiceTest(common.HeatTestCase):
     def setUp(self):
@@ -2650,6 +3015,39 @@ class DBAPISyncPointTest(common.HeatTestCase):
         )
         self.assertEqual(0, rows_updated)
 
+    def test_sync_point_input_create_get_all(self):
+        sync_point = create_sync_point(
+            self.ctx, entity_id=str(self.resources[0].id),
+            stack_id=self.stack.id, traversal_id=self.stack.current_traversal
+        )
+        for i in range(3):
+            db_api.sync_point_input_create(self.ctx, {
+                'entity_id': sync_point.entity_id,
+                'traversal_id': sync_point.traversal_id,
+                'is_update': sync_point.is_update,
+                'stack_id': self.stack.id,
+                'input_data': {'input_data': [[[i, True], None]]}})
+
+        inputs = db_api.sync_point_input_get_all(
+            self.ctx, sync_point.entity_id, sync_point.traversal_id,
+            sync_point.is_update)
+        self.assertEqual([{'input_data': [[[i, True], None]]}
+                          for i in range(3)],
+                         [i.input_data for i in inputs])
+
+        # sync point itself is not modified
+        ret_sync_point = db_api.sync_point_get(self.ctx,
+                                               sync_point.entity_id,
+                                               sync_point.traversal_id,
+                                               sync_point.is_update)
+        self.assertEqual(0, ret_sync_point.atomic_key)
+
+        db_api.sync_point_delete_all_by_stack_and_traversal(
+            self.ctx, self.stack.id, self.stack.current_traversal)
+        self.assertEqual([], db_api.sync_point_input_get_all(
+            self.ctx, sync_point.entity_id, sync_point.traversal_id,
+            sync_point.is_update))
+
     def test_sync_point_delete(self):
         for res in self.resources:
             sync_point_rsrc = create_sync_point(
@@ -23,6 +23,7 @@ from heat.engine.clients.os import heat_plugin
 from heat.engine import environment
 from heat.engine import resource
 from heat.engine.resources.openstack.heat import wait_condition_handle as h_wch
+from heat.engine import scheduler
 from heat.engine import stack as parser
 from heat.engine import template as tmpl
 from heat.objects import resource as resource_objects
@@ -182,6 +183,36 @@ class HeatWaitConditionTest(common.HeatTestCase):
 
         self.m.VerifyAll()
 
+    def test_signal_wakes_wait_condition(self):
+        self.stack = self.create_stack(
+            template=test_template_heat_waitcondition, stub_status=False)
+        self.m.ReplayAll()
+        handle = self.stack['wait_handle']
+        scheduler.TaskRunner(handle.create)()
+
+        rsrc = self.stack['wait_condition']
+        rsrc.check_poll_interval = (8, 8)
+        check = self.patchobject(rsrc, 'check_create_complete',
+                                 wraps=rsrc.check_create_complete)
+        create = scheduler.TaskRunner(rsrc.create)
+        create.start()
+        while not check.called:
+            create.step()
+
+        # Nothing has been signalled, so the check is backing off
+        for i in range(3):
+            self.assertFalse(create.step())
+        self.assertEqual(1, check.call_count)
+
+        handle.signal(details={'status': 'SUCCESS'})
+        create.step()
+        self.assertEqual(2, check.call_count)
+
+        create.run_to_completion(wait_time=None)
+        self.assertEqual((rsrc.CREATE, rsrc.COMPLETE), rsrc.state)
+        self.assertEqual(2, check.call_count)
+        self.assertNotIn(rsrc.id, resource._polling_policies)
+
     def _create_heat_wc_and_handle(self):
         self.stack = self.create_stack(
             template=test_template_heat_waitcondition)
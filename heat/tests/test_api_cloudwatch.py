@@ -428,12 +428,13 @@ class WatchControllerTest(common.HeatTestCase):
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             dummy_req.context,
-            ('create_watch_data',
+            ('create_watch_data_batch',
              {'watch_name': u'HttpFailureAlarm',
-              'stats_data': {
+              'stats_data_list': [{
                   'Namespace': u'system/linux',
                   'ServiceFailure': {
-                      'Value': u'1', 'Unit': u'Count', 'Dimensions': []}}})
+                      'Value': u'1', 'Unit': u'Count', 'Dimensions': []}}]}),
+            version='1.11'
         ).AndReturn(engine_resp)
 
         self.m.ReplayAll()
@@ -442,6 +443,53 @@ class WatchControllerTest(common.HeatTestCase):
                     {'ResponseMetadata': None}}}
         self.assertEqual(expected, self.controller.put_metric_data(dummy_req))
 
+    def test_put_metric_data_multiple(self):
+
+        params = {u'Namespace': u'system/linux',
+                  u'MetricData.member.1.Unit': u'Percent',
+                  u'MetricData.member.1.Value': u'50',
+                  u'MetricData.member.1.MetricName': u'CPUUtilization',
+                  u'MetricData.member.1.Dimensions.member.1.Name':
+                  u'AutoScalingGroupName',
+                  u'MetricData.member.1.Dimensions.member.1.Value':
+                  u'group_x',
+                  u'MetricData.member.2.Unit': u'Count',
+                  u'MetricData.member.2.Value': u'3',
+                  u'MetricData.member.2.MetricName': u'ServiceFailure',
+                  u'MetricData.member.2.Dimensions.member.1.Name':
+                  u'AutoScalingGroupName',
+                  u'MetricData.member.2.Dimensions.member.1.Value':
+                  u'group_y',
+                  u'Action': u'PutMetricData'}
+
+        dummy_req = self._dummy_GET_request(params)
+
+        # All of the metric data are sent to the engine in a single call
+        self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
+        rpc_client.EngineClient.call(
+            dummy_req.context,
+            ('create_watch_data_batch',
+             {'watch_name': None,
+              'stats_data_list': [
+                  {'Namespace': u'system/linux',
+                   'CPUUtilization': {
+                       'Value': u'50', 'Unit': u'Percent',
+                       'Dimensions': [{u'AutoScalingGroupName':
+                                       u'group_x'}]}},
+                  {'Namespace': u'system/linux',
+                   'ServiceFailure': {
+                       'Value': u'3', 'Unit': u'Count',
+                       'Dimensions': [{u'AutoScalingGroupName':
+                                       u'group_y'}]}}]}),
+            version='1.11'
+        ).AndReturn({})
+
+        self.m.ReplayAll()
+
+        expected = {'PutMetricDataResponse': {'PutMetricDataResult':
+                    {'ResponseMetadata': None}}}
+        self.assertEqual(expected, self.controller.put_metric_data(dummy_req))
+
     def test_set_alarm_state(self):
         state_map = {'OK': rpc_api.WATCH_STATE_OK,
                      'ALARM': rpc_api.WATCH_STATE_ALARM,
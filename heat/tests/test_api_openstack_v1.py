@@ -1351,7 +1351,9 @@ class StackControllerTest(ControllerTest, common.HeatTestCase):
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             req.context,
-            ('show_stack', {'stack_identity': dict(identity)})
+            ('show_stack', {'stack_identity': dict(identity),
+                            'refresh_outputs': False}),
+            version='1.10'
         ).AndReturn(engine_resp)
         self.m.ReplayAll()
 
@@ -1392,7 +1394,9 @@ class StackControllerTest(ControllerTest, common.HeatTestCase):
         self.m.StubOutWithMock(rpc_client.EngineClient, 'call')
         rpc_client.EngineClient.call(
             req.context,
-            ('show_stack', {'stack_identity': dict(identity)})
+            ('show_stack', {'stack_identity': dict(identity),
+                            'refresh_outputs': False}),
+            version='1.10'
         ).AndRaise(to_remote_error(error))
         self.m.ReplayAll()
 
@@ -1406,6 +1410,27 @@ class StackControllerTest(ControllerTest, common.HeatTestCase):
         self.assertEqual('StackNotFound', resp.json['error']['type'])
         self.m.VerifyAll()
 
+    @mock.patch.object(rpc_client.EngineClient, 'call')
+    def test_show_refresh_outputs(self, mock_call, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'show', True)
+        identity = identifier.HeatIdentifier(self.tenant, 'wordpress', '6')
+
+        req = self._get('/stacks/%(stack_name)s/%(stack_id)s' % identity,
+                        params={'refresh': 'true'})
+        mock_call.return_value = [{u'stack_identity': dict(identity),
+                                   u'stack_name': identity.stack_name}]
+
+        self.controller.show(req, tenant_id=identity.tenant,
+                             stack_name=identity.stack_name,
+                             stack_id=identity.stack_id)
+
+        mock_call.assert_called_once_with(
+            req.context,
+            ('show_stack', {'stack_identity': dict(identity),
+                            'refresh_outputs': True}),
+            version='1.10'
+        )
+
     def test_show_invalidtenant(self, mock_enforce):
         identity = identifier.HeatIdentifier('wibble', 'wordpress', '6')
 
@@ -239,6 +239,107 @@ class ClientPluginTest(common.HeatTestCase):
         self.assertRaises(TypeError, client_plugin.ClientPlugin, c)
 
 
+class FooLookupPlugin(FooClientsPlugin):
+
+    def __init__(self, context):
+        super(FooLookupPlugin, self).__init__(context)
+        self.lookups = []
+
+    @client_plugin.memoized_lookup
+    def get_foo_id(self, name):
+        self.lookups.append(name)
+        if name == 'missing':
+            raise exception.EntityNotFound(entity='Foo', name=name)
+        return name.upper()
+
+
+class LookupCacheTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(LookupCacheTest, self).setUp()
+        self.now = 1000.0
+        self.patchobject(client_plugin.time, 'time',
+                         side_effect=lambda: self.now)
+        self.patchobject(client_plugin, '_engine_lookup_cache', new=None)
+
+    def _plugin(self, user_id='user'):
+        con = utils.dummy_context(user_id=user_id)
+        return FooLookupPlugin(con)
+
+    def test_cache_ttl(self):
+        cache = client_plugin.LookupCache(10, 60)
+        lookup = mock.Mock(side_effect=['a', 'b'])
+
+        self.assertEqual('a', cache.get('foo', lookup))
+        self.now += 59
+        self.assertEqual('a', cache.get('foo', lookup))
+        self.now += 1
+        self.assertEqual('b', cache.get('foo', lookup))
+        self.assertEqual(2, lookup.call_count)
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(2, cache.misses)
+
+    def test_cache_size(self):
+        cache = client_plugin.LookupCache(2, 60)
+        cache.get('a', lambda: 1)
+        cache.get('b', lambda: 2)
+        cache.get('a', lambda: 1)
+        cache.get('c', lambda: 3)
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.get('a', lambda: None))
+        self.assertIsNone(cache.get('b', lambda: None))
+
+    def test_memoized_lookup(self):
+        plugin = self._plugin()
+        for i in range(5):
+            self.assertEqual('FOO', plugin.get_foo_id('foo'))
+        self.assertEqual('BAR', plugin.get_foo_id('bar'))
+
+        self.assertEqual(['foo', 'bar'], plugin.lookups)
+        self.assertEqual(4, plugin.lookup_cache.hits)
+        self.assertEqual(2, plugin.lookup_cache.misses)
+
+    def test_memoized_lookup_errors_not_cached(self):
+        plugin = self._plugin()
+        for i in range(2):
+            self.assertRaises(exception.EntityNotFound,
+                              plugin.get_foo_id, 'missing')
+        self.assertEqual(['missing', 'missing'], plugin.lookups)
+
+    def test_memoized_lookup_per_context(self):
+        plugins = [self._plugin(), self._plugin()]
+        for plugin in plugins:
+            plugin.get_foo_id('foo')
+            self.assertEqual(['foo'], plugin.lookups)
+
+    def test_memoized_lookup_disabled(self):
+        cfg.CONF.set_override('client_lookup_cache_ttl', 0)
+        plugin = self._plugin()
+        plugin.get_foo_id('foo')
+        plugin.get_foo_id('foo')
+        self.assertEqual(['foo', 'foo'], plugin.lookups)
+
+    def test_engine_lookup_cache(self):
+        cfg.CONF.set_override('client_lookup_engine_cache_ttl', 10)
+        first, second, other = (self._plugin(), self._plugin(),
+                                self._plugin(user_id='other'))
+        for plugin in (first, second, other):
+            self.assertEqual('FOO', plugin.get_foo_id('foo'))
+
+        self.assertEqual(['foo'], first.lookups)
+        self.assertEqual([], second.lookups)
+        self.assertEqual(['foo'], other.lookups)
+        engine_cache = client_plugin.engine_lookup_cache()
+        self.assertEqual(1, engine_cache.hits)
+        self.assertEqual(2, engine_cache.misses)
+
+        self.now += 10
+        third = self._plugin()
+        third.get_foo_id('foo')
+        self.assertEqual(['foo'], third.lookups)
+
+
 class TestClientPluginsInitialise(common.HeatTestCase):
 
     @testcase.skip('skipped until keystone can read context auth_ref')
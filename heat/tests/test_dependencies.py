@@ -160,6 +160,18 @@ class dependenciesTest(common.HeatTestCase):
                           list,
                           reversed(d))
 
+    def test_order_cache_invalidated(self):
+        d = dependencies.Dependencies([('last', 'first')])
+        self.assertEqual(['first', 'last'], list(iter(d)))
+
+        d += ('first', 'zeroth')
+        self.assertEqual(['zeroth', 'first', 'last'], list(iter(d)))
+        self.assertEqual(['last', 'first', 'zeroth'], list(reversed(d)))
+
+    def test_long_chain(self):
+        d = dependencies.Dependencies((i + 1, i) for i in range(5000))
+        self.assertEqual(list(range(5001)), list(iter(d)))
+
     def test_noexist_partial(self):
         d = dependencies.Dependencies([('foo', 'bar')])
         get = lambda i: d[i]
@@ -206,6 +218,15 @@ class dependenciesTest(common.HeatTestCase):
             self.assertTrue(n in order,
                             "'%s' not found in dependency order" % n)
 
+    def test_diamond_partial_edges(self):
+        d = dependencies.Dependencies([('last', 'mid1'), ('last', 'mid2'),
+                                       ('mid1', 'first'), ('mid2', 'first')])
+        p = d['first']
+        self.assertEqual(4, len(list(p.graph().edges())))
+        order = list(iter(p))
+        self.assertEqual('first', order[0])
+        self.assertEqual('last', order[-1])
+
     def test_required_by(self):
         d = dependencies.Dependencies([('last', 'e1'), ('last', 'mid1'),
                                        ('last', 'mid2'), ('mid1', 'e2'),
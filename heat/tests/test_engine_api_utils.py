@@ -21,12 +21,14 @@ import six
 
 from heat.common import identifier
 from heat.common import template_format
+from heat.db import api as db_api
 from heat.engine import api
 from heat.engine import event
 from heat.engine import parameters
 from heat.engine import resource
 from heat.engine import stack as parser
 from heat.engine import template
+from heat.objects import stack as stack_object
 from heat.rpc import api as rpc_api
 from heat.tests import common
 from heat.tests import generic_resource as generic_rsrc
@@ -239,6 +241,18 @@ class FormatTest(common.HeatTestCase):
     def test_format_event_identifier_uuid(self):
         self._test_format_event('abc123yc-9f88-404d-a85b-531529456xyz')
 
+    def test_format_event_stack_identifier(self):
+        event = self._dummy_event('abc123yc-9f88-404d-a85b-531529456xyz')
+        stack_identifier = self.stack.identifier()
+        event.stack = None
+
+        formatted = api.format_event(event, stack_identifier)
+        self.assertEqual(dict(stack_identifier),
+                         formatted[rpc_api.EVENT_STACK_ID])
+        self.assertEqual(self.stack.name, formatted[rpc_api.EVENT_STACK_NAME])
+        self.assertEqual(dict(event.identifier(stack_identifier)),
+                         formatted[rpc_api.EVENT_ID])
+
     def _test_format_event(self, event_id):
         event = self._dummy_event(event_id)
 
@@ -343,6 +357,80 @@ class FormatTest(common.HeatTestCase):
         info = api.format_stack(self.stack)
         self.assertEqual('foobar', info[rpc_api.STACK_OUTPUTS])
 
+    @mock.patch.object(api, 'format_stack_outputs')
+    def test_format_stack_cached_outputs(self, mock_fmt_outputs):
+        outputs = [{'output_key': 'foo', 'output_value': 'bar'}]
+        mock_fmt_outputs.return_value = outputs
+        self.stack.store()
+        self.stack.state_set('CREATE', 'COMPLETE', 'Created')
+
+        api.format_stack(self.stack)
+        self.assertEqual(1, mock_fmt_outputs.call_count)
+
+        stack = parser.Stack.load(self.stack.context, self.stack.id)
+        self.assertEqual(outputs, stack.cached_outputs)
+        info = api.format_stack(stack)
+        self.assertEqual(outputs, info[rpc_api.STACK_OUTPUTS])
+        self.assertEqual(1, mock_fmt_outputs.call_count)
+
+        api.format_stack(stack, refresh_outputs=True)
+        self.assertEqual(2, mock_fmt_outputs.call_count)
+
+        stack.state_set('UPDATE', 'COMPLETE', 'Updated')
+        stack = parser.Stack.load(self.stack.context, self.stack.id)
+        self.assertIsNone(stack.cached_outputs)
+
+    @mock.patch.object(api, 'format_stack_outputs')
+    def test_format_stack_cached_outputs_encrypted(self, mock_fmt_outputs):
+        outputs = [{'output_key': 'key', 'output_value': 's3cr3t'}]
+        mock_fmt_outputs.return_value = outputs
+        self.stack.store()
+        self.stack.state_set('CREATE', 'COMPLETE', 'Created')
+        api.format_stack(self.stack)
+
+        db_stack = db_api.stack_get(self.stack.context, self.stack.id)
+        self.assertNotIn('s3cr3t', json.dumps(db_stack.cached_outputs))
+        stack = stack_object.Stack.get_by_id(self.stack.context,
+                                             self.stack.id)
+        self.assertEqual(outputs, stack.cached_outputs)
+
+    @mock.patch.object(api, 'format_stack_outputs')
+    def test_format_stack_outputs_cleared_while_resolving(self,
+                                                          mock_fmt_outputs):
+        self.stack.store()
+        self.stack.state_set('CREATE', 'COMPLETE', 'Created')
+        stack = parser.Stack.load(self.stack.context, self.stack.id)
+
+        def clear_outputs(*args):
+            # e.g. a signal to one of the resources is handled meanwhile
+            self.stack.clear_cached_outputs()
+            return [{'output_key': 'foo', 'output_value': 'stale'}]
+
+        mock_fmt_outputs.side_effect = clear_outputs
+        info = api.format_stack(stack)
+        self.assertEqual('stale',
+                         info[rpc_api.STACK_OUTPUTS][0]['output_value'])
+
+        stack = parser.Stack.load(self.stack.context, self.stack.id)
+        self.assertIsNone(stack.cached_outputs)
+
+    def test_format_stack_db_object(self):
+        self.stack.tags = ['tag1', 'tag2']
+        self.stack.store()
+        stack = stack_object.Stack.get_by_id(self.stack.context,
+                                             self.stack.id)
+        with mock.patch.object(template.Template, 'load') as mock_load:
+            info = api.format_stack_db_object(stack)
+        self.assertFalse(mock_load.called)
+
+        expected = api.format_stack(self.stack)
+        for key in (rpc_api.STACK_PARAMETERS, rpc_api.STACK_CAPABILITIES,
+                    rpc_api.STACK_NOTIFICATION_TOPICS):
+            del expected[key]
+        expected[rpc_api.STACK_CREATION_TIME] = stack.created_at.isoformat()
+        expected[rpc_api.STACK_DELETION_TIME] = None
+        self.assertEqual(expected, info)
+
     def test_format_stack_outputs(self):
         tmpl = template.Template({
             'HeatTemplateFormatVersion': '2012-12-12',
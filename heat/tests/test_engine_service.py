@@ -22,6 +22,7 @@ from oslo_config import cfg
 from oslo_messaging.rpc import dispatcher
 from oslo_serialization import jsonutils as json
 import six
+import sqlalchemy
 
 from heat.common import context
 from heat.common import exception
@@ -1549,7 +1550,7 @@ class StackServiceTest(common.HeatTestCase):
 
     def test_make_sure_rpc_version(self):
         self.assertEqual(
-            '1.9',
+            '1.11',
             service.EngineService.RPC_API_VERSION,
             ('RPC version is changed, please update this test to new version '
              'and make sure additional test cases are added for RPC APIs '
@@ -1805,6 +1806,21 @@ class StackServiceTest(common.HeatTestCase):
 
         self.m.VerifyAll()
 
+    @tools.stack_context('service_event_list_test_stack')
+    def test_stack_event_list_no_stack_load(self):
+        with mock.patch.object(parser.Stack, 'load') as mock_load:
+            tenant_events = self.eng.list_events(self.ctx, None)
+            stack_events = self.eng.list_events(self.ctx,
+                                                self.stack.identifier())
+
+        self.assertFalse(mock_load.called)
+        self.assertEqual(4, len(tenant_events))
+        self.assertEqual(tenant_events, stack_events)
+        for ev in tenant_events:
+            self.assertEqual(dict(self.stack.identifier()),
+                             ev['stack_identity'])
+            self.assertEqual(self.stack.name, ev['stack_name'])
+
     @mock.patch.object(event_object.Event, 'get_all_by_stack')
     @mock.patch.object(service.EngineService, '_get_stack')
     def test_stack_events_list_passes_marker_and_filters(self,
@@ -1848,16 +1864,24 @@ class StackServiceTest(common.HeatTestCase):
                                                            filters=filters)
 
     @tools.stack_context('service_list_all_test_stack')
-    def test_stack_list_all(self):
-        self.m.StubOutWithMock(parser.Stack, '_from_db')
-        parser.Stack._from_db(
-            self.ctx, mox.IgnoreArg(),
-            resolve_data=False
-        ).AndReturn(self.stack)
-
-        self.m.ReplayAll()
+    @mock.patch.object(templatem.Template, 'load')
+    @mock.patch.object(parser.Stack, '_from_db')
+    def test_stack_list_all(self, mock_from_db, mock_tmpl_load):
+        statements = []
+
+        def count_statement(*args):
+            statements.append(args[2])
+
+        engine = utils.get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute',
+                                count_statement)
+        self.addCleanup(sqlalchemy.event.remove, engine,
+                        'before_cursor_execute', count_statement)
         sl = self.eng.list_stacks(self.ctx)
 
+        # The stacks, their tags and the templates of the whole page
+        self.assertEqual(3, len(statements))
+
         self.assertEqual(1, len(sl))
         for s in sl:
             self.assertIn('creation_time', s)
@@ -1870,8 +1894,10 @@ class StackServiceTest(common.HeatTestCase):
             self.assertIn('stack_status_reason', s)
             self.assertIn('description', s)
             self.assertIn('WordPress', s['description'])
+            self.assertNotIn('outputs', s)
 
-        self.m.VerifyAll()
+        self.assertFalse(mock_from_db.called)
+        self.assertFalse(mock_tmpl_load.called)
 
     @mock.patch.object(stack_object.Stack, 'get_all')
     def test_stack_list_passes_marker_info(self, mock_stack_get_all):
@@ -2661,8 +2687,7 @@ class StackServiceTest(common.HeatTestCase):
         self.eng.thread_group_mgr.start(stack.id,
                                         mox.IgnoreArg(),
                                         mox.IgnoreArg(),
-                                        mox.IgnoreArg(),
-                                        mox.IgnoreArg()).AndReturn(None)
+                                        stack.id).AndReturn(None)
 
         self.m.ReplayAll()
 
@@ -2670,6 +2695,7 @@ class StackServiceTest(common.HeatTestCase):
                                  dict(self.stack.identifier()),
                                  'WebServerScaleDownPolicy',
                                  test_data)
+        self.assertEqual(1, self.eng.signal_queue.depth())
 
         self.m.VerifyAll()
 
@@ -2895,6 +2921,51 @@ class StackServiceTest(common.HeatTestCase):
         for key in rpc_api.WATCH_KEYS:
             self.assertIn(key, result[0])
 
+    @tools.stack_context('service_create_watch_data_batch_test_stack', False)
+    def test_create_watch_data_batch(self):
+        for group in ('group_x', 'group_y'):
+            rule = {u'Period': u'300',
+                    u'ComparisonOperator': u'GreaterThanThreshold',
+                    u'Statistic': u'SampleCount',
+                    u'Threshold': u'2',
+                    u'Dimensions': [{u'Name': u'AutoScalingGroupName',
+                                     u'Value': group}],
+                    u'MetricName': u'ServiceFailure'}
+            watchrule.WatchRule(context=self.ctx,
+                                watch_name='%s_alarm' % group,
+                                rule=rule,
+                                stack_id=self.stack.id,
+                                state='NORMAL').store()
+
+        def sample(group):
+            return {u'Namespace': u'system/linux',
+                    u'ServiceFailure': {
+                        u'Unit': u'Count', u'Value': u'1',
+                        u'Dimensions': [{u'AutoScalingGroupName': group}]}}
+
+        samples = [sample('group_x'), sample('group_x'), sample('group_z')]
+        watchrule._rule_index.refresh(self.ctx)
+        count = self.patchobject(
+            watch_rule_object.WatchRule, 'count_and_max_id',
+            wraps=watch_rule_object.WatchRule.count_and_max_id)
+        with mock.patch.object(watch_data_object.WatchData,
+                               'create_all') as create_all:
+            self.eng.create_watch_data_batch(self.ctx, None, samples)
+
+        # The index of rules is checked once for the whole batch
+        self.assertEqual(1, count.call_count)
+
+        group_x = watch_rule_object.WatchRule.get_by_name(self.ctx,
+                                                          'group_x_alarm')
+        create_all.assert_called_once_with(
+            self.ctx, [{'data': samples[0], 'watch_rule_id': group_x.id},
+                       {'data': samples[1], 'watch_rule_id': group_x.id}])
+
+        ex = self.assertRaises(dispatcher.ExpectedException,
+                               self.eng.create_watch_data_batch,
+                               self.ctx, None, [sample('group_z')])
+        self.assertEqual(exception.WatchRuleNotFound, ex.exc_info[0])
+
     @tools.stack_context('service_show_watch_metric_test_stack', False)
     def test_show_watch_metric(self):
         # Insert dummy watch rule into the DB
@@ -3289,6 +3360,21 @@ class StackServiceTest(common.HeatTestCase):
             'mock_id',
             dict(deleted_at=None))
 
+    @mock.patch.object(service_objects.Service, 'update_by_id')
+    @mock.patch.object(context, 'get_admin_context')
+    def test_service_manage_report_signal_queue(self, mock_admin_context,
+                                                mock_service_update):
+        self.eng.service_id = 'mock_id'
+        mock_log = self.patchobject(service, 'LOG')
+        self.eng.service_manage_report()
+        self.assertEqual(1, mock_log.info.call_count)
+
+        self.eng.signal_queue.received = 1
+        self.eng.service_manage_report()
+        self.assertEqual(2, mock_log.info.call_count)
+        self.assertEqual(self.eng.signal_queue.metrics(),
+                         mock_log.info.call_args[0][1])
+
     def test_stop_rpc_server(self):
         with mock.patch.object(self.eng,
                                '_rpc_server') as mock_rpc_server:
@@ -3683,6 +3769,108 @@ class ThreadGroupManagerTest(common.HeatTestCase):
         thm.send(stack_id, 'test_message')
 
 
+class SignalQueueTest(common.HeatTestCase):
+    def setUp(self):
+        super(SignalQueueTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.handler = mock.Mock(return_value='result')
+        self.queue = service.SignalQueue(self.handler)
+        self.thm = mock.Mock()
+        self.stack = mock.Mock()
+        self.mock_load = self.patchobject(parser.Stack, 'load',
+                                          return_value=self.stack)
+        self.now = 1000.0
+        self.patchobject(service.time, 'time', side_effect=lambda: self.now)
+
+    def test_batch_per_stack(self):
+        self.queue.put(self.ctx, self.thm, 'stack1', 'res1', {'a': 1})
+        self.now += 1
+        self.queue.put(self.ctx, self.thm, 'stack1', 'res2', {'b': 2})
+        self.queue.put(self.ctx, self.thm, 'stack2', 'res1', None)
+        self.now += 2
+
+        self.assertEqual([mock.call('stack1', self.queue._process,
+                                    self.ctx, 'stack1'),
+                          mock.call('stack2', self.queue._process,
+                                    self.ctx, 'stack2')],
+                         self.thm.start.call_args_list)
+        self.assertEqual({'depth': 3, 'stacks': 2, 'received': 3,
+                          'processed': 0, 'batches': 0,
+                          'wait_avg': 0, 'wait_max': 0.0},
+                         self.queue.metrics())
+
+        self.queue._process(self.ctx, 'stack1')
+
+        self.mock_load.assert_called_once_with(self.ctx, stack_id='stack1',
+                                               use_stored_context=True)
+        self.assertEqual([mock.call(self.stack, 'res1', {'a': 1}),
+                          mock.call(self.stack, 'res2', {'b': 2})],
+                         self.handler.call_args_list)
+        self.assertEqual({'depth': 1, 'stacks': 1, 'received': 3,
+                          'processed': 2, 'batches': 1,
+                          'wait_avg': 2.5, 'wait_max': 3.0},
+                         self.queue.metrics())
+
+        # A new thread is started for signals arriving after the batch
+        self.queue.put(self.ctx, self.thm, 'stack1', 'res1', None)
+        self.assertEqual(3, self.thm.start.call_count)
+
+    def test_signal_error(self):
+        self.handler.side_effect = [exception.ResourceNotFound(
+            resource_name='res1', stack_name='stack1'), 'result']
+        self.queue.put(self.ctx, self.thm, 'stack1', 'res1', None)
+        self.queue.put(self.ctx, self.thm, 'stack1', 'res2', None)
+
+        self.queue._process(self.ctx, 'stack1')
+
+        self.assertEqual(2, self.handler.call_count)
+        self.assertEqual(0, self.queue.depth())
+
+    def test_sync_call(self):
+        result = self.queue.put(self.ctx, self.thm, 'stack1', 'res1', None,
+                                sync_call=True)
+
+        self.assertEqual('result', result)
+        self.handler.assert_called_once_with(self.stack, 'res1', None)
+        self.assertFalse(self.thm.start.called)
+        self.assertEqual(1, self.queue.metrics()['processed'])
+
+    def test_sync_call_error(self):
+        self.handler.side_effect = exception.ResourceNotAvailable(
+            resource_name='res1')
+
+        self.assertRaises(exception.ResourceNotAvailable, self.queue.put,
+                          self.ctx, self.thm, 'stack1', 'res1', None,
+                          sync_call=True)
+
+    def test_sync_call_not_queued(self):
+        slow_handler_done = eventlet.event.Event()
+
+        def handler(stack, resource_name, details):
+            if resource_name == 'policy':
+                # e.g. a scaling policy resizing a group
+                slow_handler_done.wait()
+            return resource_name
+
+        self.queue.handler = handler
+        thm = service.ThreadGroupManager()
+        self.addCleanup(thm.stop, 'stack1')
+        self.queue.put(self.ctx, thm, 'stack1', 'policy', None)
+        eventlet.sleep()
+        self.assertEqual(1, self.queue.batches)
+
+        # The wait condition is signalled while the policy is still being
+        # handled, and does not wait for it
+        result = self.queue.put(self.ctx, thm, 'stack1', 'handle', None,
+                                sync_call=True)
+        self.assertEqual('handle', result)
+        self.assertEqual({'depth': 0, 'stacks': 0, 'received': 2,
+                          'processed': 2, 'batches': 1,
+                          'wait_avg': 0.0, 'wait_max': 0.0},
+                         self.queue.metrics())
+        slow_handler_done.send()
+
+
 class ThreadGroupManagerStopTest(common.HeatTestCase):
     def test_tgm_stop(self):
         stack_id = 'test'
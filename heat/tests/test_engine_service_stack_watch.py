@@ -11,9 +11,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+
 import mock
+from oslo_utils import timeutils
 
 from heat.engine import service_stack_watch
+from heat.engine import watchrule
 from heat.rpc import api as rpc_api
 from heat.tests import common
 from heat.tests import utils
@@ -63,6 +67,7 @@ class StackServiceWatcherTest(common.HeatTestCase):
         wr1 = mock.Mock()
         wr1.id = 4
         wr1.state = rpc_api.WATCH_STATE_NODATA
+        wr1.rule = {'Period': '60'}
 
         watch_rule_get_all_by_stack.return_value = [wr1]
         stack_get_all_by_owner_id.return_value = []
@@ -71,8 +76,8 @@ class StackServiceWatcherTest(common.HeatTestCase):
         sw.start_watch_task(stack_id, self.ctx)
 
         # assert that add_timer IS called.
-        self.assertEqual([mock.call(stack_id, sw.periodic_watcher_task,
-                                    sid=stack_id)],
+        self.assertEqual([mock.call(service_stack_watch.WATCH_TIMER_KEY,
+                                    sw.periodic_watcher_task)],
                          tg.add_timer.call_args_list)
 
     @mock.patch.object(service_stack_watch.stack_object.Stack,
@@ -92,6 +97,7 @@ class StackServiceWatcherTest(common.HeatTestCase):
             wr1 = mock.Mock()
             wr1.id = 4
             wr1.state = rpc_api.WATCH_STATE_NODATA
+            wr1.rule = {'Period': '60'}
             return [wr1]
 
         watch_rule_get_all_by_stack.side_effect = my_wr_get
@@ -109,6 +115,159 @@ class StackServiceWatcherTest(common.HeatTestCase):
         sw.start_watch_task(stack_id, self.ctx)
 
         # assert that add_timer IS called.
-        self.assertEqual([mock.call(stack_id, sw.periodic_watcher_task,
-                                    sid=stack_id)],
+        self.assertEqual([mock.call(service_stack_watch.WATCH_TIMER_KEY,
+                                    sw.periodic_watcher_task)],
+                         tg.add_timer.call_args_list)
+
+    @mock.patch.object(service_stack_watch.stack_object.Stack,
+                       'get_all_by_owner_id')
+    @mock.patch.object(service_stack_watch.watch_rule_object.WatchRule,
+                       'get_all_by_stack')
+    @mock.patch.object(service_stack_watch.watch_rule_object.WatchRule,
+                       'update_by_id')
+    def test_periodic_watch_task_shared(self, watch_rule_update,
+                                        watch_rule_get_all_by_stack,
+                                        stack_get_all_by_owner_id):
+        def my_wr_get(cnxt, sid):
+            wr = mock.Mock(id=sid, state=rpc_api.WATCH_STATE_NODATA,
+                           rule={'Period': '60'})
+            return [wr]
+
+        watch_rule_get_all_by_stack.side_effect = my_wr_get
+        stack_get_all_by_owner_id.return_value = []
+        tg = mock.Mock()
+        sw = service_stack_watch.StackWatch(tg)
+        for stack_id in (91, 92):
+            sw.start_watch_task(stack_id, self.ctx)
+
+        # assert that a single timer is shared by both stacks
+        self.assertEqual([mock.call(service_stack_watch.WATCH_TIMER_KEY,
+                                    sw.periodic_watcher_task)],
                          tg.add_timer.call_args_list)
+
+    def _watch_rule(self, rule_id, period, stack_id='stack1',
+                    actions=None):
+        rule = {'Period': str(period), 'MetricName': 'test_metric',
+                'Statistic': 'Maximum',
+                'ComparisonOperator': 'GreaterThanOrEqualToThreshold',
+                'Threshold': '30'}
+        if actions:
+            rule['AlarmActions'] = actions
+        return mock.Mock(id=rule_id, rule=rule, stack_id=stack_id,
+                         state=rpc_api.WATCH_STATE_NODATA, watch_data=[],
+                         last_evaluated=timeutils.utcnow())
+
+    @mock.patch.object(service_stack_watch.stack_object.Stack, 'get_by_id')
+    @mock.patch.object(service_stack_watch.watch_rule_object.WatchRule,
+                       'get_by_id')
+    @mock.patch.object(service_stack_watch.watch_rule_object.WatchRule,
+                       'get_all_newer')
+    @mock.patch.object(watchrule.WatchRule, 'store')
+    def test_check_watches_due(self, store, get_all_newer, get_rule_by_id,
+                               get_stack_by_id):
+        now = timeutils.utcnow()
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+        wrs = dict((wr.id, wr) for wr in (self._watch_rule(1, 60),
+                                          self._watch_rule(2, 300)))
+        get_all_newer.return_value = list(wrs.values())
+        get_rule_by_id.side_effect = lambda cnxt, rule_id: wrs[rule_id]
+
+        tg = mock.Mock()
+        sw = service_stack_watch.StackWatch(tg)
+        sw._stacks.add('stack1')
+        sw.check_watches()
+        self.assertFalse(get_rule_by_id.called)
+
+        timeutils.advance_time_delta(datetime.timedelta(seconds=60))
+        get_all_newer.return_value = []
+        sw.check_watches()
+
+        # Only the rule with the shorter period is evaluated, and the stack
+        # is not loaded because the rule has no actions
+        get_rule_by_id.assert_called_once_with(mock.ANY, 1)
+        self.assertEqual(1, store.call_count)
+        self.assertFalse(get_stack_by_id.called)
+        self.assertFalse(tg.start.called)
+        self.assertEqual((now + datetime.timedelta(seconds=120), 1),
+                         min(sw._queue))
+
+    @mock.patch.object(service_stack_watch.stack.Stack, 'load')
+    @mock.patch.object(service_stack_watch.stack_object.Stack, 'get_by_id')
+    @mock.patch.object(service_stack_watch.watch_rule_object.WatchRule,
+                       'get_by_id')
+    @mock.patch.object(service_stack_watch.watch_rule_object.WatchRule,
+                       'get_all_newer')
+    @mock.patch.object(watchrule.WatchRule, 'get_alarm_state')
+    @mock.patch.object(watchrule.WatchRule, 'store')
+    def test_check_watches_actions(self, store, get_alarm_state,
+                                   get_all_newer, get_rule_by_id,
+                                   get_stack_by_id, stack_load):
+        wr = self._watch_rule(1, 0, actions=['Policy'])
+        get_all_newer.return_value = [wr]
+        get_rule_by_id.return_value = wr
+        get_alarm_state.return_value = watchrule.WatchRule.ALARM
+        stk = mock.Mock(action='CREATE', status='COMPLETE', DELETE='DELETE',
+                        COMPLETE='COMPLETE')
+        stack_load.return_value = stk
+
+        tg = mock.Mock()
+        sw = service_stack_watch.StackWatch(tg)
+        sw._stacks.add('stack1')
+        sw.check_watches()
+
+        get_stack_by_id.assert_called_once_with(mock.ANY, 'stack1',
+                                                tenant_safe=False,
+                                                eager_load=True)
+        stack_load.assert_called_once_with(
+            mock.ANY, stack=get_stack_by_id.return_value,
+            use_stored_context=True)
+        stk.resource_by_refid.assert_called_once_with('Policy')
+        tg.start.assert_called_once_with(
+            'stack1', sw._run_actions, stk,
+            [stk.resource_by_refid.return_value.signal],
+            {'alarm': wr.name, 'state': watchrule.WatchRule.ALARM})
+
+    @mock.patch.object(service_stack_watch.watch_rule_object.WatchRule,
+                       'get_by_id')
+    @mock.patch.object(service_stack_watch.watch_rule_object.WatchRule,
+                       'get_all_newer')
+    @mock.patch.object(watchrule.WatchRule, 'store')
+    def test_check_watches_rule_error(self, store, get_all_newer,
+                                      get_rule_by_id):
+        now = timeutils.utcnow()
+        timeutils.set_time_override(now)
+        self.addCleanup(timeutils.clear_time_override)
+        wrs = dict((wr.id, wr) for wr in (self._watch_rule(1, 60),
+                                          self._watch_rule(2, 60)))
+        get_all_newer.return_value = list(wrs.values())
+
+        def get_by_id(cnxt, rule_id):
+            if rule_id == 1:
+                raise Exception('DB error')
+            return wrs[rule_id]
+        get_rule_by_id.side_effect = get_by_id
+
+        sw = service_stack_watch.StackWatch(mock.Mock())
+        sw._stacks.add('stack1')
+        sw.periodic_watcher_task()
+        get_all_newer.return_value = []
+
+        for tick in range(2):
+            timeutils.advance_time_delta(datetime.timedelta(seconds=60))
+            sw.periodic_watcher_task()
+
+        # The failing rule is retried on later ticks, and does not stop the
+        # evaluation of the other rule
+        self.assertEqual([mock.call(mock.ANY, 1), mock.call(mock.ANY, 2)] * 2,
+                         get_rule_by_id.call_args_list)
+        self.assertEqual(2, store.call_count)
+        self.assertEqual(set([1, 2]), set(sw._due))
+
+    @mock.patch.object(service_stack_watch.StackWatch, 'check_watches')
+    def test_periodic_watcher_task_error(self, check_watches):
+        check_watches.side_effect = Exception('DB error')
+        sw = service_stack_watch.StackWatch(mock.Mock())
+        sw.periodic_watcher_task()
+        sw.periodic_watcher_task()
+        self.assertEqual(2, check_watches.call_count)
@@ -18,6 +18,7 @@ import mock
 from heat.engine import resource
 from heat.engine import stack
 from heat.engine import sync_point
+from heat.engine import template
 from heat.engine import worker
 from heat.rpc import worker_client
 from heat.tests import common
@@ -151,6 +152,21 @@ class CheckWorkflowUpdateTest(common.HeatTestCase):
             self.resource.id,
             mock.ANY, True)
 
+    def test_traversal_data_cached(
+            self, mock_cru, mock_crc, mock_pcr, mock_csc, mock_cid):
+        real_load = template.Template.load
+        with mock.patch.object(template.Template, 'load',
+                               side_effect=real_load) as mock_load:
+            for i in range(2):
+                self.worker.check_resource(
+                    self.ctx, self.resource.id, self.stack.current_traversal,
+                    {}, self.is_update)
+        mock_load.assert_called_once_with(self.ctx, self.stack.t.id,
+                                          mock.ANY)
+        self.assertEqual(2, mock_csc.call_count)
+        graphs = set(id(c[0][4]) for c in mock_csc.call_args_list)
+        self.assertEqual(1, len(graphs))
+
     @mock.patch.object(resource.Resource, 'make_replacement')
     def test_is_update_traversal_raise_update_replace(
             self, mock_mr, mock_cru, mock_crc, mock_pcr, mock_csc, mock_cid):
@@ -251,6 +267,15 @@ class MiscMethodsTest(common.HeatTestCase):
         actual_input_data = worker.construct_input_data(self.resource)
         self.assertEqual(expected_input_data, actual_input_data)
 
+    def test_construct_input_data_index(self):
+        expected_input_data = {'attrs': {'foo': None},
+                               'id': mock.ANY,
+                               'physical_resource_id': None,
+                               'name': 'A'}
+        actual_input_data = worker.construct_input_data(self.resource,
+                                                        {'A': {'foo'}})
+        self.assertEqual(expected_input_data, actual_input_data)
+
     @mock.patch.object(sync_point, 'sync')
     def test_check_stack_complete_root(self, mock_sync):
         worker.check_stack_complete(
@@ -306,3 +331,34 @@ class MiscMethodsTest(common.HeatTestCase):
                                       {})
         self.assertTrue(mock_cr.called)
         self.assertFalse(mock_delete.called)
+
+
+class TraversalCacheTest(common.HeatTestCase):
+    def setUp(self):
+        super(TraversalCacheTest, self).setUp()
+        self.cache = worker.TraversalCache(max_size=2)
+
+    def test_get(self):
+        entry = self.cache.get('traversal-1')
+        self.assertIs(entry, self.cache.get('traversal-1'))
+        self.assertIsNot(entry, self.cache.get('traversal-2'))
+
+    def test_evict_previous_traversal(self):
+        entry = self.cache.get('traversal-1')
+        self.cache.set_current('stack-1', 'traversal-1')
+        self.cache.get('traversal-2')
+        self.cache.set_current('stack-1', 'traversal-2')
+        self.assertIsNot(entry, self.cache.get('traversal-1'))
+
+    def test_keep_other_stacks(self):
+        entry = self.cache.get('traversal-1')
+        self.cache.set_current('stack-1', 'traversal-1')
+        self.cache.get('traversal-2')
+        self.cache.set_current('stack-2', 'traversal-2')
+        self.assertIs(entry, self.cache.get('traversal-1'))
+
+    def test_max_size(self):
+        entry = self.cache.get('traversal-1')
+        self.cache.get('traversal-2')
+        self.cache.get('traversal-3')
+        self.assertIsNot(entry, self.cache.get('traversal-1'))
@@ -123,6 +123,49 @@ class EventTest(common.HeatTestCase):
         self.assertEqual(1, len(events))
         self.assertEqual('arizona', events[0].physical_resource_id)
 
+    def _buffer_events(self, batch_size):
+        cfg.CONF.set_override('strict_event_store', False)
+        cfg.CONF.set_override('event_flush_batch_size', batch_size)
+        cfg.CONF.set_override('event_flush_interval', 60)
+        self.addCleanup(event.flush)
+
+    def test_store_buffered(self):
+        self._buffer_events(2)
+        self.resource.resource_id_set('resource_physical_id')
+
+        e1 = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS',
+                         'Testing', 'alabama', self.resource.properties,
+                         self.resource.name, self.resource.type())
+        self.assertIsNone(e1.store())
+        self.assertIsNone(e1.id)
+        self.assertIsNotNone(e1.uuid)
+        self.assertIsNotNone(e1.timestamp)
+        self.assertEqual([], event_object.Event.get_all_by_stack(
+            self.ctx, self.stack.id))
+
+        e2 = event.Event(self.ctx, self.stack, 'TEST', 'COMPLETE',
+                         'Testing', 'arizona', self.resource.properties,
+                         self.resource.name, self.resource.type())
+        e2.store()
+        events = event_object.Event.get_all_by_stack(self.ctx, self.stack.id,
+                                                     sort_dir='asc')
+        self.assertEqual([e1.uuid, e2.uuid], [ev.uuid for ev in events])
+        self.assertEqual({'Foo': 'goo'}, events[0].resource_properties)
+
+    def test_store_buffered_flush(self):
+        self._buffer_events(100)
+
+        self.stack._add_event('CREATE', 'IN_PROGRESS', 'Stack started')
+        self.assertEqual(0, len(event_object.Event.get_all_by_stack(
+            self.ctx, self.stack.id)))
+
+        # Events are always written when a stack action finishes
+        self.stack._add_event('CREATE', 'COMPLETE', 'Stack finished')
+        events = event_object.Event.get_all_by_stack(self.ctx, self.stack.id,
+                                                     sort_dir='asc')
+        self.assertEqual(['IN_PROGRESS', 'COMPLETE'],
+                         [ev.resource_status for ev in events])
+
     def test_identifier(self):
         event_uuid = 'abc123yc-9f88-404d-a85b-531529456xyz'
         e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS', 'Testing',
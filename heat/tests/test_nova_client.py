@@ -13,11 +13,13 @@
 """Tests for :module:'heat.engine.clients.os.nova'."""
 
 import collections
+import email
 import uuid
 
 import mock
 from novaclient import exceptions as nova_exceptions
 from oslo_config import cfg
+from oslo_serialization import jsonutils
 import six
 
 from heat.common import exception
@@ -82,6 +84,18 @@ class NovaClientPluginTests(NovaClientPluginTestCase):
         self.assertEqual([(), (), ()],
                          self.nova_client.flavors.list.call_args_list)
 
+    def test_get_flavor_id_cached(self):
+        flav_id = str(uuid.uuid4())
+        my_flavor = mock.MagicMock()
+        my_flavor.name = 'X-Large'
+        my_flavor.id = flav_id
+        self.nova_client.flavors.list.return_value = [my_flavor]
+        for i in range(10):
+            self.assertEqual(flav_id,
+                             self.nova_plugin.get_flavor_id('X-Large'))
+        self.assertEqual(1, self.nova_client.flavors.list.call_count)
+        self.assertEqual(9, self.nova_plugin.lookup_cache.hits)
+
     def test_get_keypair(self):
         """Tests the get_keypair function."""
         my_pub_key = 'a cool public key string'
@@ -352,6 +366,55 @@ class NovaClientPluginUserdataTests(NovaClientPluginTestCase):
         self.assertNotIn('config_instance_user', data)
         self.assertIn("custominstanceuser", data)
 
+    def test_build_userdata_parts(self):
+        """The cached parts are joined with the parts of each server."""
+        cfg.CONF.set_override('heat_metadata_server_url',
+                              'http://server.test:123')
+        cfg.CONF.set_override('heat_watch_server_url',
+                              'http://server.test:345')
+        for userdata in ('userdata1', 'userdata2'):
+            data = self.nova_plugin.build_userdata({'a': 1}, userdata)
+            message = email.message_from_string(data)
+            self.assertTrue(message.is_multipart())
+            parts = message.get_payload()
+            self.assertEqual(['cloud-config', 'boothook.sh',
+                              'part-handler.py', 'cfn-userdata',
+                              'loguserdata.py', 'cfn-init-data',
+                              'cfn-watch-server', 'cfn-metadata-server',
+                              'cfn-boto-cfg'],
+                             [part.get_filename() for part in parts])
+            self.assertEqual(userdata, parts[3].get_payload())
+            self.assertEqual({'a': 1},
+                             jsonutils.loads(parts[5].get_payload()))
+
+    def test_build_userdata_static_parts_cached(self):
+        """Render the static parts once for identical servers."""
+        cfg.CONF.set_override('heat_metadata_server_url',
+                              'http://server.test:123')
+        cfg.CONF.set_override('heat_watch_server_url',
+                              'http://server.test:345')
+        nova._cloudinit_cache.clear()
+        self.addCleanup(nova._cloudinit_cache.clear)
+        get_data = self.patchobject(nova.pkgutil, 'get_data',
+                                    return_value='data')
+
+        first = self.nova_plugin.build_userdata({'a': 1}, 'userdata1',
+                                                instance_user='ec2-user')
+        second = self.nova_plugin.build_userdata({'b': 2}, 'userdata2',
+                                                 instance_user='ec2-user')
+        self.assertEqual(4, get_data.call_count)
+        self.assertIn('userdata1', first)
+        self.assertNotIn('userdata1', second)
+        self.assertIn('userdata2', second)
+
+        cfg.CONF.set_override('heat_watch_server_url',
+                              'http://server.test:567')
+        third = self.nova_plugin.build_userdata({}, 'userdata3',
+                                                instance_user='ec2-user')
+        self.assertEqual(8, get_data.call_count)
+        self.assertIn('http://server.test:567', third)
+        self.assertNotIn('http://server.test:345', third)
+
 
 class NovaClientPluginMetadataTests(NovaClientPluginTestCase):
 
@@ -16,6 +16,7 @@ import os
 import uuid
 
 import mock
+from oslo_config import cfg
 import six
 
 from heat.common import exception
@@ -558,9 +559,16 @@ class ProviderTemplateTest(common.HeatTestCase):
         temp_res = template_resource.TemplateResource('test_t_res',
                                                       definition, stack)
         temp_res.metadata_set = mock.Mock()
+        temp_res.metadata_get = mock.Mock(return_value={'Foo': 'Bar'})
         temp_res.metadata_update()
         temp_res.metadata_set.assert_called_once_with({})
 
+        # Nothing is stored when the metadata has not changed
+        temp_res.metadata_set.reset_mock()
+        temp_res.metadata_get.return_value = {}
+        temp_res.metadata_update()
+        self.assertFalse(temp_res.metadata_set.called)
+
     def test_get_template_resource_class(self):
         test_templ_name = 'file:///etc/heatr/frodo.yaml'
         minimal_temp = json.dumps({'HeatTemplateFormatVersion': '2012-12-12',
@@ -813,6 +821,91 @@ class ProviderTemplateTest(common.HeatTestCase):
         self.m.VerifyAll()
 
 
+class TemplateCacheTest(common.HeatTestCase):
+    provider = json.dumps({
+        'HeatTemplateFormatVersion': '2012-12-12',
+        'Parameters': {
+            'Foo': {'Type': 'String'},
+        },
+        'Outputs': {
+            'Bar': {'Value': 'bar'},
+        },
+    })
+
+    def setUp(self):
+        super(TemplateCacheTest, self).setUp()
+        for cache in (template_resource._parsed_templates,
+                      template_resource._template_schemas):
+            cache.clear()
+            self.addCleanup(cache.clear)
+        self.parse = self.patchobject(template_format, 'parse',
+                                      wraps=template_format.parse)
+
+    def test_parse_template(self):
+        first = template_resource.parse_template(self.provider)
+        second = template_resource.parse_template(self.provider)
+
+        self.assertEqual(1, self.parse.call_count)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+
+        first['Parameters']['Foo']['Type'] = 'Number'
+        third = template_resource.parse_template(self.provider)
+        self.assertEqual('String', third['Parameters']['Foo']['Type'])
+
+    def test_parse_template_error_not_cached(self):
+        self.assertRaises(ValueError,
+                          template_resource.parse_template, '{}')
+        self.assertRaises(ValueError,
+                          template_resource.parse_template, '{}')
+        self.assertEqual(2, self.parse.call_count)
+
+    def test_template_schemas(self):
+        props, attrs = template_resource.template_schemas(self.provider, {})
+        self.assertTrue(props['Foo'].required)
+        self.assertIn('Bar', attrs)
+
+        again = template_resource.template_schemas(self.provider, {})
+        self.assertIs(props, again[0])
+        self.assertIs(attrs, again[1])
+
+        defaulted, attrs = template_resource.template_schemas(
+            self.provider, {'Foo': 'foo'})
+        self.assertFalse(defaulted['Foo'].required)
+        self.assertTrue(props['Foo'].required)
+        self.assertEqual(1, self.parse.call_count)
+
+    def test_cache_size(self):
+        cfg.CONF.set_override('template_cache_size', 1)
+        other = self.provider.replace('bar', 'baz')
+
+        template_resource.parse_template(self.provider)
+        template_resource.parse_template(other)
+        template_resource.parse_template(self.provider)
+
+        self.assertEqual(3, self.parse.call_count)
+        self.assertEqual(1, len(template_resource._parsed_templates))
+
+    def test_resources_share_schemas(self):
+        env = environment.Environment()
+        env.load({'resource_registry':
+                  {'Test::Provider': 'provider.template'}})
+        stack = parser.Stack(utils.dummy_context(), 'test_stack',
+                             template.Template(
+                                 empty_template,
+                                 files={'provider.template': self.provider},
+                                 env=env),
+                             stack_id=str(uuid.uuid4()))
+
+        res = [template_resource.TemplateResource(
+            name, rsrc_defn.ResourceDefinition(name, 'Test::Provider'),
+            stack) for name in ('a', 'b')]
+
+        self.assertIs(res[0].properties_schema, res[1].properties_schema)
+        self.assertEqual(res[0].child_template(), res[1].child_template())
+        self.assertEqual(1, self.parse.call_count)
+
+
 class TemplateResourceCrudTest(common.HeatTestCase):
     provider = {
         'HeatTemplateFormatVersion': '2012-12-12',
@@ -142,7 +142,8 @@ class EngineRpcAPITestCase(common.HeatTestCase):
                               stack_name='wordpress')
 
     def test_show_stack(self):
-        self._test_engine_api('show_stack', 'call', stack_identity='wordpress')
+        self._test_engine_api('show_stack', 'call', stack_identity='wordpress',
+                              refresh_outputs=True)
 
     def test_preview_stack(self):
         self._test_engine_api('preview_stack', 'call', stack_name='wordpress',
@@ -262,6 +263,12 @@ class EngineRpcAPITestCase(common.HeatTestCase):
                               watch_name='watch1',
                               stats_data={})
 
+    def test_create_watch_data_batch(self):
+        self._test_engine_api('create_watch_data_batch', 'call',
+                              watch_name='watch1',
+                              stats_data_list=[{}, {}],
+                              version='1.11')
+
     def test_show_watch(self):
         self._test_engine_api('show_watch', 'call',
                               watch_name='watch1')
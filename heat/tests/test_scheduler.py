@@ -345,6 +345,21 @@ class DependencyTaskGroupTest(common.HeatTestCase):
             dummy.do_step(2, 'last').AndReturn(None)
             dummy.do_step(3, 'last').AndReturn(None)
 
+    def test_only_runnable_tasks_queued(self):
+        deps = dependencies.Dependencies([('second', 'first'),
+                                          ('third', 'second')])
+        tg = scheduler.DependencyTaskGroup(deps, DummyTask(1))
+        self.assertEqual(['first'], list(tg._ready_queue))
+
+        task = tg()
+        next(task)
+        self.assertEqual([], list(tg._ready_queue))
+        self.assertEqual(['first'], list(tg._running_tasks))
+
+        next(task)
+        self.assertEqual([], list(tg._ready_queue))
+        self.assertEqual(['second'], list(tg._running_tasks))
+
     def test_circular_deps(self):
         d = dependencies.Dependencies([('first', 'second'),
                                        ('second', 'third'),
@@ -906,6 +921,36 @@ class TimeoutTest(common.HeatTestCase):
         self.assertNotEqual(earlier, later)
 
 
+class PollingPolicyTest(common.HeatTestCase):
+    def _steps(self, policy):
+        return len(list(policy.wait()))
+
+    def test_backoff(self):
+        policy = scheduler.PollingPolicy(1, 5, jitter=0)
+
+        self.assertEqual([1, 2, 4, 5, 5],
+                         [self._steps(policy) for i in range(5)])
+        self.assertEqual(5, policy.wasted)
+        self.assertEqual(12, policy.skipped)
+
+    def test_jitter(self):
+        policy = scheduler.PollingPolicy(10, 10, jitter=0.2)
+
+        for i in range(20):
+            self.assertTrue(8 <= self._steps(policy) <= 12)
+
+    def test_wake(self):
+        policy = scheduler.PollingPolicy(4, 8, jitter=0)
+        self._steps(policy)
+        wait = policy.wait()
+
+        next(wait)
+        policy.wake()
+
+        self.assertRaises(StopIteration, next, wait)
+        self.assertEqual(4, self._steps(policy))
+
+
 class DescriptionTest(common.HeatTestCase):
 
     def setUp(self):
@@ -0,0 +1,119 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+from oslo_config import cfg
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+
+from heat.common import session_pool
+from heat.engine.clients import client_plugin
+from heat.tests import common
+from heat.tests import utils
+
+
+class CountingHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Answer every GET with an empty JSON body, keeping connections open."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        self.server.connections += 1
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+
+    def do_GET(self):
+        self.server.requests += 1
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CountingServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """A local stand-in for an OpenStack API counting its connections."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0),
+                                           CountingHandler)
+        self.connections = 0
+        self.requests = 0
+
+    @property
+    def url(self):
+        return 'http://%s:%d/' % self.server_address
+
+
+class FakePlugin(client_plugin.ClientPlugin):
+
+    def _create(self):
+        return self._keystone_session
+
+
+class SessionPoolTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(SessionPoolTest, self).setUp()
+        self.addCleanup(session_pool.clear)
+        self.server = CountingServer()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_sessions_share_connections(self):
+        ssl_options = {'cacert': None, 'insecure': False,
+                       'cert': None, 'key': None}
+        for i in range(3):
+            sess = session_pool.get_session(ssl_options)
+            for j in range(3):
+                resp = sess.get(self.server.url, authenticated=False)
+                self.assertEqual(200, resp.status_code)
+
+        self.assertEqual(9, self.server.requests)
+        self.assertEqual(1, self.server.connections)
+
+    def test_sessions_by_ssl_options(self):
+        secure = session_pool.get_session({'insecure': False})
+        insecure = session_pool.get_session({'insecure': True})
+        self.assertIsNot(secure.session, insecure.session)
+        self.assertTrue(secure.verify)
+        self.assertFalse(insecure.verify)
+        self.assertIs(secure.session,
+                      session_pool.get_session({'insecure': False}).session)
+
+    def test_pool_size(self):
+        cfg.CONF.set_override('client_connection_pool_size', 25)
+        self.addCleanup(cfg.CONF.clear_override,
+                        'client_connection_pool_size')
+        sess = session_pool.get_session({})
+        adapter = sess.session.get_adapter(self.server.url)
+        self.assertEqual(25, adapter._pool_maxsize)
+
+    def test_client_plugins_share_connections(self):
+        plugins = [FakePlugin(utils.dummy_context()) for i in range(3)]
+        for plugin in plugins:
+            plugin.client().get(self.server.url, authenticated=False)
+
+        self.assertEqual(3, len(set(id(p.client()) for p in plugins)))
+        self.assertEqual(1, len(set(id(p.client().session)
+                                    for p in plugins)))
+        self.assertEqual(1, self.server.connections)
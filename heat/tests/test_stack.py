@@ -438,6 +438,35 @@ class StackTest(common.HeatTestCase):
         stacks = list(stack.Stack.load_all(self.ctx, show_nested=True))
         self.assertEqual(3, len(stacks))
 
+    def test_refresh_dependent_metadata(self):
+        tmpl = {'HeatTemplateFormatVersion': '2012-12-12',
+                'Resources': {
+                    'AResource': {'Type': 'GenericResourceType'},
+                    'BResource': {'Type': 'ResourceWithPropsType',
+                                  'Properties': {
+                                      'Foo': {'Ref': 'AResource'}}},
+                    'CResource': {'Type': 'GenericResourceType',
+                                  'Metadata': {
+                                      'Bar': {'Ref': 'BResource'}}},
+                    'DResource': {'Type': 'GenericResourceType',
+                                  'Metadata': {
+                                      'Bar': {'Ref': 'EResource'}}},
+                    'EResource': {'Type': 'GenericResourceType'}}}
+        self.stack = stack.Stack(self.ctx, 'refresh_metadata_test',
+                                 template.Template(tmpl))
+        self.stack.store()
+        self.stack.create()
+        self.assertEqual((stack.Stack.CREATE, stack.Stack.COMPLETE),
+                         self.stack.state)
+
+        updates = dict((name, self.patchobject(res, 'metadata_update'))
+                       for name, res in six.iteritems(self.stack))
+        self.stack.refresh_dependent_metadata('AResource')
+
+        self.assertEqual(1, updates['CResource'].call_count)
+        for name in ('AResource', 'BResource', 'DResource', 'EResource'):
+            self.assertFalse(updates[name].called)
+
     def test_created_time(self):
         self.stack = stack.Stack(self.ctx, 'creation_time_test', self.tmpl)
         self.assertIsNone(self.stack.created_time)
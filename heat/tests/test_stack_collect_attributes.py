@@ -182,3 +182,14 @@ class DepAttrsTest(common.HeatTestCase):
             self.assertEqual(self.expected[res.name],
                              self.stack.get_dep_attrs(resources, outputs,
                                                       res.name))
+
+    def test_dep_attrs_index(self):
+
+        parsed_tmpl = template_format.parse(self.tmpl)
+        self.stack = stack.Stack(self.ctx, 'test_stack',
+                                 template.Template(parsed_tmpl))
+        index = self.stack.get_dep_attrs_index(
+            six.itervalues(self.stack.resources), self.stack.outputs)
+
+        for res in six.itervalues(self.stack.resources):
+            self.assertEqual(self.expected[res.name], index[res.name])
@@ -0,0 +1,246 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslo_config import cfg
+from six.moves.urllib import parse as urlparse
+
+from heat.engine.clients import status_poller
+from heat.tests import common
+from heat.tests.nova import fakes as fakes_nova
+from heat.tests import utils
+
+
+class FakeResource(object):
+    def __init__(self, res_id, status):
+        self.id = res_id
+        self.status = status
+
+
+class BulkStatusPollerTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(BulkStatusPollerTest, self).setUp()
+        cfg.CONF.set_override('bulk_status_poll_threshold', 2)
+        cfg.CONF.set_override('bulk_status_poll_max_interval', 8)
+        self.now = 1000.0
+        self.patchobject(status_poller.time, 'time',
+                         side_effect=lambda: self.now)
+        self.statuses = {}
+        self.list_resources = mock.Mock(side_effect=self._list)
+        self.get_resource = mock.Mock(side_effect=self._get)
+        self.poller = status_poller.BulkStatusPoller(
+            self.list_resources, self.get_resource,
+            lambda res: res.status)
+
+    def _list(self, res_ids, since):
+        return [FakeResource(res_id, status)
+                for res_id, status in self.statuses.items()]
+
+    def _get(self, res_id):
+        return FakeResource(res_id, self.statuses[res_id])
+
+    def test_fetch_below_threshold(self):
+        self.statuses = {'a': 'BUILD'}
+        self.assertEqual('BUILD', self.poller.fetch('a').status)
+        self.assertEqual('BUILD', self.poller.fetch('a').status)
+        self.assertEqual(2, self.get_resource.call_count)
+        self.assertEqual(0, self.list_resources.call_count)
+
+    def test_fetch_bulk(self):
+        self.statuses = dict((res_id, 'BUILD') for res_id in 'abc')
+        for res_id in 'abc':
+            self.poller.watch(res_id)
+        for res_id in 'abc':
+            self.assertEqual('BUILD', self.poller.fetch(res_id).status)
+
+        self.assertEqual(0, self.get_resource.call_count)
+        self.assertEqual(1, self.list_resources.call_count)
+        res_ids, since = self.list_resources.call_args[0]
+        self.assertEqual(['a', 'b', 'c'], sorted(res_ids))
+        self.assertEqual(1000.0 - status_poller.SINCE_MARGIN, since)
+        self.assertEqual(1, self.poller.polls)
+
+    def test_not_yet_listed(self):
+        self.statuses = {'a': 'BUILD', 'b': 'BUILD'}
+        self.poller.watch('a')
+        self.poller.fetch('b')
+        self.statuses['c'] = 'BUILD'
+        self.assertIsNone(self.poller.fetch('c'))
+
+        self.now += 1
+        self.assertEqual('BUILD', self.poller.fetch('c').status)
+        self.assertEqual(2, self.list_resources.call_count)
+
+    def test_backoff(self):
+        self.statuses = {'a': 'BUILD', 'b': 'BUILD'}
+        self.poller.watch('a')
+        self.poller.watch('b')
+        polls = []
+        for i in range(30):
+            self.poller.fetch('a')
+            self.poller.fetch('b')
+            polls.append(self.poller.polls)
+            self.now += 1
+
+        # The interval doubles after the first poll, up to the maximum
+        self.assertEqual([1, 2, 2, 3, 3, 3, 3, 4], polls[:8])
+        self.assertEqual(8, self.poller.interval)
+        self.assertEqual(6, self.poller.polls)
+
+        self.statuses['a'] = 'ACTIVE'
+        self.now += 8
+        self.assertEqual('ACTIVE', self.poller.fetch('a').status)
+        self.assertEqual(status_poller.MIN_INTERVAL, self.poller.interval)
+
+    def test_missing_fetched_individually(self):
+        self.statuses = {'a': 'BUILD', 'b': 'BUILD'}
+        self.poller.watch('a')
+        self.poller.watch('b')
+        self.list_resources.side_effect = lambda ids, since: [
+            FakeResource('a', 'BUILD')]
+
+        self.assertEqual('BUILD', self.poller.fetch('b').status)
+        self.get_resource.assert_called_once_with('b')
+        self.assertEqual('BUILD', self.poller.fetch('a').status)
+        self.assertEqual(1, self.get_resource.call_count)
+
+    def test_done(self):
+        self.statuses = {'a': 'BUILD', 'b': 'ACTIVE'}
+        self.poller.watch('a')
+        self.assertEqual('ACTIVE', self.poller.fetch('b').status)
+        self.poller.done('b')
+
+        self.now += 1
+        self.poller.poll()
+        self.list_resources.assert_called_with(
+            ['a'], 1000.0 - status_poller.SINCE_MARGIN)
+
+    def test_expiry(self):
+        self.statuses = {'a': 'BUILD', 'b': 'BUILD'}
+        self.poller.watch('a')
+        self.poller.watch('b')
+        self.now += status_poller.SINCE_MARGIN + 1
+        self.poller.watch('b')
+        self.poller.poll()
+
+        self.list_resources.assert_called_once_with(
+            ['b'], 1000.0 - status_poller.SINCE_MARGIN)
+
+    def test_transient_error(self):
+        self.poller = status_poller.BulkStatusPoller(
+            self.list_resources, self.get_resource,
+            lambda res: res.status,
+            is_transient_error=lambda ex: isinstance(ex, ValueError))
+        self.statuses = {'a': 'BUILD', 'b': 'BUILD'}
+        self.poller.watch('a')
+        self.assertEqual('BUILD', self.poller.fetch('b').status)
+        self.assertEqual(1, self.poller.interval)
+
+        self.statuses['b'] = 'ACTIVE'
+        self.list_resources.side_effect = ValueError('overLimit')
+        self.now += 1
+        self.assertEqual('BUILD', self.poller.fetch('b').status)
+        self.assertEqual(2, self.poller.interval)
+        self.assertEqual(0, self.get_resource.call_count)
+
+        self.list_resources.side_effect = self._list
+        self.now += 2
+        self.assertEqual('ACTIVE', self.poller.fetch('b').status)
+        self.assertEqual(3, self.list_resources.call_count)
+
+    def test_other_error(self):
+        self.poller = status_poller.BulkStatusPoller(
+            self.list_resources, self.get_resource,
+            lambda res: res.status,
+            is_transient_error=lambda ex: isinstance(ex, ValueError))
+        self.statuses = {'a': 'BUILD', 'b': 'BUILD'}
+        self.poller.watch('a')
+        self.list_resources.side_effect = KeyError('b')
+        self.assertRaises(KeyError, self.poller.fetch, 'b')
+
+
+class ServerPollerTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(ServerPollerTest, self).setUp()
+        cfg.CONF.set_override('bulk_status_poll_threshold', 2)
+        self.now = 1000.0
+        self.patchobject(status_poller.time, 'time',
+                         side_effect=lambda: self.now)
+        self.fc = fakes_nova.FakeClient()
+        self.nova_plugin = utils.dummy_context().clients.client_plugin(
+            'nova')
+        self.nova_plugin._client = self.fc
+
+    def _calls(self):
+        return [url for method, url, body in self.fc.client.callstack]
+
+    def test_check_active(self):
+        # '1234' is building, '9101' rebooting and '5678' active
+        self.assertFalse(self.nova_plugin._check_active('1234'))
+        self.assertFalse(self.nova_plugin._check_active('9101'))
+        self.assertFalse(self.nova_plugin._check_active('1234'))
+        self.now += 1
+        self.assertTrue(self.nova_plugin._check_active('5678'))
+        self.assertFalse(self.nova_plugin._check_active('1234'))
+
+        calls = self._calls()
+        self.assertEqual('/servers/1234', calls[0])
+        self.assertEqual(3, len(calls))
+        for url in calls[1:]:
+            url = urlparse.urlparse(url)
+            self.assertEqual('/servers/detail', url.path)
+            self.assertEqual({'changes-since': ['1970-01-01T00:15:40']},
+                             urlparse.parse_qs(url.query))
+        self.assertEqual(2, self.nova_plugin.server_poller.polls)
+
+    def test_check_active_with_object(self):
+        servers = dict((server.id, server) for server in
+                       self.fc.servers.list())
+        del self.fc.client.callstack[:]
+        self.nova_plugin.server_poller.watch('1234')
+
+        server = servers['5678']
+        server.status = 'BUILD'
+        self.assertTrue(self.nova_plugin._check_active(server))
+        self.assertEqual('ACTIVE', server.status)
+        self.assertEqual(1, len(self._calls()))
+
+
+class PortPollerTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(PortPollerTest, self).setUp()
+        cfg.CONF.set_override('bulk_status_poll_threshold', 2)
+        self.neutron_plugin = utils.dummy_context().clients.client_plugin(
+            'neutron')
+        self.neutron_client = mock.Mock()
+        self.patchobject(self.neutron_plugin, 'client',
+                         return_value=self.neutron_client)
+
+    def test_list_ports_chunked(self):
+        port_ids = ['port%d' % i for i in range(250)]
+        self.neutron_client.list_ports.side_effect = lambda id: {
+            'ports': [{'id': port_id, 'status': 'DOWN'} for port_id in id]}
+        for port_id in port_ids:
+            self.neutron_plugin.port_poller.watch(port_id)
+
+        port = self.neutron_plugin.port_poller.fetch('port249')
+        self.assertEqual('DOWN', port['status'])
+        self.assertEqual(3, self.neutron_client.list_ports.call_count)
+        listed = [port_id for args, kwargs in
+                  self.neutron_client.list_ports.call_args_list
+                  for port_id in kwargs['id']]
+        self.assertEqual(sorted(port_ids), sorted(listed))
+        self.assertFalse(self.neutron_client.show_port.called)
@@ -15,6 +15,7 @@
 import mock
 
 from heat.engine import sync_point
+from heat.objects import sync_point as sync_point_object
 from heat.tests import common
 from heat.tests.engine import tools
 from heat.tests import utils
@@ -35,13 +36,31 @@ class SyncPointTestCase(common.HeatTestCase):
         sync_point.sync(ctx, resource.id, stack.current_traversal, True,
                         mock_callback, set(graph[(resource.id, True)]),
                         {sender: None})
-        updated_sync_point = sync_point.get(ctx, resource.id,
-                                            stack.current_traversal, True)
-        input_data = sync_point.deserialize_input_data(
-            updated_sync_point.input_data)
+        input_data = sync_point.get_input_data(ctx, resource.id,
+                                               stack.current_traversal, True)
         self.assertEqual({sender: None}, input_data)
         self.assertFalse(mock_callback.called)
 
+    def test_sync_waiting_not_loaded(self):
+        ctx = utils.dummy_context()
+        stack = tools.get_stack('test_stack', utils.dummy_context(),
+                                template=tools.string_template_five,
+                                convergence=True)
+        stack.converge_stack(stack.t, action=stack.CREATE)
+        resource = stack['C']
+        graph = stack.convergence_dependencies.graph()
+        get_all = self.patchobject(sync_point_object.SyncPoint,
+                                   'get_all_input_data')
+
+        sender = (4, True)
+        mock_callback = mock.Mock()
+        sync_point.sync(ctx, resource.id, stack.current_traversal, True,
+                        mock_callback, set(graph[(resource.id, True)]),
+                        {sender: None})
+        # The input data is not loaded while predecessors are missing
+        self.assertFalse(get_all.called)
+        self.assertFalse(mock_callback.called)
+
     def test_sync_non_waiting(self):
         ctx = utils.dummy_context()
         stack = tools.get_stack('test_stack', utils.dummy_context(),
@@ -62,3 +81,20 @@ class SyncPointTestCase(common.HeatTestCase):
             updated_sync_point.input_data)
         self.assertEqual({sender: None}, input_data)
         self.assertTrue(mock_callback.called)
+
+    def test_sync_propagates_once(self):
+        ctx = utils.dummy_context()
+        stack = tools.get_stack('test_stack', utils.dummy_context(),
+                                template=tools.string_template_five,
+                                convergence=True)
+        stack.converge_stack(stack.t, action=stack.CREATE)
+        resource = stack['A']
+        graph = stack.convergence_dependencies.graph()
+
+        sender = (3, True)
+        mock_callback = mock.Mock()
+        for i in range(2):
+            sync_point.sync(ctx, resource.id, stack.current_traversal, True,
+                            mock_callback, set(graph[(resource.id, True)]),
+                            {sender: None})
+        mock_callback.assert_called_once_with(resource.id, {sender: None})
@@ -0,0 +1,116 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from heat.common import exception
+from heat.db import api as db_api
+from heat.engine import template
+from heat.engine import template_files
+from heat.objects import raw_template_files as files_object
+from heat.tests import common
+from heat.tests import utils
+
+
+empty_template = {"HeatTemplateFormatVersion": "2012-12-12"}
+
+
+class TemplateFilesTest(common.HeatTestCase):
+    def setUp(self):
+        super(TemplateFilesTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        template_files._files_cache.clear()
+        self.addCleanup(template_files._files_cache.clear)
+
+    def test_store_shared(self):
+        files = {'foo': 'bar'}
+        first = template.Template(empty_template, files=dict(files))
+        second = template.Template(empty_template, files=dict(files))
+
+        first.store(self.ctx)
+        second.store(self.ctx)
+
+        first_rt = db_api.raw_template_get(self.ctx, first.id)
+        second_rt = db_api.raw_template_get(self.ctx, second.id)
+        self.assertIsNotNone(first_rt.files_id)
+        self.assertEqual(first_rt.files_id, second_rt.files_id)
+        self.assertIsNone(first_rt.files)
+
+    def test_load_lazily(self):
+        tmpl = template.Template(empty_template, files={'foo': 'bar'})
+        tmpl.store(self.ctx)
+        get = self.patchobject(files_object.RawTemplateFiles, 'get_by_id',
+                               wraps=files_object.RawTemplateFiles.get_by_id)
+
+        loaded = [template.Template.load(self.ctx, tmpl.id)
+                  for i in range(2)]
+        self.assertEqual(0, get.call_count)
+
+        self.assertEqual('bar', loaded[0].files['foo'])
+        self.assertEqual({'foo': 'bar'}, loaded[1].files)
+        self.assertEqual(1, get.call_count)
+
+    def test_load_not_found(self):
+        tmpl = template.Template(empty_template, files={'foo': 'bar'})
+        tmpl.store(self.ctx)
+        loaded = template.Template.load(self.ctx, tmpl.id)
+        self.patchobject(db_api, 'raw_template_files_get',
+                         side_effect=exception.NotFound)
+
+        # The template must not lose its files, e.g. by being stored again
+        # without them
+        self.assertRaises(exception.NotFound, len, loaded.files)
+        self.assertEqual(tmpl.files.files_id, loaded.files.files_id)
+
+    def test_store_unmodified(self):
+        tmpl = template.Template(empty_template, files={'foo': 'bar'})
+        tmpl.store(self.ctx)
+        loaded = template.Template.load(self.ctx, tmpl.id)
+        create = self.patchobject(db_api, 'raw_template_files_create')
+
+        nested = template.Template(empty_template, files=loaded.files)
+        nested.store(self.ctx)
+        loaded.files['foo'] = 'bar'
+        loaded.store(self.ctx)
+
+        self.assertFalse(create.called)
+        self.assertEqual(
+            db_api.raw_template_get(self.ctx, tmpl.id).files_id,
+            db_api.raw_template_get(self.ctx, nested.id).files_id)
+
+    def test_modify_copies(self):
+        tmpl = template.Template(empty_template, files={'foo': 'bar'})
+        tmpl.store(self.ctx)
+        files_id = tmpl.files.files_id
+        first = template.Template.load(self.ctx, tmpl.id)
+        second = template.Template.load(self.ctx, tmpl.id)
+
+        first.files['foo'] = 'baz'
+        self.assertIsNone(first.files.files_id)
+        self.assertEqual('bar', second.files['foo'])
+
+        first.store(self.ctx)
+        rt = db_api.raw_template_get(self.ctx, tmpl.id)
+        self.assertNotEqual(files_id, rt.files_id)
+        self.assertEqual({'foo': 'baz'}, db_api.raw_template_files_get(
+            self.ctx, rt.files_id).files)
+
+    def test_load_legacy(self):
+        rt = db_api.raw_template_create(self.ctx, {'template': empty_template,
+                                                   'files': {'foo': 'bar'}})
+
+        tmpl = template.Template.load(self.ctx, rt.id)
+        self.assertEqual({'foo': 'bar'}, tmpl.files)
+
+        tmpl.store(self.ctx)
+        rt = db_api.raw_template_get(self.ctx, rt.id)
+        self.assertIsNone(rt.files)
+        self.assertIsNotNone(rt.files_id)
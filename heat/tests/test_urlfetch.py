@@ -21,8 +21,10 @@ from heat.tests import common
 
 
 class Response(object):
-    def __init__(self, buf=''):
+    def __init__(self, buf='', status_code=200, headers=None):
         self.buf = buf
+        self.status_code = status_code
+        self.headers = headers or {}
 
     def iter_content(self, chunk_size=1):
         while self.buf:
@@ -130,3 +132,71 @@ class UrlFetchTest(common.HeatTestCase):
                                       urlfetch.get, url)
         self.assertIn("Template exceeds", six.text_type(exception))
         self.m.VerifyAll()
+
+
+class UrlFetchCacheTest(common.HeatTestCase):
+    url = 'http://example.com/template'
+    data = '{ "foo": "bar" }'
+
+    def setUp(self):
+        super(UrlFetchCacheTest, self).setUp()
+        self.m.StubOutWithMock(requests, 'get')
+        self.addCleanup(urlfetch._cache.clear)
+        self.addCleanup(self.m.VerifyAll)
+        cfg.CONF.set_override('template_url_cache_ttl', 60)
+
+    def test_disabled(self):
+        cfg.CONF.set_override('template_url_cache_ttl', 0)
+        requests.get(self.url, stream=True).AndReturn(Response(self.data))
+        requests.get(self.url, stream=True).AndReturn(Response(self.data))
+        self.m.ReplayAll()
+
+        self.assertEqual(self.data, urlfetch.get_cached(self.url))
+        self.assertEqual(self.data, urlfetch.get_cached(self.url))
+
+    def test_ttl(self):
+        requests.get(self.url, stream=True).AndReturn(Response(self.data))
+        self.m.ReplayAll()
+
+        self.assertEqual(self.data, urlfetch.get_cached(self.url))
+        self.assertEqual(self.data, urlfetch.get_cached(self.url))
+
+    def test_etag_not_modified(self):
+        self.patchobject(urlfetch.time, 'time', side_effect=[0, 100, 110])
+        headers = {'ETag': '"1"'}
+        requests.get(self.url, stream=True).AndReturn(
+            Response(self.data, headers=headers))
+        requests.get(self.url, stream=True,
+                     headers={'If-None-Match': '"1"'}).AndReturn(
+            Response(status_code=304))
+        self.m.ReplayAll()
+
+        self.assertEqual(self.data, urlfetch.get_cached(self.url))
+        self.assertEqual(self.data, urlfetch.get_cached(self.url))
+        self.assertEqual(self.data, urlfetch.get_cached(self.url))
+
+    def test_etag_modified(self):
+        self.patchobject(urlfetch.time, 'time', side_effect=[0, 100])
+        new_data = '{ "foo": "baz" }'
+        requests.get(self.url, stream=True).AndReturn(
+            Response(self.data, headers={'ETag': '"1"'}))
+        requests.get(self.url, stream=True,
+                     headers={'If-None-Match': '"1"'}).AndReturn(
+            Response(new_data, headers={'ETag': '"2"'}))
+        self.m.ReplayAll()
+
+        self.assertEqual(self.data, urlfetch.get_cached(self.url))
+        self.assertEqual(new_data, urlfetch.get_cached(self.url))
+
+    def test_cached_scheme_not_allowed(self):
+        url = 'file:///etc/profile'
+        self.m.StubOutWithMock(six.moves.urllib.request, 'urlopen')
+        six.moves.urllib.request.urlopen(url).AndReturn(
+            six.moves.cStringIO(self.data))
+        self.m.ReplayAll()
+
+        self.assertEqual(self.data,
+                         urlfetch.get_cached(url, allowed_schemes=('file',)))
+        self.assertRaises(urlfetch.URLFetchError, urlfetch.get_cached, url)
+        self.assertEqual(self.data,
+                         urlfetch.get_cached(url, allowed_schemes=('file',)))
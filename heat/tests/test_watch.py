@@ -13,8 +13,11 @@
 
 
 import datetime
+import time
 
+import mock
 import mox
+from oslo_config import cfg
 from oslo_utils import timeutils
 
 from heat.common import exception
@@ -64,6 +67,7 @@ class WatchRuleTest(common.HeatTestCase):
 
         self.ctx = utils.dummy_context()
         self.ctx.auth_token = 'abcd1234'
+        watchrule._rule_index.reset()
 
         self.m.ReplayAll()
 
@@ -681,6 +685,37 @@ class WatchRuleTest(common.HeatTestCase):
         # correctly get a list of all datapoints where watch_rule_id ==
         # watch_rule.id, so leave it as a single-datapoint test for now.
 
+    def test_create_watch_data_discards_expired(self):
+        rule = {u'EvaluationPeriods': u'1',
+                u'AlarmDescription': u'test alarm',
+                u'Period': u'300',
+                u'ComparisonOperator': u'GreaterThanThreshold',
+                u'Statistic': u'SampleCount',
+                u'Threshold': u'2',
+                u'MetricName': u'CreateDataMetric'}
+        data = {u'CreateDataMetric': {"Unit": "Counter",
+                                      "Value": "1",
+                                      "Dimensions": []}}
+        now = timeutils.utcnow()
+        timeutils.set_time_override(now - datetime.timedelta(seconds=600))
+        self.addCleanup(timeutils.clear_time_override)
+        self.wr = watchrule.WatchRule(context=self.ctx,
+                                      watch_name='discard_data_test',
+                                      stack_id=self.stack_id, rule=rule)
+        self.wr.store()
+        self.wr.create_watch_data(data)
+
+        timeutils.set_time_override(now)
+        self.wr = watchrule.WatchRule.load(self.ctx, 'discard_data_test')
+        self.assertEqual(1, len(self.wr.watch_data))
+        self.wr.create_watch_data(data)
+
+        obj_wr = watch_rule.WatchRule.get_by_name(self.ctx,
+                                                  'discard_data_test')
+        obj_wds = list(obj_wr.watch_data)
+        self.assertEqual(1, len(obj_wds))
+        self.assertEqual(now, obj_wds[0].created_at)
+
     def test_create_watch_data_suspended(self):
         rule = {u'EvaluationPeriods': u'1',
                 u'AlarmDescription': u'test alarm',
@@ -939,3 +974,140 @@ class WatchRuleTest(common.HeatTestCase):
         self.assertRaises(ValueError, self.wr.set_watch_state, None)
 
         self.assertRaises(ValueError, self.wr.set_watch_state, "BADSTATE")
+
+    def _store_group_rule(self, name, group, state='NORMAL'):
+        rule = {u'Period': u'300',
+                u'ComparisonOperator': u'GreaterThanThreshold',
+                u'Statistic': u'SampleCount',
+                u'Threshold': u'2',
+                u'Dimensions': [{u'Name': 'AutoScalingGroupName',
+                                 u'Value': group}],
+                u'MetricName': u'CreateDataMetric'}
+        wr = watchrule.WatchRule(context=self.ctx, watch_name=name,
+                                 stack_id=self.stack_id, rule=rule,
+                                 state=state)
+        wr.store()
+        return wr
+
+    def test_get_matching_rules(self):
+        self._store_group_rule('group_x_alarm', 'group_x')
+        self._store_group_rule('group_y_alarm', 'group_y')
+        self._store_group_rule('group_x_suspended', 'group_x',
+                               state=watchrule.WatchRule.SUSPENDED)
+
+        data = {u'Namespace': u'system/linux',
+                u'CreateDataMetric': {"Unit": "Counter",
+                                      "Value": "1",
+                                      "Dimensions": [{u'AutoScalingGroupName':
+                                                      u'group_x',
+                                                      u'InstanceId':
+                                                      u'i-1234'}]}}
+        rules = watchrule.get_matching_rules(self.ctx, data)
+        self.assertEqual(['group_x_alarm'], [r.name for r in rules])
+
+        data[u'CreateDataMetric']['Dimensions'] = [{u'InstanceId': u'i-1234'}]
+        self.assertEqual([], list(watchrule.get_matching_rules(self.ctx,
+                                                               data)))
+
+    def test_get_matching_rules_updated(self):
+        wr = self._store_group_rule('group_alarm', 'group_x')
+        data = {u'CreateDataMetric': {"Unit": "Counter",
+                                      "Value": "1",
+                                      "Dimensions": [{u'AutoScalingGroupName':
+                                                      u'group_y'}]}}
+        self.assertEqual([], list(watchrule.get_matching_rules(self.ctx,
+                                                               data)))
+
+        wr.rule[u'Dimensions'][0][u'Value'] = 'group_y'
+        wr.store()
+        rules = watchrule.get_matching_rules(self.ctx, data)
+        self.assertEqual(['group_alarm'], [r.name for r in rules])
+
+        wr.destroy()
+        self.assertEqual([], list(watchrule.get_matching_rules(self.ctx,
+                                                               data)))
+
+    def test_rule_index_reloaded(self):
+        self._store_group_rule('group_alarm', 'group_x')
+        data = {u'CreateDataMetric': {"Unit": "Counter",
+                                      "Value": "1",
+                                      "Dimensions": [{u'AutoScalingGroupName':
+                                                      u'group_x'}]}}
+        self.assertEqual(1, len(list(watchrule.get_matching_rules(self.ctx,
+                                                                  data))))
+
+        # A rule stored by another engine is not in this engine's index
+        values = {'name': 'other_alarm', 'state': 'NORMAL',
+                  'stack_id': self.stack_id,
+                  'rule': watch_rule.WatchRule.get_by_name(
+                      self.ctx, 'group_alarm').rule}
+        watch_rule.WatchRule.create(self.ctx, values)
+
+        rules = watchrule.get_matching_rules(self.ctx, data)
+        self.assertEqual(['group_alarm', 'other_alarm'],
+                         sorted(r.name for r in rules))
+
+    def test_rule_index_reloaded_replaced(self):
+        wr = self._store_group_rule('group_alarm', 'group_x')
+        data = {u'CreateDataMetric': {"Unit": "Counter",
+                                      "Value": "1",
+                                      "Dimensions": [{u'AutoScalingGroupName':
+                                                      u'group_x'}]}}
+        self.assertEqual(1, len(list(watchrule.get_matching_rules(self.ctx,
+                                                                  data))))
+
+        # Another engine replaces the rule, so the number of rules is the
+        # same as before
+        rule = watch_rule.WatchRule.get_by_name(self.ctx, 'group_alarm').rule
+        watch_rule.WatchRule.delete(self.ctx, wr.id)
+        values = {'name': 'new_alarm', 'state': 'NORMAL',
+                  'stack_id': self.stack_id, 'rule': rule}
+        watch_rule.WatchRule.create(self.ctx, values)
+
+        rules = watchrule.get_matching_rules(self.ctx, data)
+        self.assertEqual(['new_alarm'], [r.name for r in rules])
+
+    def test_rule_index_reloaded_after_interval(self):
+        wr = self._store_group_rule('group_alarm', 'group_x')
+        data = {u'CreateDataMetric': {"Unit": "Counter",
+                                      "Value": "1",
+                                      "Dimensions": [{u'AutoScalingGroupName':
+                                                      u'group_y'}]}}
+        now = time.time()
+        with mock.patch.object(watchrule.time, 'time', return_value=now):
+            self.assertEqual([], list(watchrule.get_matching_rules(self.ctx,
+                                                                   data)))
+
+            # Another engine changes the dimensions of the rule
+            rule = wr.rule
+            rule[u'Dimensions'][0][u'Value'] = 'group_y'
+            watch_rule.WatchRule.update_by_id(self.ctx, wr.id,
+                                              {'rule': rule})
+            self.assertEqual([], list(watchrule.get_matching_rules(self.ctx,
+                                                                   data)))
+
+        now += cfg.CONF.watch_rule_index_reload_interval
+        with mock.patch.object(watchrule.time, 'time', return_value=now):
+            rules = watchrule.get_matching_rules(self.ctx, data)
+        self.assertEqual(['group_alarm'], [r.name for r in rules])
+
+    def test_create_watch_data_samples(self):
+        wr_x = self._store_group_rule('group_x_alarm', 'group_x')
+        wr_y = self._store_group_rule('group_y_alarm', 'group_y',
+                                      state=watchrule.WatchRule.SUSPENDED)
+        data = {u'CreateDataMetric': {"Unit": "Counter",
+                                      "Value": "1",
+                                      "Dimensions": []}}
+        other_data = {u'OtherMetric': {"Unit": "Counter",
+                                       "Value": "1",
+                                       "Dimensions": []}}
+
+        watchrule.create_watch_data(self.ctx, [(wr_x, data),
+                                               (wr_x, other_data),
+                                               (wr_x, data),
+                                               (wr_y, data)])
+
+        obj_wr = watch_rule.WatchRule.get_by_name(self.ctx, 'group_x_alarm')
+        self.assertEqual([data, data], [wd.data for wd in obj_wr.watch_data])
+        obj_wr = watch_rule.WatchRule.get_by_name(self.ctx, 'group_y_alarm')
+        self.assertEqual([], list(obj_wr.watch_data))